@@ -0,0 +1,118 @@
+"""
+Contention benchmark for BookingInventory: thousands of simultaneous bookers competing for a
+few hotels and activities. Each booker holds a multi-night stay plus an activity, then confirms
+or abandons it. Run with threads and with asyncio tasks, with 1 lock stripe vs many, and with
+sqlite write-through; afterwards every (item, night) is checked for overbooking.
+
+    python benchmarks/bench_booking_contention.py --bookers 5000 --threads 64
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from booking_inventory import CONFIRMED, HELD, BookingInventory
+
+
+def make_requests(num_bookers, num_hotels, num_activities, num_nights, seed=0, first_date=datetime.date(2026, 7, 1)):
+    rng = np.random.default_rng(seed)
+    nights = [first_date + datetime.timedelta(days=night) for night in range(num_nights)]
+    requests = []
+    for _ in range(num_bookers):
+        first_night, stay = int(rng.integers(0, num_nights - 3)), int(rng.integers(1, 4))
+        hotel, activity = f"hotel-{rng.integers(num_hotels)}", f"activity-{rng.integers(num_activities)}"
+        slots = [(hotel, nights[night], 1) for night in range(first_night, first_night + stay)] + [(activity, nights[first_night], 1)]
+        requests.append((slots, bool(rng.random() < 0.8)))
+    return requests
+
+
+def book(inventory, slots, confirm):
+    hold_id = inventory.hold(slots)
+    if hold_id is None:
+        return "sold out"
+    if confirm:
+        return "confirmed" if inventory.confirm(hold_id) else "expired"
+    inventory.release(hold_id)
+    return "abandoned"
+
+
+def check(inventory):
+    """No slot is over capacity, and the counters match the live holds."""
+    expected = {}
+    for hold in inventory._holds.values():
+        if hold.state in (HELD, CONFIRMED):
+            for item, night, quantity in hold.slots:
+                expected[(item, night)] = expected.get((item, night), 0) + quantity
+    assert all(used <= inventory.capacity(item) for (item, _), used in inventory._used.items()), "overbooked"
+    assert {slot: used for slot, used in inventory._used.items() if used} == expected, "counters out of sync"
+
+
+def run_threads(inventory, requests, num_threads):
+    with ThreadPoolExecutor(num_threads) as pool:
+        return list(pool.map(lambda request: book(inventory, *request), requests))
+
+
+def run_asyncio(inventory, requests):
+    async def booker(slots, confirm):
+        hold_id = inventory.hold(slots)
+        if hold_id is None:
+            return "sold out"
+        await asyncio.sleep(0)  # think time: other bookers run between hold and confirm
+        if confirm:
+            return "confirmed" if inventory.confirm(hold_id) else "expired"
+        inventory.release(hold_id)
+        return "abandoned"
+
+    async def everyone():
+        return await asyncio.gather(*(booker(*request) for request in requests))
+
+    return asyncio.run(everyone())
+
+
+def timed(label, inventory, func):
+    start = time.perf_counter()
+    outcomes = func()
+    elapsed = time.perf_counter() - start
+    check(inventory)
+    counts = {outcome: outcomes.count(outcome) for outcome in ("confirmed", "abandoned", "sold out", "expired")}
+    print(f"{label:<38} {len(outcomes) / elapsed:>10,.0f} bookings/s   " + "  ".join(f"{k}: {v}" for k, v in counts.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookers", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--hotels", type=int, default=20)
+    parser.add_argument("--activities", type=int, default=10)
+    parser.add_argument("--nights", type=int, default=30)
+    parser.add_argument("--capacity", type=int, default=20)
+    args = parser.parse_args()
+    requests = make_requests(args.bookers, args.hotels, args.activities, args.nights)
+    print(f"{args.bookers:,} bookers, {args.hotels} hotels + {args.activities} activities x {args.nights} nights, capacity {args.capacity}")
+
+    for stripes in (1, 64):
+        inventory = BookingInventory(args.capacity, num_stripes=stripes)
+        timed(f"{args.threads} threads, {stripes} stripe(s)", inventory, lambda: run_threads(inventory, requests, args.threads))
+    inventory = BookingInventory(args.capacity)
+    timed("asyncio tasks", inventory, lambda: run_asyncio(inventory, requests))
+    with tempfile.TemporaryDirectory() as path:
+        db_path = os.path.join(path, "inventory.sqlite")
+        inventory = BookingInventory(args.capacity, path=db_path)
+        timed(f"{args.threads} threads, sqlite WAL", inventory, lambda: run_threads(inventory, requests, args.threads))
+        used = dict(inventory._used)
+        inventory.close()
+        reopened = BookingInventory(args.capacity, path=db_path)
+        assert {slot: n for slot, n in reopened._used.items() if n} == {slot: n for slot, n in used.items() if n}, "reload mismatch"
+        reopened.close()
+        print("sqlite reload matches")
+
+
+if __name__ == "__main__":
+    main()
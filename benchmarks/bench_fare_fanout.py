@@ -0,0 +1,42 @@
+"""
+Fetches a 30-day flexible window from three providers on the stub server (50 ms latency,
+5% injected failures), one request at a time and then fanned out concurrently.
+
+    python benchmarks/bench_fare_fanout.py
+"""
+import asyncio
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fare_providers import HttpFareProvider
+from flexi_date_flexi_destination_flight import FlightExplorer
+from stub_fare_server import start_stub_server
+
+START, END = datetime.date(2026, 11, 1), datetime.date(2026, 11, 30)
+REGION = (35, -10, 45, 30)
+
+
+async def main():
+    server = await start_stub_server(latency=0.05, failure_rate=0.05)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/fares"
+    async with server:
+        for label, concurrency in (("sequential", 1), ("fan-out", 16)):
+            providers = [HttpFareProvider(f"provider-{i}", url, max_concurrency=concurrency, timeout=2.0, backoff=0.05) for i in range(3)]
+            if concurrency == 1:
+                # One provider at a time as well, to mimic the old synchronous fetch.
+                explorer, start = FlightExplorer(), time.perf_counter()
+                for provider in providers:
+                    await explorer.fetch_flight_data_async(START, END, REGION, 500, [provider])
+            else:
+                explorer, start = FlightExplorer(), time.perf_counter()
+                await explorer.fetch_flight_data_async(START, END, REGION, 500, providers)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<10} {elapsed:>6.2f} s  {len(explorer.fare_store):>5} fares  {len(explorer.fetch_errors)} failed requests")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""
+Rows/sec of the vectorized fare simulator against the original row-at-a-time loop.
+
+    python benchmarks/bench_fare_generator.py
+"""
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flexi_date_flexi_destination_flight import iter_synthetic_fares, synthetic_fares
+
+START, END = datetime.date(2026, 1, 1), datetime.date(2026, 12, 31)
+REGION = (35, -10, 45, 30)
+BUDGET = 800
+
+
+def loop_fares(num_rows, rng):
+    """The pre-vectorization fetch_flight_data body, kept here as the baseline."""
+    min_lat, min_lon, max_lat, max_lon = REGION
+    data = []
+    for _ in range(num_rows):
+        departure_day = START + datetime.timedelta(days=int(rng.integers(0, (END - START).days + 1)))
+        departure_date = datetime.datetime.combine(departure_day, datetime.time(int(rng.integers(0, 24))))
+        data.append({"departure_date": departure_date,
+                     "arrival_date": departure_date + datetime.timedelta(hours=int(rng.integers(2, 16))),
+                     "price": rng.uniform(50, BUDGET), "latitude": rng.uniform(min_lat, max_lat),
+                     "longitude": rng.uniform(min_lon, max_lon), "destination_city": f"City {rng.integers(1, 11)}",
+                     "airline": ["BudgetAir", "FlyLow", "CheapWings"][rng.integers(3)], "stops": int(rng.integers(0, 3))})
+    return pd.DataFrame(data)
+
+
+def rate(func, num_rows):
+    start = time.perf_counter()
+    func(num_rows)
+    return num_rows / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{'rows':>10} | {'loop rows/s':>12} {'vectorized rows/s':>18} {'chunked rows/s':>15}")
+    for num_rows in (10_000, 100_000, 1_000_000):
+        loop = rate(lambda n: loop_fares(n, np.random.default_rng(0)), num_rows) if num_rows <= 100_000 else float("nan")
+        vectorized = rate(lambda n: synthetic_fares(START, END, REGION, BUDGET, n, rng=0), num_rows)
+        chunked = rate(lambda n: sum(len(chunk) for chunk in iter_synthetic_fares(START, END, REGION, BUDGET, n, rng=0, chunk_size=100_000)), num_rows)
+        print(f"{num_rows:>10,} | {loop:>12,.0f} {vectorized:>18,.0f} {chunked:>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
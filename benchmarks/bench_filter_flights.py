@@ -0,0 +1,69 @@
+"""
+Times FlightExplorer.filter_flights (fused mask, no upfront copy) against the old
+copy-then-mask approach, and scan_fares pushdown against reading every Parquet segment.
+
+    python benchmarks/bench_filter_flights.py --rows 10000000
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fare_store import FareStore, fare_mask, scan_fares
+from flexi_date_flexi_destination_flight import FlightExplorer, synthetic_fares
+
+FILTERS = dict(max_budget=400, max_duration_hours=6, max_stops=1, preferred_airlines=["FlyLow", "BudgetAir"])
+
+
+def copy_then_mask(fares):
+    filtered = fares.copy()
+    filtered = filtered[filtered["price"] <= FILTERS["max_budget"]]
+    filtered = filtered[(filtered["arrival_date"] - filtered["departure_date"]) <= pd.Timedelta(hours=FILTERS["max_duration_hours"])]
+    filtered = filtered[filtered["stops"] <= FILTERS["max_stops"]]
+    return filtered[filtered["airline"].isin(FILTERS["preferred_airlines"])]
+
+
+def timed(label, func, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<40} {best * 1000:>9.1f} ms  ({len(result):,} rows)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    fares = synthetic_fares(datetime.date(2026, 1, 1), datetime.date(2026, 12, 31), (-60, -180, 70, 180), 2000, args.rows, rng=0)
+    explorer = FlightExplorer()
+    explorer.flight_data = fares
+    print(f"{args.rows:,} synthetic fares")
+    expected = timed("copy + sequential masks", lambda: copy_then_mask(fares))
+    result = timed("filter_flights (fused mask)", lambda: explorer.filter_flights(**FILTERS))
+    assert len(result) == len(expected)
+
+    with tempfile.TemporaryDirectory() as path:
+        store = FareStore(path, resident=False)
+        for chunk in np.array_split(np.arange(args.rows), 10):
+            store.append(fares.iloc[chunk])
+        window = dict(start_date="2026-03-01", end_date="2026-03-14", region_coords=(35, -10, 45, 30))
+        timed("read all segments, then filter", lambda: (lambda full: full[
+            fare_mask(full, FILTERS["max_budget"], FILTERS["max_duration_hours"], FILTERS["max_stops"], FILTERS["preferred_airlines"])
+            & (full["departure_date"] >= "2026-03-01").to_numpy() & (full["departure_date"] < "2026-03-15").to_numpy()
+            & full["latitude"].between(35, 45).to_numpy() & full["longitude"].between(-10, 30).to_numpy()])(pd.read_parquet(path)), repeats=1)
+        timed("scan_fares (pushdown)", lambda: scan_fares(path, max_budget=FILTERS["max_budget"], max_duration_hours=FILTERS["max_duration_hours"],
+                                                          max_stops=FILTERS["max_stops"], airlines=FILTERS["preferred_airlines"], **window))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compares the random "Surprise Me" strategy with the budget optimizer on synthetic destinations.
+Reports mean trip rating, how often the trip goes over budget or no trip is returned, and time per itinerary.
+
+    python benchmarks/bench_itinerary_optimizer.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from surprise_itinerary import TravelPlanner
+
+
+def synthetic_destination(rng, num_activities, num_accommodations):
+    return {
+        "activities": [{"name": f"Activity {i}", "rating": round(rng.uniform(3.0, 5.0), 1), "cost": int(rng.integers(0, 120))}
+                       for i in range(num_activities)],
+        "accommodations": [{"name": f"Hotel {i}", "rating": round(rng.uniform(3.0, 5.0), 1), "price_per_night": int(rng.integers(30, 300))}
+                           for i in range(num_accommodations)],
+        "food": [{"name": f"Dish {i}", "avg_cost": int(rng.integers(3, 40))} for i in range(10)],
+    }
+
+
+def trip_stats(itinerary):
+    rating = sum(day["activities"][0].get("rating", 0) + day["accommodation"]["rating"] for day in itinerary["days"])
+    cost = sum(day["activities"][0].get("cost", 0) + day["accommodation"]["price_per_night"] + sum(f["avg_cost"] for f in day["food"])
+               for day in itinerary["days"])
+    return rating, cost
+
+
+def run_strategy(generate, budget, repeats):
+    ratings, over_budget, no_trip = [], 0, 0
+    start = time.perf_counter()
+    for _ in range(repeats):
+        itinerary = generate()
+        if isinstance(itinerary, str):
+            no_trip += 1
+            continue
+        rating, cost = trip_stats(itinerary)
+        ratings.append(rating)
+        over_budget += cost > budget
+    elapsed = time.perf_counter() - start
+    return np.mean(ratings) if ratings else float("nan"), over_budget / repeats, no_trip / repeats, elapsed / repeats * 1000
+
+
+def main(repeats=50):
+    rng = np.random.default_rng(0)
+    print(f"{'activities':>10} {'days':>4} {'budget':>6} | {'strategy':>9} {'rating':>7} {'over%':>6} {'none%':>6} {'ms/trip':>8}")
+    for num_activities in (11, 100, 500):
+        destination = synthetic_destination(rng, num_activities, max(3, num_activities // 10))
+        planner = TravelPlanner({"synthetic": destination})
+        for num_days, budget in ((3, 400), (7, 1200)):
+            strategies = {
+                "random": lambda: planner.generate_single_itinerary("synthetic", budget, num_days),
+                "optimized": lambda: planner.generate_optimized_itinerary("synthetic", budget, num_days, diversity=0.3),
+            }
+            for name, generate in strategies.items():
+                rating, over_rate, none_rate, ms = run_strategy(generate, budget, repeats)
+                print(f"{num_activities:>10} {num_days:>4} {budget:>6} | {name:>9} {rating:>7.1f} {over_rate * 100:>5.0f}% {none_rate * 100:>5.0f}% {ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Times visualize_cheap_destinations per rendering mode at 10k / 100k / 1M fares,
+and reports the size of the HTML page each mode produces.
+
+    python benchmarks/bench_map_rendering.py
+"""
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flexi_date_flexi_destination_flight import FlightExplorer, iter_synthetic_fares, synthetic_fares
+from geo_index import FareTiles
+
+START, END = datetime.date(2026, 1, 1), datetime.date(2026, 3, 31)
+WORLD = (-60, -180, 70, 180)
+
+
+def main():
+    explorer = FlightExplorer()
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'fares':>10} {'mode':>8} {'group by':>12} | {'seconds':>8} {'html MB':>8}")
+        for num_rows in (10_000, 100_000, 1_000_000):
+            fares = synthetic_fares(START, END, WORLD, 1500, num_rows, rng=0)
+            # Give every fare its own city so grouping by destination isn't trivially small.
+            fares["destination_city"] = fares["destination_city"].astype(str) + "-" + (fares.index % 5000).astype(str)
+            runs = [("cluster", "destination"), ("cluster", "cell"), ("geojson", "cell")]
+            if num_rows <= 10_000:
+                runs.insert(0, ("markers", "-"))
+            for mode, group_by in runs:
+                output = os.path.join(directory, "map.html")
+                start = time.perf_counter()
+                explorer.visualize_cheap_destinations(fares, mode=mode, group_by=group_by, output=output)
+                elapsed = time.perf_counter() - start
+                print(f"{num_rows:>10,} {mode:>8} {group_by:>12} | {elapsed:>8.2f} {os.path.getsize(output) / 1e6:>8.1f}")
+
+        tiles, start = FareTiles(), time.perf_counter()
+        written = 0
+        for chunk in iter_synthetic_fares(START, END, WORLD, 1500, 1_000_000, rng=1, chunk_size=100_000):
+            tiles.update(chunk)
+            written += len(tiles.write_geojson(os.path.join(directory, "tiles")))
+        print(f"incremental GeoJSON tiles for 1M fares in 100k chunks: {time.perf_counter() - start:.2f} s, {written} tile writes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Times the price calendar (cheapest outbound + return per departure date and trip length)
+over a fare store with many destinations, e.g. a 90-day window x 1000 destinations.
+
+    python benchmarks/bench_price_calendar.py --days 90 --destinations 1000 --fares-per-day 20
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fare_store import FareStore
+from flexi_date_flexi_destination_flight import FlightExplorer
+
+
+def make_fares(start_date, num_days, num_destinations, fares_per_day, rng):
+    cities = [f"City {i}" for i in range(1, num_destinations + 1)]
+    size = num_days * num_destinations * fares_per_day
+    departures = (np.datetime64(start_date, "D").astype("datetime64[h]")
+                  + rng.integers(0, num_days * 24, size).astype("timedelta64[h]"))
+    return pd.DataFrame({
+        "departure_date": departures.astype("datetime64[ns]"),
+        "arrival_date": (departures + rng.integers(2, 16, size).astype("timedelta64[h]")).astype("datetime64[ns]"),
+        "price": rng.uniform(50, 1500, size),
+        "latitude": rng.uniform(-60, 70, size),
+        "longitude": rng.uniform(-180, 180, size),
+        "destination_city": pd.Categorical.from_codes(rng.integers(0, num_destinations, size), cities),
+        "airline": pd.Categorical.from_codes(rng.integers(0, 3, size), ["BudgetAir", "FlyLow", "CheapWings"]),
+        "stops": rng.integers(0, 3, size),
+    })
+
+
+def timed(label, func, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<45} {best * 1000:>9.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--destinations", type=int, default=1000)
+    parser.add_argument("--fares-per-day", type=int, default=20)
+    parser.add_argument("--max-length", type=int, default=14)
+    args = parser.parse_args()
+
+    start_date = datetime.date(2026, 1, 1)
+    end_date = start_date + datetime.timedelta(days=args.days - 1)
+    fares = make_fares(start_date, args.days + args.max_length, args.destinations, args.fares_per_day, np.random.default_rng(0))
+    explorer = FlightExplorer(fare_store=FareStore())
+    explorer.fare_store.append(fares)
+    explorer.fare_store.frame  # consolidate before timing
+    print(f"{len(fares):,} fares, {args.days} departure days x {args.destinations} destinations x trip lengths 1-{args.max_length}")
+
+    calendar = timed("price_calendar (full matrix)", lambda: explorer.price_calendar(start_date, end_date, 1, args.max_length))
+    timed("cheapest_trips, 3-5 days (sliding window)", lambda: explorer.cheapest_trips(start_date, end_date, 3, 5))
+    outbound, inbound, _ = explorer._round_trip_fares(start_date, end_date, args.max_length, None, None, None, {})
+    from price_calendar import build_price_calendar
+    timed("build_price_calendar only (fares in hand)", lambda: build_price_calendar(outbound, inbound, start_date, end_date, 1, args.max_length))
+    print(f"cheapest 3-5 day trip ({calendar.return_legs}):", calendar.cheapest(3, 5))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Cold-start benchmark for the command-line tools: time to first output of TravelPlanner.run,
+FlightExplorer.run and the recipe generator's main(), each started as a fresh interpreter and
+fed input that makes it exit right away. One extra run per tool under -X importtime gives the
+import breakdown (the heaviest top-level imports, and whether pandas was imported at all).
+With --preload the same tools are also started through a preload.py fork server.
+
+    python benchmarks/bench_startup.py --runs 10 --preload
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# tool -> (script, stdin that exits straight after the welcome)
+TOOLS = {
+    "planner": ("surprise_itinerary.py", "\n"),
+    "flights": ("flexi_date_flexi_destination_flight.py", "\n"),
+    "recipes": ("dynamic_recipe_generator.py", "3\n"),
+}
+
+
+def timed_start(args, stdin_text, extra_env=None):
+    """(seconds to the first byte on stdout, seconds to exit, stderr) for one run of args."""
+    env = dict(os.environ, PYTHONUNBUFFERED="1", **(extra_env or {}))
+    start = time.perf_counter()
+    process = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=REPO, env=env)
+    process.stdin.write(stdin_text.encode())
+    process.stdin.close()
+    os.read(process.stdout.fileno(), 1)
+    first_output = time.perf_counter() - start
+    process.stdout.read()
+    stderr = process.stderr.read().decode()
+    process.wait()
+    return first_output, time.perf_counter() - start, stderr
+
+
+def import_breakdown(stderr, top=5):
+    """(total import microseconds, [(cumulative us, module)] heaviest top-level imports) from -X importtime output."""
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # indented one space past the separator: imported by __main__ itself
+            top_level.append((int(cumulative), name.strip()))
+    return sum(us for us, _ in top_level), sorted(top_level, reverse=True)[:top]
+
+
+def report(label, runs):
+    first = [first for first, _, _ in runs]
+    total = [total for _, total, _ in runs]
+    print(f"  {label:<10} first output {statistics.median(first) * 1000:7.1f} ms (min {min(first) * 1000:6.1f})"
+          f"   exit {statistics.median(total) * 1000:7.1f} ms")
+
+
+def start_preload_server(socket_path):
+    server = subprocess.Popen([sys.executable, os.path.join(REPO, "preload.py"), "serve", "--socket", socket_path],
+                              stdout=subprocess.PIPE, cwd=REPO)
+    server.stdout.readline()  # "Preloaded ...; listening on ..."
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--tools", nargs="+", choices=list(TOOLS), default=list(TOOLS))
+    parser.add_argument("--preload", action="store_true", help="also time the tools through a preload.py fork server")
+    args = parser.parse_args()
+
+    for tool in args.tools:
+        script, stdin_text = TOOLS[tool]
+        command = [sys.executable, script]
+        timed_start(command, stdin_text)  # let the OS cache the files and build the catalog if needed
+        print(f"{tool} ({script})")
+        report("cold", [timed_start(command, stdin_text) for _ in range(args.runs)])
+        _, _, stderr = timed_start([sys.executable, "-X", "importtime", script], stdin_text)
+        total_us, heaviest = import_breakdown(stderr)
+        print(f"  imports    {total_us / 1000:7.1f} ms; pandas {'imported' if ' pandas' in stderr else 'not imported'}; heaviest: "
+              + ", ".join(f"{name} {us / 1000:.1f} ms" for us, name in heaviest))
+
+    if args.preload:
+        socket_path = os.path.join(tempfile.mkdtemp(), "preload.sock")
+        server = start_preload_server(socket_path)
+        try:
+            print("through preload.py")
+            for tool in args.tools:
+                command = [sys.executable, "preload.py", tool, "--socket", socket_path]
+                report(tool, [timed_start(command, TOOLS[tool][1]) for _ in range(args.runs)])
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Scaled benchmark suite for the planner, the flight explorer and the recipe generator.
+
+Each tool runs on synthetic data at growing sizes: a destination with `size` activities, hotels
+and dishes; `size` x 100 fares; a cuisine with a `size`-word ingredient vocabulary. Every stage
+reports its best time, its throughput and the peak memory it allocated (tracemalloc, measured in
+a separate run so the timings stay clean). Printing stages write to an in-memory buffer.
+
+    python benchmarks/bench_suite.py --sizes 100 1000 10000
+    python benchmarks/bench_suite.py --save baseline.json
+    python benchmarks/bench_suite.py --compare baseline.json   # exits 1 if a stage got slower
+
+--instrument also prints the per-stage histograms and counters recorded inside the tools
+(see instrumentation.py); TRAVEL_PROFILE=suite.prof profiles the whole run.
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instrumentation
+from dynamic_recipe_generator import RecipeGenerator
+from flexi_date_flexi_destination_flight import FlightExplorer, synthetic_fares
+from surprise_itinerary import TravelPlanner
+
+SYLLABLES = ["ba", "ko", "ri", "ta", "mel", "san", "du", "po", "lin", "ga", "ve", "chi", "mo", "ru", "ne", "shi"]
+START, END = datetime.date(2026, 6, 1), datetime.date(2026, 8, 31)
+REGION = (10, -85, 28, -59)
+
+
+def synthetic_destination(rng, size):
+    return {
+        "activities": [{"name": f"Activity {i}", "rating": round(float(rng.uniform(3.0, 5.0)), 1), "cost": int(rng.integers(0, 120))}
+                       for i in range(size)],
+        "accommodations": [{"name": f"Hotel {i}", "rating": round(float(rng.uniform(3.0, 5.0)), 1),
+                            "price_per_night": int(rng.integers(30, 300))} for i in range(size)],
+        "food": [{"name": f"Dish {i}", "avg_cost": int(rng.integers(3, 40))} for i in range(size)],
+    }
+
+
+def synthetic_vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES, int(rng.integers(2, 5)))))
+    return sorted(words)
+
+
+def synthetic_cuisine(rng, vocabulary):
+    def some(low, high):
+        return [str(word) for word in rng.choice(vocabulary, int(rng.integers(low, high)), replace=False)]
+
+    num_hints = max(4, len(vocabulary) // 4)
+    return {
+        "key_ingredients": [str(word) for word in vocabulary[: len(vocabulary) // 2]],
+        "common_pairings": [tuple(some(2, 3)) for _ in range(max(1, len(vocabulary) // 4))],
+        "recipe_hints": {recipe_type: [{"ingredients": some(2, 5), "description": f"{recipe_type} idea {i}"} for i in range(num_hints // 4)]
+                         for recipe_type in ("pasta", "salad", "curry", "soup")},
+        "meal_starters": {meal: some(2, 4) for meal in ("breakfast", "lunch", "dinner", "snack")},
+    }
+
+
+def pantries(rng, vocabulary, count, size=8):
+    """Ingredient lists as users type them: some plurals, some capitalized, some with a typo."""
+    result = []
+    for _ in range(count):
+        pantry = []
+        for word in rng.choice(vocabulary, size, replace=False):
+            word = str(word)
+            roll = rng.random()
+            if roll < 0.2:
+                word += "s"
+            elif roll < 0.3:
+                word = word.capitalize()
+            elif roll < 0.4 and len(word) > 6:
+                position = int(rng.integers(1, len(word) - 1))
+                word = word[:position] + word[position + 1:]
+            pantry.append(word)
+        result.append(pantry)
+    return result
+
+
+def measure(func, repeats):
+    """(best seconds, peak bytes allocated) for func; memory comes from one extra traced run."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def quietly(func):
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return run
+
+
+def planner_stages(size, rng, num_itineraries=100, num_days=7):
+    planner = TravelPlanner({"synthland": synthetic_destination(rng, size)}, rng=rng)
+    itineraries = planner.generate_multiple_itineraries("synthland", num_itineraries, 150 * num_days, num_days)
+    options = list(planner.iter_all_booking_options(itineraries))
+    return [
+        ("generate_multiple_itineraries", num_itineraries, "itineraries",
+         lambda: planner.generate_multiple_itineraries("synthland", num_itineraries, 150 * num_days, num_days)),
+        ("generate_itineraries_bulk", num_itineraries * 10, "itineraries",
+         lambda: planner.generate_itineraries_bulk("synthland", num_itineraries * 10, 150 * num_days, num_days)),
+        ("get_booking_options", len(options), "options",
+         lambda: [planner.get_booking_options(itinerary) for itinerary in itineraries.values()]),
+        ("display_booking_options", len(options), "options", quietly(lambda: planner.display_booking_options(options))),
+    ]
+
+
+def flight_stages(size, rng):
+    num_rows = size * 100
+    explorer = FlightExplorer(rng=rng)
+
+    def fetch():
+        # fetch_flight_data's body at num_rows rows (the method itself draws 5-20)
+        explorer.flight_data = synthetic_fares(START, END, REGION, 800, num_rows, rng)
+        explorer.fare_store.append(explorer.flight_data)
+
+    fetch()
+    return [
+        ("fetch_flight_data", num_rows, "rows", fetch),
+        ("filter_flights", num_rows, "rows",
+         lambda: explorer.filter_flights(max_budget=400, max_duration_hours=8, max_stops=1, preferred_airlines=["FlyLow", "BudgetAir"])),
+        ("sort_flights", num_rows, "rows", explorer.sort_flights),
+    ]
+
+
+def recipe_stages(size, rng, num_pantries=1000):
+    vocabulary = synthetic_vocabulary(rng, size)
+    cuisine = synthetic_cuisine(rng, vocabulary)
+    typed = pantries(rng, vocabulary, num_pantries)
+    generator = RecipeGenerator({"synthetic": cuisine}, rng=rng)
+    return [
+        ("build normalizer", 1, "builds", lambda: RecipeGenerator({"synthetic": cuisine}, rng=rng).normalizer),
+        ("analyze_ingredients", num_pantries, "pantries", lambda: [generator.analyze_ingredients(pantry, "synthetic") for pantry in typed]),
+        ("analyze_ingredients_batch", num_pantries, "pantries", lambda: generator.analyze_ingredients_batch(typed, "synthetic", True)),
+        ("generate_recipe", num_pantries // 10, "recipes",
+         quietly(lambda: [generator.generate_recipe(pantry, "synthetic", "dinner") for pantry in typed[: num_pantries // 10]])),
+    ]
+
+
+TOOLS = {"planner": planner_stages, "flights": flight_stages, "recipes": recipe_stages}
+
+
+def compare(results, baseline, tolerance):
+    """Stages at least `tolerance` times slower than in baseline."""
+    before = {(entry["tool"], entry["stage"], entry["size"]): entry["seconds"] for entry in baseline}
+    slower = []
+    for entry in results:
+        previous = before.get((entry["tool"], entry["stage"], entry["size"]))
+        if previous and entry["seconds"] > previous * tolerance:
+            slower.append((entry, entry["seconds"] / previous))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and memory of each tool's hot paths at growing sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--tools", nargs="+", choices=list(TOOLS), default=list(TOOLS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--instrument", action="store_true", help="also report the tools' own stage histograms and counters")
+    parser.add_argument("--save", help="write the results as JSON")
+    parser.add_argument("--compare", help="JSON from an earlier --save; exit 1 if any stage got slower")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="slowdown factor that counts as a regression")
+    args = parser.parse_args()
+    if args.instrument:
+        instrumentation.enable()
+
+    results = []
+    print(f"{'tool':<8} {'stage':<30} {'size':>7} {'items':>8} {'best':>10} {'throughput':>22} {'peak alloc':>11}")
+    for tool in args.tools:
+        for size in args.sizes:
+            rng = np.random.default_rng(args.seed)
+            for stage, items, unit, func in TOOLS[tool](size, rng):
+                seconds, peak = measure(func, args.repeats)
+                results.append({"tool": tool, "stage": stage, "size": size, "items": items, "seconds": seconds, "peak_bytes": peak})
+                print(f"{tool:<8} {stage:<30} {size:>7,} {items:>8,} {seconds * 1000:>8.1f} ms {items / seconds:>14,.0f} {unit:<7}"
+                      f" {peak / 2 ** 20:>8.1f} MB")
+    print(f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    if args.instrument:
+        print()
+        instrumentation.report(sys.stdout)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            slower = compare(results, json.load(f), args.tolerance)
+        for entry, factor in slower:
+            print(f"REGRESSION {entry['tool']} {entry['stage']} at size {entry['size']:,}: {factor:.2f}x slower")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Times TripBundlePlanner over a synthetic catalog of many destinations and a fare store with
+fares to all of them, with early cutoff against planning every candidate.
+
+    python benchmarks/bench_trip_bundles.py --destinations 2000 --days 60 --fares-per-day 3
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fare_store import FareStore
+from flexi_date_flexi_destination_flight import FlightExplorer
+from surprise_itinerary import TravelPlanner
+from trip_bundles import TripBundlePlanner
+
+REGION = (30, -20, 60, 40)
+
+
+def make_catalog(num_destinations, rng):
+    catalog = {}
+    for i in range(num_destinations):
+        scale = rng.uniform(0.5, 3)
+        catalog[f"destination {i}"] = {
+            "latitude": float(rng.uniform(REGION[0], REGION[2])), "longitude": float(rng.uniform(REGION[1], REGION[3])),
+            "activities": [{"name": f"activity {j}", "rating": round(float(rng.uniform(3, 5)), 1), "cost": round(float(rng.uniform(0, 60) * scale))}
+                           for j in range(6)],
+            "accommodations": [{"name": f"hotel {j}", "rating": round(float(rng.uniform(3, 5)), 1),
+                                "price_per_night": round(float(rng.uniform(30, 200) * scale))} for j in range(4)],
+            "food": [{"name": f"dish {j}", "avg_cost": round(float(rng.uniform(5, 40) * scale))} for j in range(5)],
+        }
+    return catalog
+
+
+def make_fares(catalog, start_date, num_days, fares_per_day, rng):
+    names = list(catalog)
+    size = len(names) * num_days * fares_per_day
+    city = rng.integers(0, len(names), size)
+    departures = np.datetime64(start_date, "D").astype("datetime64[h]") + rng.integers(0, num_days * 24, size).astype("timedelta64[h]")
+    return pd.DataFrame({
+        "departure_date": departures.astype("datetime64[ns]"),
+        "arrival_date": (departures + rng.integers(2, 8, size).astype("timedelta64[h]")).astype("datetime64[ns]"),
+        "price": rng.uniform(40, 900, size),
+        "latitude": np.array([catalog[name]["latitude"] for name in names])[city],
+        "longitude": np.array([catalog[name]["longitude"] for name in names])[city],
+        "destination_city": pd.Categorical.from_codes(city, names),
+        "airline": pd.Categorical.from_codes(rng.integers(0, 3, size), ["BudgetAir", "FlyLow", "CheapWings"]),
+        "stops": rng.integers(0, 3, size),
+    })
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<50} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--destinations", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--fares-per-day", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=1500)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--exhaustive", action="store_true", help="also plan every destination x day candidate (slow)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    catalog = make_catalog(args.destinations, rng)
+    start_date = datetime.date(2026, 3, 1)
+    end_date = start_date + datetime.timedelta(days=args.days - 1)
+    explorer = FlightExplorer(fare_store=FareStore())
+    explorer.fare_store.append(make_fares(catalog, start_date, args.days, args.fares_per_day, rng))
+    explorer.fare_store.frame  # consolidate before timing
+    bundles = TripBundlePlanner(explorer, TravelPlanner(catalog, rng=0))
+    print(f"{len(explorer.fare_store):,} fares, {args.destinations:,} destinations x {args.days} days")
+
+    bundles.index  # built once, then reused
+    for distinct in (True, False):
+        label = "per destination" if distinct else "per destination x day"
+        candidates = timed(f"candidates ({label})", lambda: bundles.candidates(start_date, end_date, REGION, args.budget, 4, distinct))
+        top = timed(f"plan top {args.k}, early cutoff ({len(candidates):,} candidates)",
+                    lambda: bundles.plan(start_date, end_date, REGION, args.budget, 4, args.k, "optimized", distinct_destinations=distinct))
+        if distinct or args.exhaustive:
+            everything = timed("plan every candidate",
+                               lambda: bundles.plan(start_date, end_date, REGION, args.budget, 4, len(candidates), "optimized",
+                                                    distinct_destinations=distinct))
+            assert [b.total_cost for b in top] == [b.total_cost for b in everything[:args.k]]
+    print("cheapest:", top[0].destination, f"${top[0].total_cost:.2f} (flight ${top[0].flight_cost:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Load test for travel_server: keeps --concurrency keep-alive connections busy with a mix of
+requests and reports requests/sec and p50/p99 latency per endpoint.
+
+    python benchmarks/load_test_server.py --requests 2000 --concurrency 32 --workers 4
+    python benchmarks/load_test_server.py --url http://127.0.0.1:8080   # against a running server
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from travel_server import TravelServer
+
+REQUEST_MIX = [
+    ("GET", "/health", None),
+    ("POST", "/itineraries", {"destination": "bahrain", "budget": 800, "num_days": 4, "num_itineraries": 3}),
+    ("POST", "/itineraries", {"destination": "bahrain", "budget": 800, "num_days": 4, "num_itineraries": 3, "strategy": "optimized"}),
+    ("POST", "/flights/search", {"dates": "next month", "region": "southern europe", "budget": 400, "max_stops": 1}),
+    ("POST", "/recipes", {"ingredients": ["tomato", "garlic", "basil", "pasta"], "cuisine": "italian"}),
+]
+
+
+async def request(reader, writer, host, method, path, payload):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def run_load(host, port, num_requests, concurrency):
+    latencies = {path: [] for _, path, _ in REQUEST_MIX}
+    failures = 0
+    counter = iter(range(num_requests))
+
+    async def client():
+        nonlocal failures
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in counter:
+                method, path, payload = REQUEST_MIX[i % len(REQUEST_MIX)]
+                start = time.perf_counter()
+                status = await request(reader, writer, host, method, path, payload)
+                latencies[path].append(time.perf_counter() - start)
+                failures += status != 200
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies, failures
+
+
+def report(elapsed, latencies, failures):
+    total = sum(len(values) for values in latencies.values())
+    print(f"{total:,} requests in {elapsed:.2f} s: {total / elapsed:,.0f} requests/sec, {failures} non-200")
+    print(f"{'endpoint':<20} {'count':>7} {'p50 ms':>9} {'p99 ms':>9}")
+    for path, values in latencies.items():
+        if values:
+            p50, p99 = np.percentile(np.array(values) * 1000, [50, 99])
+            print(f"{path:<20} {len(values):>7} {p50:>9.2f} {p99:>9.2f}")
+    everything = np.concatenate([np.array(values) for values in latencies.values() if values]) * 1000
+    print(f"{'all':<20} {len(everything):>7} {np.percentile(everything, 50):>9.2f} {np.percentile(everything, 99):>9.2f}")
+
+
+async def main_async(args):
+    if args.url:
+        url = urlsplit(args.url)
+        report(*await run_load(url.hostname, url.port or 80, args.requests, args.concurrency))
+        return
+    server = TravelServer(args.workers, seed=0)
+    listener = await server.start("127.0.0.1", 0)
+    try:
+        port = listener.sockets[0].getsockname()[1]
+        await run_load("127.0.0.1", port, min(args.requests, 50), args.concurrency)  # warm up workers
+        report(*await run_load("127.0.0.1", port, args.requests, args.concurrency))
+    finally:
+        listener.close()
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="load-test a running server instead of starting one")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Minimal keep-alive HTTP server that answers HttpFareProvider requests with simulated fares.
+Latency and failure rate can be injected to exercise timeouts, retries and concurrency limits.
+
+    python benchmarks/stub_fare_server.py --port 8765 --latency 0.05 --failure-rate 0.1
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flexi_date_flexi_destination_flight import synthetic_fares
+
+
+async def start_stub_server(host="127.0.0.1", port=0, latency=0.0, failure_rate=0.0, seed=0):
+    """Starts the server and returns the asyncio.Server; port 0 picks a free port."""
+    rng = np.random.default_rng(seed)
+
+    async def respond(writer, status, body):
+        reason = {200: "OK", 400: "Bad Request", 503: "Service Unavailable"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                query = parse_qs(urlsplit(request_line.split()[1].decode()).query)
+                if latency:
+                    await asyncio.sleep(latency)
+                if rng.random() < failure_rate:
+                    await respond(writer, 503, b"[]")
+                    continue
+                try:
+                    day = datetime.date.fromisoformat(query["date"][0])
+                    region = tuple(float(query[key][0]) for key in ("min_lat", "min_lon", "max_lat", "max_lon"))
+                    budget = float(query["budget"][0])
+                except (KeyError, ValueError):
+                    await respond(writer, 400, b"[]")
+                    continue
+                fares = synthetic_fares(day, day, region, budget, int(rng.integers(5, 21)), rng)
+                body = fares.astype({"departure_date": str, "arrival_date": str, "destination_city": str, "airline": str}).to_json(orient="records")
+                await respond(writer, 200, body.encode())
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def serve_forever(args):
+    server = await start_stub_server(args.host, args.port, args.latency, args.failure_rate)
+    print(f"Stub fare server on http://{args.host}:{server.sockets[0].getsockname()[1]}/fares")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    asyncio.run(serve_forever(parser.parse_args()))
@@ -0,0 +1,211 @@
+"""
+Booking inventory: per-item, per-night stock with holds that expire.
+
+Stock is a counter per (item, night), where a night is a calendar date (datetime.date). A hold
+takes units on one or more (item, night) slots all-or-nothing; it then either gets confirmed or
+releases its units, and a hold that is neither confirmed nor released before its expiry is
+released automatically. Released and expired holds are forgotten, so only live holds and bookings
+stay in memory (and in sqlite). Counters are guarded by striped locks: an operation locks only the stripes its
+slots hash to, always in ascending order, so bookings of different hotels don't wait on each
+other and can't deadlock. Every critical section is short and never blocks, so the same object is
+safe to use from threads and from asyncio code.
+
+With a path, holds are also written through to sqlite (WAL mode) and replayed on startup.
+"""
+import datetime
+import heapq
+import itertools
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+HELD, CONFIRMED, RELEASED, EXPIRED = "held", "confirmed", "released", "expired"
+
+
+def _night_key(night):
+    return night.isoformat()
+
+
+@dataclass(slots=True)
+class Hold:
+    hold_id: str
+    slots: tuple  # of (item, night as datetime.date, quantity)
+    expires: float
+    state: str = HELD
+
+
+class BookingInventory:
+    def __init__(self, default_capacity=20, hold_ttl=10 * 60, num_stripes=64, path=None, clock=time.time):
+        self.default_capacity = default_capacity
+        self.hold_ttl = hold_ttl
+        self.clock = clock
+        self._stripes = [threading.Lock() for _ in range(num_stripes)]
+        self._capacity = {}  # item -> units per night
+        self._used = {}  # (item, night) -> units held or confirmed
+        self._holds = {}
+        self._expiry = []  # heap of (expires, sequence, hold_id)
+        self._expiry_lock = threading.Lock()
+        self._next_expiry = float("inf")  # read without the lock, so expire() is free when nothing is due
+        self._sequence = itertools.count()
+        self._db = None
+        self._db_lock = threading.Lock()
+        if path:
+            self._open(path)
+
+    def _stripe_ids(self, slots):
+        return sorted({hash((item, night)) % len(self._stripes) for item, night, _ in slots})
+
+    def _lock(self, stripe_ids):
+        for stripe_id in stripe_ids:
+            self._stripes[stripe_id].acquire()
+
+    def _unlock(self, stripe_ids):
+        for stripe_id in reversed(stripe_ids):
+            self._stripes[stripe_id].release()
+
+    def set_capacity(self, item, capacity):
+        self._capacity[item] = capacity
+        self._persist("INSERT OR REPLACE INTO capacity VALUES (?, ?)", (item, capacity))
+
+    def ensure_item(self, item, capacity=None):
+        """Registers item with capacity unless it is already known."""
+        if item not in self._capacity:
+            self.set_capacity(item, self.default_capacity if capacity is None else capacity)
+
+    def capacity(self, item):
+        return self._capacity.get(item, self.default_capacity)
+
+    def available(self, item, night):
+        """Units of item still free on night (after releasing expired holds)."""
+        self.expire()
+        return self.capacity(item) - self._used.get((item, night), 0)
+
+    def hold(self, slots, ttl=None):
+        """
+        Holds quantity units of every (item, night, quantity) in slots, all or nothing.
+        Returns the hold ID, or None if any slot doesn't have enough units left.
+        """
+        slots = tuple((item, night, int(quantity)) for item, night, quantity in slots)
+        if not slots:
+            return None
+        self.expire()
+        stripe_ids = self._stripe_ids(slots)
+        self._lock(stripe_ids)
+        try:
+            demand = {}
+            for item, night, quantity in slots:
+                demand[(item, night)] = demand.get((item, night), 0) + quantity
+            if any(self._used.get(slot, 0) + quantity > self.capacity(slot[0]) for slot, quantity in demand.items()):
+                return None
+            hold = Hold(uuid.uuid4().hex, slots, self.clock() + (ttl or self.hold_ttl))
+            # Written through first, so a failed write leaves no units taken.
+            self._persist_hold(hold)
+            for slot, quantity in demand.items():
+                self._used[slot] = self._used.get(slot, 0) + quantity
+            self._holds[hold.hold_id] = hold
+        finally:
+            self._unlock(stripe_ids)
+        with self._expiry_lock:
+            heapq.heappush(self._expiry, (hold.expires, next(self._sequence), hold.hold_id))
+            self._next_expiry = self._expiry[0][0]
+        return hold.hold_id
+
+    def _finish(self, hold_id, from_states, to_state, give_back):
+        hold = self._holds.get(hold_id)
+        if hold is None:
+            return False
+        stripe_ids = self._stripe_ids(hold.slots)
+        self._lock(stripe_ids)
+        try:
+            if hold.state not in from_states:
+                return False
+            requested = to_state
+            if to_state == CONFIRMED and hold.expires <= self.clock():
+                to_state, give_back = EXPIRED, True
+            if give_back:
+                for item, night, quantity in hold.slots:
+                    self._used[(item, night)] -= quantity
+            hold.state = to_state
+            self._persist_hold(hold)
+            if to_state in (RELEASED, EXPIRED):
+                self._holds.pop(hold_id, None)
+            return to_state == requested
+        finally:
+            self._unlock(stripe_ids)
+
+    def confirm(self, hold_id):
+        """Turns a live hold into a booking. False if it is unknown, already finished or has expired."""
+        return self._finish(hold_id, (HELD,), CONFIRMED, give_back=False)
+
+    def release(self, hold_id):
+        """Gives back the units of a hold or a confirmed booking (a cancellation). False if there was nothing to release."""
+        return self._finish(hold_id, (HELD, CONFIRMED), RELEASED, give_back=True)
+
+    def state(self, hold_id):
+        """HELD or CONFIRMED for a live hold; None once it is released, expired or if it never existed."""
+        hold = self._holds.get(hold_id)
+        return hold.state if hold else None
+
+    def expire(self, now=None):
+        """Releases every hold past its expiry; returns how many were released."""
+        now = self.clock() if now is None else now
+        if self._next_expiry > now:
+            return 0
+        expired = []
+        with self._expiry_lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expired.append(heapq.heappop(self._expiry)[2])
+            self._next_expiry = self._expiry[0][0] if self._expiry else float("inf")
+        return sum(self._finish(hold_id, (HELD,), EXPIRED, give_back=True) for hold_id in expired)
+
+    def _open(self, path):
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS capacity (item TEXT PRIMARY KEY, capacity INTEGER NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS holds (hold_id TEXT, item TEXT, night TEXT, quantity INTEGER, expires REAL, state TEXT)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS holds_by_id ON holds (hold_id)")
+        # Finished holds from before holds were deleted on release.
+        self._db.execute("DELETE FROM holds WHERE state NOT IN (?, ?)", (HELD, CONFIRMED))
+        self._capacity.update(self._db.execute("SELECT item, capacity FROM capacity"))
+        live = self._db.execute("SELECT hold_id, item, night, quantity, expires, state FROM holds")
+        for hold_id, rows in itertools.groupby(sorted(live), key=lambda row: row[0]):
+            rows = list(rows)
+            hold = Hold(hold_id, tuple((item, datetime.date.fromisoformat(night), quantity) for _, item, night, quantity, _, _ in rows), rows[0][4], rows[0][5])
+            self._holds[hold_id] = hold
+            for item, night, quantity in hold.slots:
+                self._used[(item, night)] = self._used.get((item, night), 0) + quantity
+            if hold.state == HELD:
+                heapq.heappush(self._expiry, (hold.expires, next(self._sequence), hold_id))
+        self._next_expiry = self._expiry[0][0] if self._expiry else float("inf")
+
+    def _persist(self, sql, parameters):
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(sql, parameters)
+
+    def _persist_hold(self, hold):
+        if self._db is None:
+            return
+        with self._db_lock:
+            if hold.state == HELD:
+                self._db.execute("BEGIN")
+                try:
+                    self._db.executemany("INSERT INTO holds VALUES (?, ?, ?, ?, ?, ?)",
+                                         [(hold.hold_id, item, _night_key(night), quantity, hold.expires, hold.state)
+                                          for item, night, quantity in hold.slots])
+                    self._db.execute("COMMIT")
+                except BaseException:
+                    self._db.execute("ROLLBACK")
+                    raise
+            elif hold.state == CONFIRMED:
+                self._db.execute("UPDATE holds SET state = ? WHERE hold_id = ?", (hold.state, hold.hold_id))
+            else:
+                self._db.execute("DELETE FROM holds WHERE hold_id = ?", (hold.hold_id,))
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,181 @@
+"""
+On-disk catalogs for the recipe generator and the travel planner.
+
+The seed data lives in data/cuisines.json and data/destinations.json. On first use
+it is compiled into a single sqlite file that is opened read-only and memory-mapped,
+so workers forked from the same server share its pages through the OS page cache.
+Entries are decoded lazily, the first time a cuisine or destination is looked up. Catalog-wide
+term lists (every ingredient of every cuisine) are stored alongside, so building a vocabulary
+doesn't decode every entry.
+"""
+import json
+import os
+import sqlite3
+from collections.abc import MutableMapping
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_DB_PATH = os.environ.get("CATALOG_DB", os.path.join(DATA_DIR, "catalog.sqlite"))
+SEED_FILES = {"cuisines": "cuisines.json", "destinations": "destinations.json"}
+MMAP_SIZE = 256 * 1024 * 1024
+# Bumped whenever the file's tables change, so catalogs built by older code get rebuilt.
+SCHEMA_VERSION = 2
+
+
+def cuisine_ingredients(cuisine_info):
+    """Every ingredient a cuisine mentions (key ingredients, pairings, recipe hints), in catalog order."""
+    yield from cuisine_info.get("key_ingredients", [])
+    for pair in cuisine_info.get("common_pairings", []):
+        yield from pair
+    for hints in cuisine_info.get("recipe_hints", {}).values():
+        for hint in hints:
+            yield from hint["ingredients"]
+
+
+# kind -> function listing an entry's terms, stored per kind in the terms table (see LazyCatalog.terms).
+TERM_EXTRACTORS = {"cuisines": cuisine_ingredients}
+
+
+def build_catalog(db_path=DEFAULT_DB_PATH, seed_dir=DATA_DIR):
+    """Compiles the JSON seed files into a sqlite catalog at db_path."""
+    tmp_path = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("CREATE TABLE entries (kind TEXT, name TEXT, position INTEGER, payload TEXT, PRIMARY KEY (kind, name)) WITHOUT ROWID")
+        conn.execute("CREATE TABLE terms (kind TEXT, position INTEGER, term TEXT, PRIMARY KEY (kind, position)) WITHOUT ROWID")
+        for kind, file_name in SEED_FILES.items():
+            seed_path = os.path.join(seed_dir, file_name)
+            if not os.path.exists(seed_path):
+                continue
+            with open(seed_path, encoding="utf-8") as f:
+                entries = json.load(f)
+            conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?)",
+                             [(kind, name.lower(), position, json.dumps(entry, separators=(",", ":")))
+                              for position, (name, entry) in enumerate(entries.items())])
+            extract = TERM_EXTRACTORS.get(kind)
+            if extract:
+                terms = dict.fromkeys(term for entry in entries.values() for term in extract(entry))
+                conn.executemany("INSERT INTO terms VALUES (?, ?, ?)", [(kind, position, term) for position, term in enumerate(terms)])
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        conn.commit()
+    finally:
+        conn.close()
+    # Atomic so that several workers racing to build the file never see a partial one.
+    os.replace(tmp_path, db_path)
+    return db_path
+
+
+def _is_stale(db_path, seed_dir=DATA_DIR):
+    """True if db_path is missing, older than a seed file it was compiled from or built with another schema."""
+    if not os.path.exists(db_path):
+        return True
+    built = os.path.getmtime(db_path)
+    if any(os.path.getmtime(path) > built for path in (os.path.join(seed_dir, name) for name in SEED_FILES.values())
+           if os.path.exists(path)):
+        return True
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION
+    finally:
+        conn.close()
+
+
+class LazyCatalog(MutableMapping):
+    """
+    Dict-like view of one kind of catalog entry ("cuisines" or "destinations").
+    Reads go to the sqlite file on first access and are cached; writes stay in memory.
+    """
+
+    def __init__(self, kind, db_path=None, decode=None):
+        self.kind = kind
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self.decode = decode
+        self._cache = {}
+        self._written = {}  # names set in memory (whose terms aren't in the file), as an ordered set
+        self._deleted = set()
+        self._conn = None
+        self._conn_pid = None
+
+    def _connection(self):
+        # sqlite connections must not be shared across fork, so reopen per process.
+        if self._conn is None or self._conn_pid != os.getpid():
+            if _is_stale(self.db_path):
+                build_catalog(self.db_path)
+            self._conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            self._conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def __getstate__(self):
+        # Lets a catalog be sent to process-pool workers; they reopen the file themselves.
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_conn_pid"] = None
+        return state
+
+    def __getitem__(self, name):
+        if name in self._cache:
+            return self._cache[name]
+        if name in self._deleted:
+            raise KeyError(name)
+        row = self._connection().execute("SELECT payload FROM entries WHERE kind = ? AND name = ?", (self.kind, name)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        entry = json.loads(row[0])
+        if self.decode:
+            entry = self.decode(entry)
+        self._cache[name] = entry
+        return entry
+
+    def __setitem__(self, name, entry):
+        self._cache[name] = entry
+        self._written[name] = None
+        self._deleted.discard(name)
+
+    def __delitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        self._cache.pop(name, None)
+        self._written.pop(name, None)
+        self._deleted.add(name)
+
+    def __contains__(self, name):
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def _stored_names(self):
+        rows = self._connection().execute("SELECT name FROM entries WHERE kind = ? ORDER BY position", (self.kind,))
+        return [name for (name,) in rows]
+
+    def terms(self):
+        """
+        Every term of every entry (e.g. each ingredient of each cuisine), stored ones first, without
+        decoding any stored entry. Terms of deleted stored entries are still listed.
+        """
+        rows = self._connection().execute("SELECT term FROM terms WHERE kind = ? ORDER BY position", (self.kind,))
+        terms = [term for (term,) in rows]
+        extract = TERM_EXTRACTORS.get(self.kind)
+        if extract:
+            for name in self._written:
+                terms.extend(extract(self._cache[name]))
+        return terms
+
+    def __iter__(self):
+        seen = set()
+        for name in self._stored_names():
+            if name not in self._deleted:
+                seen.add(name)
+                yield name
+        for name in list(self._cache):
+            if name not in seen:
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"LazyCatalog({self.kind!r}, {self.db_path!r})"
@@ -0,0 +1,300 @@
+"""
+Flexible date phrases ("next month", "long weekend in the fall", "christmas 2027", "next 2 weekends",
+"within the next 4 weeks") resolved to date windows.
+
+The grammar is a short list of regular expressions compiled at import and tried from the most to
+the least specific. A weekend (plain or "long") is a Friday-to-Sunday trip; "holiday long weekend"
+asks for the weekends a holiday makes longer. Weekends, holidays and holiday long weekends for the
+next few years are precomputed into a calendar table, so resolving a phrase is a table lookup (a
+binary search over window start dates). Results are memoized per (phrase, today), and parse_many
+resolves a whole query log at once.
+"""
+import calendar
+import datetime
+import re
+from functools import lru_cache
+
+import numpy as np
+
+MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+# Meteorological seasons (northern hemisphere): first month and number of months.
+SEASONS = {"spring": (3, 3), "summer": (6, 3), "fall": (9, 3), "autumn": (9, 3), "winter": (12, 3)}
+UNITS = {"day": 1, "week": 7}
+NUMBER_WORDS = {"a": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+                "eleven": 11, "twelve": 12}
+
+
+def _easter(year):
+    # Anonymous Gregorian computus.
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    return datetime.date(year, month, (h + l - 7 * m + 114) % 31 + 1)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """n-th (1-based, or -1 for last) given weekday of a month."""
+    days = [day for day in calendar.Calendar().itermonthdates(year, month) if day.month == month and day.weekday() == weekday]
+    return days[n - 1] if n > 0 else days[n]
+
+
+HOLIDAYS = {
+    "new year": lambda year: datetime.date(year, 1, 1),
+    "valentine": lambda year: datetime.date(year, 2, 14),
+    "easter": _easter,
+    "memorial day": lambda year: _nth_weekday(year, 5, calendar.MONDAY, -1),
+    "independence day": lambda year: datetime.date(year, 7, 4),
+    "labor day": lambda year: _nth_weekday(year, 9, calendar.MONDAY, 1),
+    "halloween": lambda year: datetime.date(year, 10, 31),
+    "thanksgiving": lambda year: _nth_weekday(year, 11, calendar.THURSDAY, 4),
+    "christmas": lambda year: datetime.date(year, 12, 25),
+}
+HOLIDAY_ALIASES = {"new year's": "new year", "new years": "new year", "valentine's": "valentine", "valentines": "valentine",
+                   "4th of july": "independence day", "fourth of july": "independence day", "july 4th": "independence day",
+                   "july fourth": "independence day", "xmas": "christmas"}
+
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+_SEASON = "|".join(SEASONS)
+# Escaped, since the pattern is compiled with re.VERBOSE and would otherwise drop the spaces.
+_HOLIDAY = "|".join(re.escape(name) for name in sorted(list(HOLIDAYS) + list(HOLIDAY_ALIASES), key=len, reverse=True))
+_NUMBER = r"\d+|" + "|".join(NUMBER_WORDS)
+_ISO = r"\d{4}-\d{2}-\d{2}"
+_YEAR = r"(?:\s+(?P<year>\d{4}))?"
+
+# Tried in this order, and the first pattern found anywhere in the phrase wins, so a more specific
+# phrase is never shadowed by a shorter one that happens to start earlier ("fall weekend" is the
+# weekends of the fall, not the fall; "next 2 weekends" is two weekends, not two weeks).
+PHRASE_PATTERNS = {name: re.compile(pattern, re.VERBOSE) for name, pattern in {
+    "iso": rf"(?P<iso_start>{_ISO})\s*(?:to|-|until|through)\s*(?P<iso_end>{_ISO})",
+    "holiday_weekend": rf"\b(?P<holiday>{_HOLIDAY})\s+(?:long\s+)?weekend\b{_YEAR}",
+    "relative_weekend": r"\b(?P<when>this|next)\s+(?:long\s+)?weekend\b",
+    "weekend": rf"""
+        (?:(?:next|coming)\s+(?P<count>{_NUMBER})\s+)?
+        (?:(?P<season_before>{_SEASON})(?:\s+(?P<year_before>\d{{4}}))?\s+
+           |\b(?P<month_before>{_MONTH})(?:\s+(?P<year_before_month>\d{{4}}))?\s+)?
+        (?P<holiday_long>holiday\s+)?(?:long\s+)?weekends?\b
+        (?:\s+(?:in|during|of)\s+(?:the\s+)?(?:(?P<season>{_SEASON})|(?P<month>{_MONTH})\b){_YEAR})?""",
+    "span": rf"(?:within\s+the\s+|in\s+the\s+|over\s+the\s+)?(?:next|coming)\s+(?P<count>{_NUMBER})\s+(?P<unit>day|week|month)s?\b",
+    "offset": rf"\bin\s+(?P<count>{_NUMBER})\s+(?P<unit>day|week|month)s?\b",
+    "holiday": rf"\b(?P<holiday>{_HOLIDAY})\b{_YEAR}",
+    "relative": r"\b(?P<when>this|next)\s+(?P<unit>week|month|year)\b",
+    "season": rf"(?:\b(?P<when>this|next)\s+)?(?:the\s+)?\b(?P<season>{_SEASON})\b{_YEAR}",
+    "month": rf"(?:\b(?P<when>this|next)\s+)?\b(?P<month>{_MONTH})\b{_YEAR}",
+}.items()}
+
+
+def _number(text):
+    return int(text) if text.isdigit() else NUMBER_WORDS[text]
+
+
+def _month_window(year, month):
+    return datetime.date(year, month, 1), datetime.date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _add_months(day, months):
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+class DateCalendar:
+    """Weekends, holidays and holiday long weekends for a span of years, as sorted NumPy date arrays."""
+
+    def __init__(self, first_year, num_years=3):
+        self.first_year = first_year
+        self.last_year = first_year + num_years - 1
+        first_day = np.datetime64(f"{first_year}-01-01")
+        days = np.arange(first_day, np.datetime64(f"{self.last_year + 1}-01-01"))
+        weekday = (days.astype("datetime64[D]").view("int64") + 3) % 7  # 1970-01-01 was a Thursday
+        # A weekend is a Friday-to-Sunday trip.
+        fridays = days[weekday == 4]
+        self.weekends = np.stack([fridays, fridays + 2], axis=1)
+
+        self.holidays = {name: [rule(year) for year in range(first_year, self.last_year + 1)] for name, rule in HOLIDAYS.items()}
+        holiday_days = np.array(sorted({np.datetime64(day) for dates in self.holidays.values() for day in dates}), dtype="datetime64[D]")
+        # A holiday long weekend is a weekend with a holiday on its Friday, on the Monday after it (which
+        # extends it to the Monday) or on the Thursday before it (Thanksgiving, which adds the Thursday).
+        thursday_off = np.isin(fridays - 1, holiday_days)
+        friday_off = np.isin(fridays, holiday_days)
+        monday_off = np.isin(fridays + 3, holiday_days)
+        starts = np.where(thursday_off, fridays - 1, fridays)
+        ends = np.where(monday_off, fridays + 3, fridays + 2)
+        is_long = thursday_off | friday_off | monday_off
+        self.long_weekends = np.stack([starts[is_long], ends[is_long]], axis=1)
+
+    def covers(self, day):
+        return self.first_year <= day.year and day.year + 1 <= self.last_year
+
+    def spans(self, start, end):
+        return self.first_year <= start.year and end.year <= self.last_year
+
+    @staticmethod
+    def _windows_between(table, start, end):
+        """Rows of a [start, end] window table whose start falls in [start, end]."""
+        first = np.searchsorted(table[:, 0], np.datetime64(start), side="left")
+        last = np.searchsorted(table[:, 0], np.datetime64(end), side="right")
+        return [(window_start.item(), window_end.item()) for window_start, window_end in table[first:last]]
+
+    def weekends_between(self, start, end, long=False):
+        return self._windows_between(self.long_weekends if long else self.weekends, start, end)
+
+    def weekends_from(self, day, count):
+        """The first count weekends not over by day; the one under way starts at day."""
+        first = np.searchsorted(self.weekends[:, 1], np.datetime64(day), side="left")
+        return [(max(start.item(), day), end.item()) for start, end in self.weekends[first:first + count]]
+
+    def next_holiday(self, name, today):
+        return next((day for day in self.holidays[name] if day >= today), None)
+
+
+class FlexibleDateParser:
+    """Resolves flexible date phrases against a DateCalendar covering num_years from today."""
+
+    def __init__(self, num_years=3):
+        self.num_years = num_years
+        self._calendar = None
+        self._parse_cached = lru_cache(maxsize=4096)(self._resolve)
+
+    def calendar_for(self, today):
+        if self._calendar is None or not self._calendar.covers(today):
+            self._calendar = DateCalendar(today.year, self.num_years)
+        return self._calendar
+
+    def _calendar_spanning(self, start, end, today):
+        """The calendar for today, or a one-off one when an explicit year falls outside it."""
+        calendar_ = self.calendar_for(today)
+        return calendar_ if calendar_.spans(start, end) else DateCalendar(start.year, end.year - start.year + 1)
+
+    def parse_windows(self, date_input, today=None):
+        """All date windows the phrase refers to, as a tuple of (start_date, end_date); empty if not understood."""
+        today = today or datetime.date.today()
+        return self._parse_cached(" ".join(date_input.lower().split()), today)
+
+    def parse(self, date_input, today=None):
+        """(start_date, end_date) of the first window, or (None, None)."""
+        windows = self.parse_windows(date_input, today)
+        return windows[0] if windows else (None, None)
+
+    def parse_many(self, date_inputs, today=None):
+        """parse for a batch of phrases (e.g. a query log); repeated phrases are resolved once."""
+        today = today or datetime.date.today()
+        resolved = {}
+        for date_input in date_inputs:
+            if date_input not in resolved:
+                resolved[date_input] = self.parse(date_input, today)
+        return [resolved[date_input] for date_input in date_inputs]
+
+    def _upcoming_season(self, season, today, when=None, year=None):
+        first_month, num_months = SEASONS[season]
+        if year:
+            start = datetime.date(int(year), first_month, 1)
+            return start, _add_months(start, num_months) - datetime.timedelta(days=1)
+        year = today.year - 1 if first_month == 12 and today.month < 3 else today.year
+        start = datetime.date(year, first_month, 1)
+        end = _add_months(start, num_months) - datetime.timedelta(days=1)
+        if end < today or when == "next":
+            start = start.replace(year=start.year + 1)
+            end = _add_months(start, num_months) - datetime.timedelta(days=1)
+        return max(start, today), end
+
+    def _upcoming_month(self, month, today, when=None, year=None):
+        if year:
+            return _month_window(int(year), month)
+        start, end = _month_window(today.year, month)
+        if end < today or (when == "next" and month <= today.month):
+            start, end = _month_window(today.year + 1, month)
+        return max(start, today), end
+
+    def _resolve(self, phrase, today):
+        for name, pattern in PHRASE_PATTERNS.items():
+            match = pattern.search(phrase)
+            if match:
+                return getattr(self, f"_resolve_{name}")(match.groupdict(), today)
+        return ()
+
+    def _resolve_iso(self, groups, today):
+        return ((datetime.date.fromisoformat(groups["iso_start"]), datetime.date.fromisoformat(groups["iso_end"])),)
+
+    def _holiday_day(self, name, year, today):
+        if year:
+            return HOLIDAYS[name](int(year))
+        day = self.calendar_for(today).next_holiday(name, today)
+        return HOLIDAYS[name](today.year + 1) if day is None else day
+
+    def _resolve_holiday_weekend(self, groups, today):
+        """
+        The weekend a holiday falls on or next to ("labor day weekend", "thanksgiving weekend 2027"):
+        a Monday or Tuesday holiday extends the weekend before it, a Wednesday or Thursday one starts
+        the weekend after it early, and a Friday-to-Sunday one is that weekend.
+        """
+        day = self._holiday_day(HOLIDAY_ALIASES.get(groups["holiday"], groups["holiday"]), groups["year"], today)
+        weekday = day.weekday()
+        if weekday <= calendar.TUESDAY:
+            return ((day - datetime.timedelta(days=weekday + 3), day),)
+        if weekday <= calendar.THURSDAY:
+            return ((day, day + datetime.timedelta(days=calendar.SUNDAY - weekday)),)
+        friday = day - datetime.timedelta(days=weekday - calendar.FRIDAY)
+        return ((friday, friday + datetime.timedelta(days=2)),)
+
+    def _resolve_relative_weekend(self, groups, today):
+        # "this weekend" is the one under way or coming up; "next weekend" is the one after it.
+        windows = self.calendar_for(today).weekends_from(today, 2)
+        return (windows[1 if groups["when"] == "next" else 0],)
+
+    def _resolve_weekend(self, groups, today):
+        """
+        Friday-to-Sunday weekends ("weekend", "long weekend", "next 2 weekends", "fall weekend",
+        "a weekend in december 2027"), or weekends made longer by a holiday ("holiday long weekends in
+        the fall"), from today on.
+        """
+        season, month = groups["season"] or groups["season_before"], groups["month"] or groups["month_before"]
+        year = groups["year"] or groups["year_before"] or groups["year_before_month"]
+        if season:
+            scope = self._upcoming_season(season, today, year=year)
+        elif month:
+            scope = self._upcoming_month(MONTHS[month], today, year=year)
+        else:
+            scope = (today, _add_months(today, 12))
+        windows = self._calendar_spanning(scope[0], scope[1], today).weekends_between(scope[0], scope[1], long=bool(groups["holiday_long"]))
+        if groups["count"]:
+            windows = windows[:_number(groups["count"])]
+        return tuple(windows)
+
+    def _resolve_span(self, groups, today):
+        count, unit = _number(groups["count"]), groups["unit"]
+        return ((today, _add_months(today, count) if unit == "month" else today + datetime.timedelta(days=count * UNITS[unit])),)
+
+    def _resolve_offset(self, groups, today):
+        # "in 3 weeks" is the week starting then, not everything until then.
+        count, unit = _number(groups["count"]), groups["unit"]
+        start = _add_months(today, count) if unit == "month" else today + datetime.timedelta(days=count * UNITS[unit])
+        span_end = _add_months(start, 1) if unit == "month" else start + datetime.timedelta(days=UNITS[unit])
+        return ((start, max(start, span_end - datetime.timedelta(days=1))),)
+
+    def _resolve_holiday(self, groups, today):
+        day = self._holiday_day(HOLIDAY_ALIASES.get(groups["holiday"], groups["holiday"]), groups["year"], today)
+        # The holiday itself plus the days around it, so fares on either side are considered.
+        return ((day - datetime.timedelta(days=2), day + datetime.timedelta(days=2)),)
+
+    def _resolve_relative(self, groups, today):
+        unit, offset = groups["unit"], 1 if groups["when"] == "next" else 0
+        if unit == "week":
+            monday = today - datetime.timedelta(days=today.weekday()) + datetime.timedelta(weeks=offset)
+            return ((max(monday, today), monday + datetime.timedelta(days=6)),)
+        if unit == "month":
+            first = _add_months(today.replace(day=1), offset)
+            start, end = _month_window(first.year, first.month)
+            return ((max(start, today), end),)
+        return ((max(datetime.date(today.year + offset, 1, 1), today), datetime.date(today.year + offset, 12, 31)),)
+
+    def _resolve_season(self, groups, today):
+        return (self._upcoming_season(groups["season"], today, groups["when"], groups["year"]),)
+
+    def _resolve_month(self, groups, today):
+        return (self._upcoming_month(MONTHS[groups["month"]], today, groups["when"], groups["year"]),)
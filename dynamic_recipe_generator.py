@@ -1,198 +1,329 @@
-import random
-import datetime
-import pytz
+import json
+import sys
+from dataclasses import dataclass, field
+import numpy as np
+from catalog_store import LazyCatalog, cuisine_ingredients
+from ingredient_normalizer import IngredientNormalizer
+from instrumentation import count, instrumented
+from meal_times import DEFAULT_MEAL_WINDOWS, DEFAULT_TIMEZONE, MealWindows, local_time
+
+
+@dataclass(slots=True)
+class RecipeSuggestion:
+    """Print-free result of RecipeGenerator.build_recipe."""
+    cuisine: str
+    meal_type: str
+    ingredients: list
+    matching_hints: list = field(default_factory=list)  # (recipe_type, hint) pairs
+    general_idea: str = None  # only set when no hint matched
+    pairings: list = field(default_factory=list)
+    fresh_present: list = field(default_factory=list)
+    dressing_present: list = field(default_factory=list)
+
+
+class RecipeRenderer:
+    """Streams a RecipeSuggestion out as text lines or JSON."""
+
+    @staticmethod
+    def iter_text(result):
+        yield f"\nOkay, let's try to create a {result.cuisine} {result.meal_type} idea using: {', '.join(result.ingredients)}"
+
+        if result.matching_hints:
+            yield "\nHere are some specific ideas based on your ingredients:"
+            for i, (recipe_type, hint) in enumerate(result.matching_hints):
+                yield f"{i+1}. Consider making {hint['description']} ({recipe_type} style)."
+        else:
+            yield "\nHere are some general ideas based on the cuisine and your ingredients:"
+            yield result.general_idea
+
+        if result.pairings:
+            yield "\nIt looks like you have some classic pairings like:"
+            for pair in result.pairings:
+                yield f"- {pair[0]} and {pair[1]}"
+                yield "Consider using them together for a more authentic flavor."
+
+        if result.fresh_present:
+            yield "\nWith your fresh ingredients:"
+            yield f"- You could create a simple side salad with {', '.join(result.fresh_present)}."
+
+        if result.dressing_present:
+            yield "\nRegarding your dressings:"
+            yield f"- You could use {', '.join(result.dressing_present)} as a dip, a salad dressing, or a sauce for your main dish."
+
+        yield "\nTo make this more concrete, could you tell me if you have a main ingredient you'd like to focus on, or any specific dish type in mind?"
+
+    @classmethod
+    def write_text(cls, result, out=None):
+        out = out or sys.stdout
+        for line in cls.iter_text(result):
+            out.write(line + "\n")
+
+    @staticmethod
+    def to_dict(result):
+        return {"cuisine": result.cuisine,
+                "meal_type": result.meal_type,
+                "ingredients": result.ingredients,
+                "matching_hints": [{"recipe_type": recipe_type, "description": hint["description"], "ingredients": hint["ingredients"]}
+                                   for recipe_type, hint in result.matching_hints],
+                "general_idea": result.general_idea,
+                "pairings": [list(pair) for pair in result.pairings],
+                "fresh_ingredients": result.fresh_present,
+                "dressings": result.dressing_present}
+
+    @classmethod
+    def to_json(cls, result):
+        return json.dumps(cls.to_dict(result))
+
+
+def _decode_cuisine(cuisine_info):
+    cuisine_info["common_pairings"] = [tuple(pair) for pair in cuisine_info.get("common_pairings", [])]
+    return cuisine_info
+
 
 class RecipeGenerator:
-    def __init__(self):
-        self.cuisine_data = {
-            "italian": {
-                "key_ingredients": ["tomato", "olive oil", "garlic", "basil", "oregano", "pasta", "cheese", "mozzarella"],
-                "common_pairings": [("tomato", "basil"), ("garlic", "olive oil"), ("mozzarella", "tomato"), ("parmesan", "pasta")],
-                "flavor_profile": ["savory", "herby", "fresh", "rich"],
-                "typical_techniques": ["sautéing", "boiling", "baking", "simmering"],
-                "meal_starters": {
-                    "breakfast": ["eggs", "bread", "coffee"],
-                    "lunch": ["pasta", "salad", "sandwich"],
-                    "dinner": ["pasta", "pizza", "risotto", "meat", "fish"],
-                    "snack": ["cheese", "olives", "bread"]
-                },
-                "recipe_hints": {
-                    "pasta": [
-                        {"ingredients": ["tomato", "garlic", "olive oil", "basil"], "description": "a simple tomato sauce pasta"},
-                        {"ingredients": ["cream", "parmesan", "butter"], "description": "a creamy Alfredo pasta"},
-                        {"ingredients": ["ground meat", "tomato", "onion"], "description": "a classic Bolognese pasta"}
-                    ],
-                    "pizza": [
-                        {"ingredients": ["tomato sauce", "mozzarella", "basil"], "description": "a Margherita pizza"},
-                        {"ingredients": ["tomato sauce", "mozzarella", "pepperoni"], "description": "a pepperoni pizza"},
-                        {"ingredients": ["barbecue sauce", "mozzarella", "onion", "chicken"], "description": "a BBQ chicken pizza"}
-                    ],
-                    "salad": [
-                        {"ingredients": ["lettuce", "tomato", "cucumber", "olives", "onion"], "description": "a basic Italian salad with vinaigrette"}
-                    ]
-                }
-            },
-            "indian": {
-                "key_ingredients": ["onion", "ginger", "garlic", "turmeric", "cumin", "coriander", "chili", "mustard oil", "ghee", "rice", "lentils"],
-                "common_pairings": [("onion", "tomato"), ("ginger", "garlic"), ("cumin", "coriander"), ("turmeric", "chili")],
-                "flavor_profile": ["spicy", "aromatic", "savory", "earthy"],
-                "typical_techniques": ["sautéing", "braising", "tempering", "stewing"],
-                "meal_starters": {
-                    "breakfast": ["eggs", "bread", "yogurt"],
-                    "lunch": ["rice", "lentils", "vegetables"],
-                    "dinner": ["curry", "rice", "naan"],
-                    "snack": ["spiced nuts", "fritters"]
-                },
-                "recipe_hints": {
-                    "curry": [
-                        {"ingredients": ["onion", "tomato", "ginger", "garlic", "turmeric", "cumin", "coriander"], "description": "a basic curry base"},
-                        {"ingredients": ["chicken", "onion", "tomato", "ginger", "garlic", "spices"], "description": "a chicken curry"},
-                        {"ingredients": ["potatoes", "cauliflower", "onion", "tomato", "spices"], "description": "an aloo gobi (potato and cauliflower curry)"}
-                    ],
-                    "dal": [
-                        {"ingredients": ["lentils", "turmeric", "cumin", "onion", "tomato"], "description": "a simple lentil dal"},
-                        {"ingredients": ["lentils", "spinach", "ginger", "garlic", "spices"], "description": "a palak dal (spinach lentil curry)"}
-                    ]
-                }
-            },
-            "mexican": {
-                "key_ingredients": ["corn", "beans", "chili", "tomato", "onion", "garlic", "lime", "cilantro", "avocado", "tortillas"],
-                "common_pairings": [("tomato", "onion"), ("chili", "lime"), ("beans", "corn"), ("avocado", "cilantro")],
-                "flavor_profile": ["spicy", "tangy", "fresh", "hearty"],
-                "typical_techniques": ["grilling", "roasting", "simmering", "frying"],
-                "meal_starters": {
-                    "breakfast": ["eggs", "tortillas", "beans"],
-                    "lunch": ["tacos", "burritos", "salad"],
-                    "dinner": ["enchiladas", "fajitas", "chili"],
-                    "snack": ["salsa", "guacamole", "chips"]
-                },
-                "recipe_hints": {
-                    "tacos": [
-                        {"ingredients": ["tortillas", "ground meat", "onion", "salsa", "lettuce"], "description": "basic ground beef tacos with lettuce"},
-                        {"ingredients": ["tortillas", "chicken", "peppers", "onion"], "description": "chicken fajita tacos"}
-                    ],
-                    "salad": [
-                        {"ingredients": ["lettuce", "tomato", "onion", "corn", "beans", "avocado"], "description": "a Mexican bean and corn salad"}
-                    ]
-                }
-            },
-            "american": {
-                "key_ingredients": ["beef", "chicken", "bread", "cheese", "lettuce", "tomato", "onion", "barbecue sauce"],
-                "common_pairings": [("beef", "cheese"), ("chicken", "barbecue sauce"), ("lettuce", "tomato")],
-                "flavor_profile": ["savory", "smoky", "rich", "fresh"],
-                "typical_techniques": ["grilling", "baking", "frying"],
-                "meal_starters": {
-                    "breakfast": ["eggs", "bacon", "pancakes"],
-                    "lunch": ["sandwich", "burger", "salad"],
-                    "dinner": ["steak", "grilled chicken", "pasta"],
-                    "snack": ["chips", "pretzels"]
-                },
-                "recipe_hints": {
-                    "burger": [
-                        {"ingredients": ["beef", "bread", "cheese", "lettuce", "tomato", "onion", "barbecue sauce"], "description": "a classic BBQ cheeseburger"},
-                        {"ingredients": ["chicken", "bread", "lettuce", "tomato", "ranch dressing"], "description": "a chicken ranch sandwich"}
-                    ],
-                    "salad": [
-                        {"ingredients": ["lettuce", "cucumber", "tomato", "onion", "ranch dressing"], "description": "a simple garden salad with ranch"}
-                    ]
-                }
-            }
-        }
+    def __init__(self, catalog=None, rng=None, timezone=DEFAULT_TIMEZONE, meal_windows=DEFAULT_MEAL_WINDOWS):
+        # Any mapping of cuisine name -> cuisine info works; the default reads data/cuisines.json lazily.
+        self.cuisine_data = catalog if catalog is not None else LazyCatalog("cuisines", decode=_decode_cuisine)
+        # rng may be a seed, a SeedSequence or a numpy Generator; all randomness goes through it.
+        self.rng = np.random.default_rng(rng)
         self.dressing_options = ["ranch dressing", "creamy tangy garlic aioli", "barbecue sauce"]
         self.fresh_ingredients = ["lettuce", "cucumbers", "onion", "olives", "spring onion"]
+        self._hint_index = {}
+        self._normalizer = None
+        # Used when a request doesn't say where the diner is; a cuisine's "meal_windows" override meal_windows.
+        self.timezone = timezone
+        self.meal_windows = MealWindows(meal_windows)
+        self._cuisine_windows = {}
 
-    def suggest_meal_type(self):
-        current_hour = int(datetime.datetime.now(pytz.timezone('Asia/Kolkata')).strftime("%H"))
-        if 6 <= current_hour < 10:
-            return "breakfast"
-        elif 12 <= current_hour < 14:
-            return "lunch"
-        elif 18 <= current_hour < 22:
-            return "dinner"
-        else:
-            return "snack"
+    @property
+    def normalizer(self):
+        """IngredientNormalizer over every ingredient the catalog mentions, built on first use."""
+        if self._normalizer is None:
+            if isinstance(self.cuisine_data, LazyCatalog):
+                # The catalog's stored ingredient list, so no cuisine is decoded just for the vocabulary.
+                vocabulary = self.cuisine_data.terms()
+            else:
+                vocabulary = [ing for cuisine_info in self.cuisine_data.values() for ing in cuisine_ingredients(cuisine_info)]
+            self._normalizer = IngredientNormalizer(vocabulary + self.fresh_ingredients + self.dressing_options)
+        return self._normalizer
+
+    def normalize_ingredients(self, ingredients):
+        """Canonical ingredient IDs for a list of ingredients or a comma-separated string."""
+        if isinstance(ingredients, str):
+            return self.normalizer.parse(ingredients)
+        return self.normalizer.normalize_many(ingredients)
+
+    def _choice(self, options):
+        return options[self.rng.integers(len(options))]
+
+    def _index_cuisine(self, cuisine, cuisine_info):
+        """Builds a cuisine's ingredient -> hint ID inverted index (hint IDs are positions in its "hints")."""
+        index = self._hint_index[cuisine] = {"hints": [], "by_ingredient": {}, "always": []}
+        for recipe_type, hints in cuisine_info.get("recipe_hints", {}).items():
+            for hint in hints:
+                hint_id = len(index["hints"])
+                required = set(self.normalize_ingredients(hint["ingredients"]))
+                index["hints"].append({"recipe_type": recipe_type, "hint": hint, "size": len(required)})
+                if not required:
+                    index["always"].append(hint_id)
+                for ing in required:
+                    index["by_ingredient"].setdefault(ing, []).append(hint_id)
+        return index
+
+    def add_cuisine(self, cuisine, cuisine_info):
+        """Adds (or replaces) a cuisine; only its hints are re-indexed, on the next lookup."""
+        cuisine = cuisine.lower()
+        self._hint_index.pop(cuisine, None)  # drops the cuisine's indexed hints along with the index
+        self._cuisine_windows.pop(cuisine, None)
+        self._normalizer = None  # its vocabulary grows with the new cuisine
+        self.cuisine_data[cuisine] = cuisine_info
+
+    @instrumented("recipes.find_matching_hints")
+    def find_matching_hints(self, ingredients, cuisine, dish_type=None):
+        """
+        Returns (recipe_type, hint) pairs whose ingredients are all in the user's ingredients, in catalog order.
+        Ingredients are compared as canonical IDs (see ingredient_normalizer), so plurals, synonyms and typos still match.
+        """
+        cuisine = cuisine.lower()
+        index = self._hint_index.get(cuisine)
+        if index is None:
+            cuisine_info = self.cuisine_data.get(cuisine)
+            if not cuisine_info:
+                return []
+            index = self._index_cuisine(cuisine, cuisine_info)
+        hits = {}
+        for ing in set(self.normalize_ingredients(ingredients)):
+            for hint_id in index["by_ingredient"].get(ing, ()):
+                hits[hint_id] = hits.get(hint_id, 0) + 1
+        matched = [hint_id for hint_id, num_hits in hits.items() if num_hits == index["hints"][hint_id]["size"]]
+        matched.extend(index["always"])
+        results = []
+        for hint_id in sorted(matched):
+            entry = index["hints"][hint_id]
+            if dish_type is None or entry["recipe_type"] == dish_type.lower():
+                results.append((entry["recipe_type"], entry["hint"]))
+        count("recipes.hints_matched", len(results))
+        return results
 
+    def windows_for(self, cuisine=None):
+        """MealWindows for a cuisine: its catalog "meal_windows" if it has them, else the generator's."""
+        if cuisine is None:
+            return self.meal_windows
+        cuisine = cuisine.lower()
+        windows = self._cuisine_windows.get(cuisine)
+        if windows is None:
+            cuisine_info = self.cuisine_data.get(cuisine) or {}
+            windows = MealWindows(cuisine_info["meal_windows"]) if cuisine_info.get("meal_windows") else self.meal_windows
+            self._cuisine_windows[cuisine] = windows
+        return windows
+
+    def suggest_meal_type(self, tz=None, cuisine=None, now=None):
+        """Meal type for the current (or given) time in timezone tz; ValueError for an unknown timezone."""
+        return self.windows_for(cuisine).meal_at(local_time(tz or self.timezone, now))
+
+    def suggest_meal_types(self, requests, cuisine=None):
+        """meal type -> users for (user, timestamp, tz) requests; timestamps are epoch seconds or datetimes."""
+        if not requests:
+            return {}
+        users, timestamps, timezones = zip(*((user, timestamp, tz or self.timezone) for user, timestamp, tz in requests))
+        return self.windows_for(cuisine).bucket(users, timestamps, timezones)
+
+    @instrumented("recipes.analyze_ingredients")
     def analyze_ingredients(self, ingredients, cuisine):
         cuisine_info = self.cuisine_data.get(cuisine.lower())
         if not cuisine_info:
             return {"key_ingredients_present": [], "common_pairings_present": []}
 
-        key_ingredients_present = [ing for ing in ingredients if ing.lower() in [ki.lower() for ki in cuisine_info.get("key_ingredients", [])]]
-        common_pairings_present = []
-        for pair in cuisine_info.get("common_pairings", []):
-            if pair[0].lower() in [ing.lower() for ing in ingredients] and pair[1].lower() in [ing.lower() for ing in ingredients]:
-                common_pairings_present.append(pair)
+        canonical = self.normalize_ingredients(ingredients)
+        canonical_set = set(canonical)
+        key_ids = set(self.normalize_ingredients(cuisine_info.get("key_ingredients", [])))
+        key_ingredients_present = [ing for ing, ing_id in zip(ingredients, canonical) if ing_id in key_ids]
+        common_pairings_present = [pair for pair in cuisine_info.get("common_pairings", [])
+                                   if set(self.normalize_ingredients(pair)) <= canonical_set]
 
-        fresh_present = [ing for ing in ingredients if ing.lower() in [fi.lower() for fi in self.fresh_ingredients]]
-        dressing_present = [ing for ing in ingredients if ing.lower() in [di.lower() for di in self.dressing_options]]
+        fresh_ids = set(self.normalize_ingredients(self.fresh_ingredients))
+        dressing_ids = set(self.normalize_ingredients(self.dressing_options))
+        fresh_present = [ing for ing, ing_id in zip(ingredients, canonical) if ing_id in fresh_ids]
+        dressing_present = [ing for ing, ing_id in zip(ingredients, canonical) if ing_id in dressing_ids]
 
         return {"key_ingredients_present": key_ingredients_present,
                 "common_pairings_present": common_pairings_present,
                 "fresh_ingredients_present": fresh_present,
                 "dressing_present": dressing_present}
 
-    def generate_recipe(self, ingredients, cuisine, meal_type=None):
+    @instrumented("recipes.analyze_ingredients_batch")
+    def analyze_ingredients_batch(self, pantries, cuisine, include_hints=False):
+        """
+        Analyzes many ingredient lists at once for a cuisine.
+        Returns one dict per pantry, identical to analyze_ingredients (plus "matching_hints" if include_hints).
+        """
+        cuisine_info = self.cuisine_data.get(cuisine.lower())
+        if not cuisine_info:
+            return [{"key_ingredients_present": [], "common_pairings_present": []} for _ in pantries]
+
+        # Vocabulary over every term the cuisine can match on; column -1 collects unknown tokens.
+        vocab = {}
+        def term_ids(terms):
+            return [vocab.setdefault(term, len(vocab)) for term in self.normalize_ingredients(terms)]
+
+        key_ids = term_ids(cuisine_info.get("key_ingredients", []))
+        fresh_ids = term_ids(self.fresh_ingredients)
+        dressing_ids = term_ids(self.dressing_options)
+        pairings = cuisine_info.get("common_pairings", [])
+        pair_ids = [term_ids(pair) for pair in pairings]
+        hint_entries = [(recipe_type, hint) for recipe_type, hints in cuisine_info.get("recipe_hints", {}).items() for hint in hints]
+        hint_ids = [term_ids(hint["ingredients"]) for _, hint in hint_entries]
+        num_terms = len(vocab)
+
+        tokens = [ing for pantry in pantries for ing in pantry]
+        token_cols = np.fromiter((vocab.get(ing, num_terms) for ing in self.normalize_ingredients(tokens)), dtype=np.intp, count=len(tokens))
+        token_rows = np.repeat(np.arange(len(pantries)), [len(pantry) for pantry in pantries])
+        pantry_matrix = np.zeros((len(pantries), num_terms + 1), dtype=np.int32)
+        pantry_matrix[token_rows, token_cols] = 1
+        pantry_matrix = pantry_matrix[:, :num_terms]
+
+        def term_mask(ids):
+            mask = np.zeros(num_terms + 1, dtype=bool)
+            mask[ids] = True
+            return mask[token_cols]
+
+        def incidence(groups):
+            matrix = np.zeros((len(groups), num_terms), dtype=np.int32)
+            for row, ids in enumerate(groups):
+                matrix[row, ids] = 1
+            return matrix
+
+        def covered(groups):
+            matrix = incidence(groups)
+            return (pantry_matrix @ matrix.T) == matrix.sum(axis=1)
+
+        key_mask = term_mask(key_ids)
+        fresh_mask = term_mask(fresh_ids)
+        dressing_mask = term_mask(dressing_ids)
+        pair_hits = covered(pair_ids)
+        hint_hits = covered(hint_ids) if include_hints else None
+
+        results = []
+        start = 0
+        for row, pantry in enumerate(pantries):
+            stop = start + len(pantry)
+            result = {"key_ingredients_present": [pantry[i] for i in np.flatnonzero(key_mask[start:stop])],
+                      "common_pairings_present": [pairings[i] for i in np.flatnonzero(pair_hits[row])],
+                      "fresh_ingredients_present": [pantry[i] for i in np.flatnonzero(fresh_mask[start:stop])],
+                      "dressing_present": [pantry[i] for i in np.flatnonzero(dressing_mask[start:stop])]}
+            if include_hints:
+                result["matching_hints"] = [hint_entries[i] for i in np.flatnonzero(hint_hits[row])]
+            results.append(result)
+            start = stop
+        return results
+
+    @instrumented("recipes.build_recipe")
+    def build_recipe(self, ingredients, cuisine, meal_type=None, tz=None):
+        """Builds a RecipeSuggestion without printing anything; without a meal_type it is picked from the time in tz."""
         cuisine = cuisine.lower()
         cuisine_info = self.cuisine_data.get(cuisine)
         if not cuisine_info:
             return f"Sorry, I don't have recipe ideas for {cuisine} cuisine yet."
 
         if not meal_type:
-            meal_type = self.suggest_meal_type()
-
-        print(f"\nOkay, let's try to create a {cuisine} {meal_type} idea using: {', '.join(ingredients)}")
+            meal_type = self.suggest_meal_type(tz, cuisine)
 
         analysis = self.analyze_ingredients(ingredients, cuisine)
         key_ingredients = analysis["key_ingredients_present"]
-        pairings = analysis["common_pairings_present"]
         fresh_present = analysis["fresh_ingredients_present"]
         dressing_present = analysis["dressing_present"]
 
-        possible_recipes = []
-        if cuisine_info.get("recipe_hints"):
-            for recipe_type, hints in cuisine_info["recipe_hints"].items():
-                for hint in hints:
-                    if all(ing.lower() in [i.lower() for i in ingredients] for ing in hint["ingredients"]):
-                        possible_recipes.append(f"Consider making {hint['description']} ({recipe_type} style).")
-
-        if possible_recipes:
-            print("\nHere are some specific ideas based on your ingredients:")
-            for i, recipe in enumerate(possible_recipes):
-                print(f"{i+1}. {recipe}")
-        else:
-            print("\nHere are some general ideas based on the cuisine and your ingredients:")
+        result = RecipeSuggestion(cuisine, meal_type, list(ingredients),
+                                  matching_hints=self.find_matching_hints(ingredients, cuisine),
+                                  pairings=analysis["common_pairings_present"],
+                                  fresh_present=fresh_present,
+                                  dressing_present=dressing_present)
+
+        if not result.matching_hints:
             starter_options = list(cuisine_info.get("meal_starters", {}).get(meal_type, []))
             if starter_options:
-                starter = random.choice(starter_options)
+                starter = self._choice(starter_options)
                 suggestion = f"- Perhaps a {starter} with some of your ingredients like {', '.join(key_ingredients[:2]) if key_ingredients else '...'}"
                 if fresh_present:
-                    suggestion += f", maybe with a fresh topping of {random.choice(fresh_present)}."
+                    suggestion += f", maybe with a fresh topping of {self._choice(fresh_present)}."
                 if dressing_present:
-                    suggestion += f" You could also consider adding some {random.choice(dressing_present)}."
-                print(suggestion)
+                    suggestion += f" You could also consider adding some {self._choice(dressing_present)}."
+                result.general_idea = suggestion
             else:
                 general_suggestion = "- You could try a simple dish focusing on the key flavors of the cuisine using the ingredients you have."
                 if fresh_present:
                     general_suggestion += f" Consider adding some fresh elements like {', '.join(fresh_present)}."
                 if dressing_present:
-                    general_suggestion += f" A drizzle of {random.choice(dressing_present)} might also be interesting."
-                print(general_suggestion)
-
-        if pairings:
-            print("\nIt looks like you have some classic pairings like:")
-            for pair in pairings:
-                print(f"- {pair[0]} and {pair[1]}")
-                print(f"Consider using them together for a more authentic flavor.")
-
-        if fresh_present:
-            print("\nWith your fresh ingredients:")
-            print(f"- You could create a simple side salad with {', '.join(fresh_present)}.")
+                    general_suggestion += f" A drizzle of {self._choice(dressing_present)} might also be interesting."
+                result.general_idea = general_suggestion
+        return result
 
-        if dressing_present:
-            print("\nRegarding your dressings:")
-            print(f"- You could use {', '.join(dressing_present)} as a dip, a salad dressing, or a sauce for your main dish.")
-
-        print("\nTo make this more concrete, could you tell me if you have a main ingredient you'd like to focus on, or any specific dish type in mind?")
+    @instrumented("recipes.generate_recipe")
+    def generate_recipe(self, ingredients, cuisine, meal_type=None, tz=None):
+        result = self.build_recipe(ingredients, cuisine, meal_type, tz)
+        if isinstance(result, str):
+            return result
+        RecipeRenderer.write_text(result)
         return None
 
     def get_detailed_recipe(self, ingredients, cuisine, dish_type):
@@ -201,8 +332,8 @@ class RecipeGenerator:
         if not cuisine_info or not cuisine_info.get("recipe_hints") or dish_type.lower() not in cuisine_info["recipe_hints"]:
             return f"Sorry, I don't have detailed recipe for '{dish_type}' in {cuisine} cuisine right now."
 
-        hints = cuisine_info["recipe_hints"][dish_type.lower()]
-        possible_hint = next((hint for hint in hints if all(ing.lower() in [i.lower() for i in ingredients] for ing in hint["ingredients"])), None)
+        matches = self.find_matching_hints(ingredients, cuisine, dish_type)
+        possible_hint = matches[0][1] if matches else None
 
         if possible_hint:
             print(f"\nDetailed recipe idea for {possible_hint['description']}:")
@@ -251,11 +382,11 @@ class RecipeGenerator:
             else:
                 print("\nDetailed instructions for this specific combination are not available right now, but you can find many recipes online for this basic idea!")
         else:
-            print(f"No specific recipe found for '{dish_type}' using all of your provided ingredients in {cuisine} cuisine. However, you can still try a basic version with the key ingredients and perhaps a dressing like {random.choice(self.dressing_options) if self.dressing_options else 'one of your dressings'}.")
+            print(f"No specific recipe found for '{dish_type}' using all of your provided ingredients in {cuisine} cuisine. However, you can still try a basic version with the key ingredients and perhaps a dressing like {self._choice(self.dressing_options) if self.dressing_options else 'one of your dressings'}.")
         return None
 
-if __name__ == "__main__":
-    recipe_gen = RecipeGenerator()
+def main(recipe_gen=None):
+    recipe_gen = recipe_gen if recipe_gen is not None else RecipeGenerator()
 
     print("Welcome back to the AI Recipe Generator!")
 
@@ -271,6 +402,22 @@ if __name__ == "__main__":
             ingredients_input = input("Enter your ingredients (comma-separated): ").split(',')
             ingredients = [ing.strip() for ing in ingredients_input]
             cuisine_input = input("Enter the cuisine you're interested in (e.g., Italian, Indian, American): ")
-            recipe_gen.generate_recipe(ingredients, cuisine_input)
+            result = recipe_gen.build_recipe(ingredients, cuisine_input)
+            if isinstance(result, RecipeSuggestion):
+                RecipeRenderer.write_text(result)
         elif choice == '2':
-            ingredients_input = input("Enter the ingredients you plan to use (comma-separated): ").split
+            ingredients_input = input("Enter the ingredients you plan to use (comma-separated): ").split(',')
+            ingredients = [ing.strip() for ing in ingredients_input]
+            cuisine_input = input("Enter the cuisine: ")
+            dish_type_input = input("Enter the dish type (e.g., pasta, pizza, salad): ")
+            message = recipe_gen.get_detailed_recipe(ingredients, cuisine_input, dish_type_input)
+            if message:
+                print(message)
+        elif choice == '3':
+            print("Happy cooking!")
+            break
+        else:
+            print("Invalid choice. Please try again.")
+
+if __name__ == "__main__":
+    main()
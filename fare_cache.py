@@ -0,0 +1,173 @@
+"""
+TTL + LRU cache in front of the fare fetch.
+
+Searches are keyed on a normalized (region bbox, budget bucket) plus their date window. Misses are
+fetched at the top of the budget bucket, so any search in the same bucket, and any date window
+inside a cached one, is answered by slicing the cached frame. Entries expire after their TTL and
+the least recently used ones are evicted once the in-memory tier exceeds max_bytes. With a path,
+entries are also written to disk (Parquet + a JSON sidecar) and survive restarts.
+
+Each tier is indexed by group, so a lookup only looks at the entries of its own (region, budget
+bucket); expired entries of other groups are swept out at most once per TTL.
+"""
+import hashlib
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+
+from lazy_imports import lazy_module
+
+pd = lazy_module("pandas")
+
+
+class FareCache:
+    def __init__(self, ttl=15 * 60, max_bytes=256 * 1024 * 1024, budget_bucket=50, path=None, clock=time.time):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.budget_bucket = budget_bucket
+        self.path = path
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "expirations": 0}
+        self._entries = OrderedDict()  # entry id -> entry dict, least recently used first
+        self._num_bytes = 0
+        self._disk_entries = {}
+        # group -> {entry id: entry}, per tier
+        self._groups = {}
+        self._disk_groups = {}
+        self._next_sweep = clock() + ttl
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._load_disk_index()
+
+    def normalize(self, start_date, end_date, region_coords, budget):
+        """(group key, start, end, fetch budget) for a search."""
+        region = tuple(round(float(coord), 2) for coord in region_coords)
+        bucket_top = math.ceil(budget / self.budget_bucket) * self.budget_bucket
+        return (region, bucket_top), pd.Timestamp(start_date), pd.Timestamp(end_date), bucket_top
+
+    @staticmethod
+    def _slice(fares, start, end, budget):
+        if fares.empty:
+            # A search that found nothing may be cached as a frame without fare columns.
+            return fares
+        departures = fares["departure_date"]
+        mask = (departures >= start) & (departures < end + pd.Timedelta(days=1)) & (fares["price"] <= budget)
+        return fares[mask.to_numpy()]
+
+    def _group_index(self, entries):
+        return self._groups if entries is self._entries else self._disk_groups
+
+    def _add(self, entries, entry_id, entry):
+        entries[entry_id] = entry
+        self._group_index(entries).setdefault(entry["group"], {})[entry_id] = entry
+
+    def _find(self, entries, group, start, end, now):
+        for entry_id, entry in list(self._group_index(entries).get(group, {}).items()):
+            if entry["expires"] <= now:
+                self._drop(entries, entry_id)
+                self.stats["expirations"] += 1
+            elif entry["start"] <= start and entry["end"] >= end:
+                return entry_id, entry
+        return None, None
+
+    def _sweep(self, now):
+        """Drops every expired entry of both tiers."""
+        for entries in (self._entries, self._disk_entries):
+            for entry_id, entry in list(entries.items()):
+                if entry["expires"] <= now:
+                    self._drop(entries, entry_id)
+                    self.stats["expirations"] += 1
+        self._next_sweep = now + self.ttl
+
+    def get(self, start_date, end_date, region_coords, budget):
+        """Cached fares for the search, or None on a miss."""
+        group, start, end, _ = self.normalize(start_date, end_date, region_coords, budget)
+        now = self.clock()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        entry_id, entry = self._find(self._entries, group, start, end, now)
+        if entry is not None:
+            self._entries.move_to_end(entry_id)
+            group_entries = self._groups[group]
+            group_entries[entry_id] = group_entries.pop(entry_id)  # same recency order as _entries
+            self.stats["hits"] += 1
+            return self._slice(entry["fares"], start, end, budget)
+        if self.path:
+            entry_id, entry = self._find(self._disk_entries, group, start, end, now)
+            if entry is not None:
+                fares = pd.read_parquet(entry["file"])
+                self._remember(entry_id, dict(entry, fares=fares))
+                self.stats["hits"] += 1
+                self.stats["disk_hits"] += 1
+                return self._slice(fares, start, end, budget)
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, start_date, end_date, region_coords, budget, fares, ttl=None):
+        """Stores fares fetched for the search (they should cover the whole budget bucket)."""
+        group, start, end, _ = self.normalize(start_date, end_date, region_coords, budget)
+        entry_id = hashlib.sha1(repr((group, start, end)).encode()).hexdigest()
+        entry = {"group": group, "start": start, "end": end, "expires": self.clock() + (ttl or self.ttl)}
+        if self.path:
+            entry["file"] = os.path.join(self.path, f"{entry_id}.parquet")
+            fares.to_parquet(entry["file"], index=False)
+            with open(os.path.join(self.path, f"{entry_id}.json"), "w") as f:
+                json.dump({"region": group[0], "bucket": group[1], "start": start.isoformat(), "end": end.isoformat(),
+                           "expires": entry["expires"], "file": entry["file"]}, f)
+            if entry_id in self._disk_entries:
+                self._drop_from_index(self._disk_entries, entry_id)
+            self._add(self._disk_entries, entry_id, entry)
+        self._remember(entry_id, dict(entry, fares=fares))
+
+    def get_or_fetch(self, start_date, end_date, region_coords, budget, fetch):
+        """Cached fares, or fetch(start_date, end_date, region_coords, bucket_budget) on a miss."""
+        fares = self.get(start_date, end_date, region_coords, budget)
+        if fares is not None:
+            return fares
+        _, _, _, bucket_top = self.normalize(start_date, end_date, region_coords, budget)
+        fares = fetch(start_date, end_date, region_coords, bucket_top)
+        self.put(start_date, end_date, region_coords, budget, fares)
+        return self._slice(fares, pd.Timestamp(start_date), pd.Timestamp(end_date), budget)
+
+    def _remember(self, entry_id, entry):
+        if entry_id in self._entries:
+            self._drop(self._entries, entry_id)
+        entry["size"] = int(entry["fares"].memory_usage(deep=True).sum())
+        self._add(self._entries, entry_id, entry)
+        self._num_bytes += entry["size"]
+        while self._num_bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(self._entries, next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def _drop_from_index(self, entries, entry_id):
+        entry = entries.pop(entry_id)
+        groups = self._group_index(entries)
+        del groups[entry["group"]][entry_id]
+        if not groups[entry["group"]]:
+            del groups[entry["group"]]
+        return entry
+
+    def _drop(self, entries, entry_id):
+        entry = self._drop_from_index(entries, entry_id)
+        if entries is self._entries:
+            self._num_bytes -= entry["size"]
+        elif self.path:
+            for suffix in (".parquet", ".json"):
+                file_path = os.path.join(self.path, entry_id + suffix)
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+    def _load_disk_index(self):
+        for file_name in os.listdir(self.path):
+            if not file_name.endswith(".json"):
+                continue
+            with open(os.path.join(self.path, file_name)) as f:
+                meta = json.load(f)
+            self._add(self._disk_entries, file_name[:-5], {"group": (tuple(meta["region"]), meta["bucket"]),
+                                                           "start": pd.Timestamp(meta["start"]), "end": pd.Timestamp(meta["end"]),
+                                                           "expires": meta["expires"], "file": meta["file"]})
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,136 @@
+"""
+Async fare providers for the flight explorer.
+
+A flexible search is fanned out into one request per (day, provider). HTTP providers share
+one pooled aiohttp session; each provider has its own concurrency limit, timeout and retry
+policy with exponential backoff. Results are yielded as they arrive so callers can merge them
+into the fare store incrementally. aiohttp is only imported when an HTTP session is opened.
+"""
+import abc
+import asyncio
+import datetime
+
+import numpy as np
+
+from flexi_date_flexi_destination_flight import synthetic_fares
+from lazy_imports import lazy_module
+
+pd = lazy_module("pandas")
+
+
+class RetryableFareError(Exception):
+    """A provider failure worth retrying (timeouts, dropped connections, 429/5xx)."""
+
+
+class FareProvider(abc.ABC):
+    """Base class: subclasses implement fetch_day for one departure day."""
+
+    uses_http = False
+
+    def __init__(self, name, max_concurrency=8, timeout=10.0, retries=3, backoff=0.2, rng=None):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.rng = np.random.default_rng(rng)
+
+    @abc.abstractmethod
+    async def fetch_day(self, session, day, region_coords, budget):
+        """Fares departing on day within region_coords and budget, as a DataFrame with the FareStore columns."""
+
+    async def fetch(self, session, day, region_coords, budget):
+        """fetch_day with this provider's timeout and retry/backoff policy."""
+        for attempt in range(self.retries + 1):
+            try:
+                return await asyncio.wait_for(self.fetch_day(session, day, region_coords, budget), self.timeout)
+            except (asyncio.TimeoutError, ConnectionError, RetryableFareError):
+                if attempt == self.retries:
+                    raise
+                # Jittered so that many failed requests don't all come back at once.
+                await asyncio.sleep(self.backoff * 2 ** attempt * self.rng.uniform(0.5, 1.5))
+
+
+class HttpFareProvider(FareProvider):
+    """
+    Fetches GET {url}?date=YYYY-MM-DD&min_lat=..&min_lon=..&max_lat=..&max_lon=..&budget=..
+    and expects a JSON list of fare records with the FareStore columns.
+    """
+
+    uses_http = True
+
+    def __init__(self, name, url, **options):
+        super().__init__(name, **options)
+        self.url = url
+
+    async def fetch_day(self, session, day, region_coords, budget):
+        import aiohttp
+
+        min_lat, min_lon, max_lat, max_lon = region_coords
+        params = {"date": day.isoformat(), "min_lat": min_lat, "min_lon": min_lon,
+                  "max_lat": max_lat, "max_lon": max_lon, "budget": budget}
+        try:
+            async with session.get(self.url, params=params) as response:
+                if response.status == 429 or response.status >= 500:
+                    raise RetryableFareError(f"{self.name}: HTTP {response.status}")
+                response.raise_for_status()
+                records = await response.json()
+        except aiohttp.ClientConnectionError as error:
+            raise RetryableFareError(f"{self.name}: {error}") from error
+        return fares_from_records(records)
+
+
+class SimulatedFareProvider(FareProvider):
+    """Offline provider backed by the fare simulator, with optional injected latency."""
+
+    def __init__(self, name, latency=0.0, **options):
+        super().__init__(name, **options)
+        self.latency = latency
+
+    async def fetch_day(self, session, day, region_coords, budget):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return synthetic_fares(day, day, region_coords, budget, int(self.rng.integers(5, 21)), self.rng)
+
+
+def fares_from_records(records):
+    fares = pd.DataFrame.from_records(records)
+    for column in ("departure_date", "arrival_date"):
+        if column in fares:
+            fares[column] = pd.to_datetime(fares[column])
+    return fares
+
+
+def _days(start_date, end_date):
+    return [start_date + datetime.timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+
+async def iter_provider_fares(providers, start_date, end_date, region_coords, budget, session=None):
+    """
+    Fans a flexible query out to every (day, provider) pair concurrently.
+    Yields (provider_name, day, fares, error) as each request finishes; error is None on success.
+    """
+    owns_session = session is None and any(provider.uses_http for provider in providers)
+    if owns_session:
+        import aiohttp
+        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=sum(p.max_concurrency for p in providers)))
+    limits = {provider.name: asyncio.Semaphore(provider.max_concurrency) for provider in providers}
+
+    async def one_request(provider, day):
+        async with limits[provider.name]:
+            try:
+                return provider.name, day, await provider.fetch(session, day, region_coords, budget), None
+            except Exception as error:
+                return provider.name, day, None, error
+
+    tasks = [asyncio.ensure_future(one_request(provider, day)) for day in _days(start_date, end_date) for provider in providers]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Wait for the cancelled requests to unwind before their session goes away.
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if owns_session:
+            await session.close()
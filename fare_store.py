@@ -0,0 +1,380 @@
+"""
+Columnar fare store for the flight explorer.
+
+Fares are kept resident as columns and indexed three ways: sorted departure dates,
+sorted prices and a latitude/longitude grid. A region + date + budget query picks the
+most selective index, range-scans it and only then touches the other columns, so it never
+copies the whole table. Appended rows wait in a small delta segment (index keys and frame rows)
+that queries scan alongside the merged data; it is merged in once it reaches a fraction of the
+merged size, so neither appends nor the next query rewrite the whole table. Each append is
+optionally persisted as a Parquet segment (pandas needs pyarrow for that) and reloaded when the
+store is reopened.
+
+scan_fares reads such a directory without loading it: filters are pushed down to the
+Parquet reader, which skips row groups whose min/max statistics cannot match.
+"""
+import glob
+import os
+
+import numpy as np
+
+from lazy_imports import lazy_module
+
+pd = lazy_module("pandas")
+
+COLUMNS = ["departure_date", "arrival_date", "price", "latitude", "longitude", "destination_city", "airline", "stops"]
+# Columns kept as NumPy arrays next to the frame, for the index range checks.
+INDEXED_COLUMNS = {"departure_date": "datetime64[ns]", "price": float, "latitude": float, "longitude": float}
+# Segments are written sorted by departure date in groups of this many rows, which keeps
+# each row group's date range narrow enough for pushdown to skip most of them.
+ROW_GROUP_SIZE = 64 * 1024
+# Appended rows (index keys and frame rows) wait in a delta until it holds 1/MERGE_FRACTION of the
+# merged data (and at least MIN_MERGE_ROWS), so merging costs O(1) amortized per appended row.
+MERGE_FRACTION = 16
+MIN_MERGE_ROWS = 4096
+
+
+def _datetimes(column):
+    if pd.api.types.is_datetime64_dtype(column):
+        return column.to_numpy()
+    return pd.to_datetime(column).to_numpy()
+
+
+def fare_mask(fares, max_budget=None, max_duration_hours=None, max_stops=None, airlines=None):
+    """One fused boolean mask (NumPy array) for the per-fare filters; airlines is a name or a list of names."""
+    if isinstance(airlines, str):
+        airlines = [airlines]
+    mask = np.ones(len(fares), dtype=bool)
+    if max_budget is not None:
+        mask &= fares["price"].to_numpy() <= max_budget
+    if max_duration_hours is not None:
+        duration = _datetimes(fares["arrival_date"]) - _datetimes(fares["departure_date"])
+        mask &= duration <= np.timedelta64(int(max_duration_hours * 3600), "s")
+    if max_stops is not None and "stops" in fares:
+        # Unknown stop counts (null) become NaN, which fails every stops filter.
+        mask &= fares["stops"].to_numpy(dtype=float, na_value=np.nan) <= max_stops
+    if airlines:
+        airline = fares["airline"]
+        if isinstance(airline.dtype, pd.CategoricalDtype):
+            # Lookup table over category codes instead of hashing every string.
+            allowed = np.append(airline.cat.categories.isin(list(airlines)), False)
+            mask &= allowed[airline.cat.codes.to_numpy()]
+        else:
+            mask &= airline.isin(list(airlines)).to_numpy()
+    return mask
+
+
+def longitude_mask(longitudes, min_lon, max_lon):
+    """Longitudes inside [min_lon, max_lon]; a box with min_lon > max_lon crosses the antimeridian."""
+    if min_lon <= max_lon:
+        return (longitudes >= min_lon) & (longitudes <= max_lon)
+    return (longitudes >= min_lon) | (longitudes <= max_lon)
+
+
+def scan_fares(path, start_date=None, end_date=None, region_coords=None, max_budget=None,
+               max_duration_hours=None, max_stops=None, airlines=None, columns=None):
+    """
+    Reads matching fares from a FareStore directory, pushing every filter except duration
+    (which is derived) down into the Parquet reader.
+    """
+    if isinstance(airlines, str):
+        airlines = [airlines]
+    filters = []
+    if start_date is not None:
+        filters.append(("departure_date", ">=", pd.Timestamp(start_date)))
+    if end_date is not None:
+        filters.append(("departure_date", "<", pd.Timestamp(end_date) + pd.Timedelta(days=1)))
+    if region_coords is not None:
+        min_lat, min_lon, max_lat, max_lon = region_coords
+        filters += [("latitude", ">=", min_lat), ("latitude", "<=", max_lat)]
+        if min_lon <= max_lon:
+            filters += [("longitude", ">=", min_lon), ("longitude", "<=", max_lon)]
+    if max_budget is not None:
+        filters.append(("price", "<=", max_budget))
+    if max_stops is not None:
+        filters.append(("stops", "<=", max_stops))
+    if airlines:
+        filters.append(("airline", "in", list(airlines)))
+    if region_coords is not None and min_lon > max_lon:
+        # Across the antimeridian: either side of it, as two OR-ed lists of filters.
+        filters = [filters + [("longitude", ">=", min_lon)], filters + [("longitude", "<=", max_lon)]]
+    if columns is not None and max_duration_hours is not None:
+        columns = list(dict.fromkeys(list(columns) + ["departure_date", "arrival_date"]))
+    fares = pd.read_parquet(path, columns=columns, filters=filters or None)
+    if max_duration_hours is not None:
+        fares = fares[fare_mask(fares, max_duration_hours=max_duration_hours)]
+    return fares.reset_index(drop=True)
+
+
+class SortedIndex:
+    """
+    Sorted keys with the row positions they came from; supports inserts and range scans.
+    New keys go into a small sorted delta that scans read alongside the main arrays, and the delta
+    is merged in once it reaches 1/MERGE_FRACTION of them, so an append doesn't rewrite the index.
+    """
+
+    def __init__(self, dtype):
+        self.keys = np.empty(0, dtype=dtype)
+        self.positions = np.empty(0, dtype=np.int64)
+        self._delta_keys = self.keys
+        self._delta_positions = self.positions
+
+    def __len__(self):
+        return len(self.keys) + len(self._delta_keys)
+
+    def insert(self, keys, positions):
+        order = np.argsort(keys, kind="stable")
+        keys, positions = keys[order], positions[order]
+        slots = np.searchsorted(self._delta_keys, keys, side="right")
+        self._delta_keys = np.insert(self._delta_keys, slots, keys)
+        self._delta_positions = np.insert(self._delta_positions, slots, positions)
+        if len(self._delta_keys) >= max(MIN_MERGE_ROWS, len(self.keys) // MERGE_FRACTION):
+            self._merge()
+
+    def _merge(self):
+        slots = np.searchsorted(self.keys, self._delta_keys, side="right")
+        self.keys = np.insert(self.keys, slots, self._delta_keys)
+        self.positions = np.insert(self.positions, slots, self._delta_positions)
+        self._delta_keys = self._delta_keys[:0]
+        self._delta_positions = self._delta_positions[:0]
+
+    @staticmethod
+    def _bounds(keys, low, high):
+        start = 0 if low is None else int(np.searchsorted(keys, low, side="left"))
+        stop = len(keys) if high is None else int(np.searchsorted(keys, high, side="right"))
+        return start, max(start, stop)
+
+    def count(self, low=None, high=None):
+        """Number of keys in [low, high]."""
+        start, stop = self._bounds(self.keys, low, high)
+        delta_start, delta_stop = self._bounds(self._delta_keys, low, high)
+        return stop - start + delta_stop - delta_start
+
+    def range(self, low=None, high=None):
+        """Positions of the keys in [low, high] (main arrays first, then the delta; not sorted by key across the two)."""
+        start, stop = self._bounds(self.keys, low, high)
+        if not len(self._delta_keys):
+            return self.positions[start:stop]
+        delta_start, delta_stop = self._bounds(self._delta_keys, low, high)
+        return np.concatenate([self.positions[start:stop], self._delta_positions[delta_start:delta_stop]])
+
+
+class GridIndex:
+    """Fixed-size latitude/longitude cells, stored as a SortedIndex over cell IDs."""
+
+    def __init__(self, cell_degrees=5.0):
+        self.cell_degrees = cell_degrees
+        self.num_lon_cells = int(np.ceil(360 / cell_degrees))
+        self.index = SortedIndex(np.int64)
+
+    def _row(self, latitude):
+        return np.floor((np.asarray(latitude, dtype=float) + 90) / self.cell_degrees).astype(np.int64)
+
+    def _col(self, longitude):
+        # Longitude 180 belongs in the last column, not column 0 of the next row.
+        column = np.floor((np.asarray(longitude, dtype=float) + 180) / self.cell_degrees).astype(np.int64)
+        return np.minimum(column, self.num_lon_cells - 1)
+
+    def cell_ids(self, latitudes, longitudes):
+        return self._row(latitudes) * self.num_lon_cells + self._col(longitudes)
+
+    def insert(self, latitudes, longitudes, positions):
+        self.index.insert(self.cell_ids(latitudes, longitudes), positions)
+
+    def _bands(self, region_coords):
+        min_lat, min_lon, max_lat, max_lon = region_coords
+        if min_lon <= max_lon:
+            columns = [(int(self._col(min_lon)), int(self._col(max_lon)))]
+        else:
+            # Across the antimeridian: east of min_lon up to 180, and from -180 up to max_lon.
+            columns = [(int(self._col(min_lon)), self.num_lon_cells - 1), (0, int(self._col(max_lon)))]
+        for row in range(int(self._row(min_lat)), int(self._row(max_lat)) + 1):
+            for first_col, last_col in columns:
+                yield row * self.num_lon_cells + first_col, row * self.num_lon_cells + last_col
+
+    def count(self, region_coords):
+        return sum(self.index.count(low, high) for low, high in self._bands(region_coords))
+
+    def range(self, region_coords):
+        """Rows in every cell touching the box (a superset; callers still check exact bounds)."""
+        parts = [self.index.range(low, high) for low, high in self._bands(region_coords)]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+class FareStore:
+    """Append-only store of fares with departure-date, price and spatial-grid indexes."""
+
+    def __init__(self, path=None, cell_degrees=5.0, resident=True, tiles=None):
+        # resident=False keeps a file-backed store on disk: queries go through scan_fares.
+        # tiles (e.g. geo_index.FareTiles) is updated with every batch of fares added.
+        self.tiles = tiles
+        self.path = path
+        self.resident = resident or not path
+        self._frame = None  # merged rows, as one frame (None until the first merge)
+        self._columns = {name: np.empty(0, dtype=dtype) for name, dtype in INDEXED_COLUMNS.items()}
+        # Rows appended since the last merge; queries read them alongside the merged ones.
+        self._delta_chunks = []
+        self._delta_columns = {name: [] for name in INDEXED_COLUMNS}
+        self._delta_frame = None  # the first _delta_frame_chunks delta chunks, concatenated on demand
+        self._delta_frame_chunks = 0
+        self._main_rows = 0
+        self._num_rows = 0
+        self.departure_index = SortedIndex("datetime64[ns]")
+        self.price_index = SortedIndex(float)
+        self.grid_index = GridIndex(cell_degrees)
+        if path:
+            os.makedirs(path, exist_ok=True)
+        if path and self.resident:
+            for segment in self._segments():
+                self._add(pd.read_parquet(segment))
+
+    def _segments(self):
+        return sorted(glob.glob(os.path.join(self.path, "segment-*.parquet")))
+
+    def __len__(self):
+        if not self.resident:
+            import pyarrow.parquet as pq
+            return sum(pq.ParquetFile(segment).metadata.num_rows for segment in self._segments())
+        return self._num_rows
+
+    @staticmethod
+    def _normalize(fares):
+        fares = fares.reindex(columns=COLUMNS).reset_index(drop=True)
+        # Nullable integers: a missing stop count stays unknown instead of passing as nonstop.
+        return fares.assign(stops=fares["stops"].astype("Int64"),
+                            departure_date=pd.to_datetime(fares["departure_date"]).astype("datetime64[ns]"),
+                            arrival_date=pd.to_datetime(fares["arrival_date"]).astype("datetime64[ns]"),
+                            price=fares["price"].astype(float))
+
+    def _add(self, fares):
+        positions = np.arange(self._num_rows, self._num_rows + len(fares), dtype=np.int64)
+        values = {name: fares[name].to_numpy(dtype=dtype) for name, dtype in INDEXED_COLUMNS.items()}
+        self.departure_index.insert(values["departure_date"], positions)
+        self.price_index.insert(values["price"], positions)
+        self.grid_index.insert(values["latitude"], values["longitude"], positions)
+        for name, column in values.items():
+            self._delta_columns[name].append(column)
+        self._delta_chunks.append(fares)
+        if self.tiles is not None:
+            self.tiles.update(fares)
+        self._num_rows += len(fares)
+        if self._num_rows - self._main_rows >= max(MIN_MERGE_ROWS, self._main_rows // MERGE_FRACTION):
+            self._merge()
+
+    def append(self, fares):
+        """Adds a frame of fares (as returned by FlightExplorer.fetch_flight_data)."""
+        if fares is None or fares.empty:
+            return 0
+        fares = self._normalize(fares)
+        if self.path:
+            fares.sort_values("departure_date", kind="stable").to_parquet(
+                os.path.join(self.path, f"segment-{len(self._segments()):06d}.parquet"), index=False, row_group_size=ROW_GROUP_SIZE)
+        if self.resident:
+            self._add(fares)
+        return len(fares)
+
+    def _merge(self):
+        """Moves the delta rows into the merged frame and columns."""
+        if not self._delta_chunks:
+            return
+        chunks = ([self._frame] if self._frame is not None else []) + self._delta_chunks
+        self._frame = pd.concat(chunks, ignore_index=True)
+        for name, parts in self._delta_columns.items():
+            self._columns[name] = np.concatenate([self._columns[name]] + parts)
+            parts.clear()
+        self._delta_chunks = []
+        self._delta_frame = None
+        self._delta_frame_chunks = 0
+        self._main_rows = self._num_rows
+
+    def _delta(self):
+        """The delta rows as one frame, labelled with their store positions (only new chunks get concatenated)."""
+        if self._delta_frame_chunks < len(self._delta_chunks):
+            frames = [self._delta_frame] if self._delta_frame is not None else []
+            self._delta_frame = pd.concat(frames + self._delta_chunks[self._delta_frame_chunks:], ignore_index=True)
+            self._delta_frame.index = pd.RangeIndex(self._main_rows, self._num_rows)
+            self._delta_frame_chunks = len(self._delta_chunks)
+        return self._delta_frame
+
+    def _delta_column(self, name):
+        parts = self._delta_columns[name]
+        if len(parts) > 1:
+            parts[:] = [np.concatenate(parts)]
+        return parts[0]
+
+    def _values(self, name, positions):
+        """Column values at store positions, read from the merged column and the delta."""
+        merged = self._columns[name]
+        if self._main_rows == self._num_rows:
+            return merged[positions]
+        delta = self._delta_column(name)
+        in_merged = positions < self._main_rows
+        values = np.empty(len(positions), dtype=merged.dtype)
+        values[in_merged] = merged[positions[in_merged]]
+        values[~in_merged] = delta[positions[~in_merged] - self._main_rows]
+        return values
+
+    def _take(self, positions):
+        """Rows at ascending store positions, from the merged frame and the delta."""
+        if self._main_rows == self._num_rows:
+            return self.frame.take(positions)
+        split = int(np.searchsorted(positions, self._main_rows))
+        delta = self._delta().take(positions[split:] - self._main_rows)
+        return pd.concat([self._frame.take(positions[:split]), delta]) if split else delta
+
+    @property
+    def frame(self):
+        """Every stored fare as one frame (merges the delta)."""
+        self._merge()
+        return self._frame if self._frame is not None else pd.DataFrame(columns=COLUMNS)
+
+    def column(self, name):
+        self._merge()
+        return self._columns[name]
+
+    def query_positions(self, start_date=None, end_date=None, region_coords=None, max_price=None, min_price=None, **fare_filters):
+        """Row positions (ascending) of fares matching every given bound and fare_mask filter."""
+        if not self._num_rows:
+            return np.empty(0, dtype=np.int64)
+        low_date = np.datetime64(pd.Timestamp(start_date), "ns") if start_date is not None else None
+        # end_date is a whole day, so anything departing on it matches.
+        high_date = np.datetime64(pd.Timestamp(end_date) + pd.Timedelta(days=1), "ns") - np.timedelta64(1, "ns") if end_date is not None else None
+
+        # Range-scan whichever index leaves the fewest candidate rows.
+        scans = []
+        if low_date is not None or high_date is not None:
+            scans.append((self.departure_index.count(low_date, high_date), lambda: self.departure_index.range(low_date, high_date)))
+        if max_price is not None or min_price is not None:
+            scans.append((self.price_index.count(min_price, max_price), lambda: self.price_index.range(min_price, max_price)))
+        if region_coords is not None:
+            scans.append((self.grid_index.count(region_coords), lambda: self.grid_index.range(region_coords)))
+        positions = min(scans, key=lambda scan: scan[0])[1]() if scans else np.arange(self._num_rows)
+
+        mask = np.ones(len(positions), dtype=bool)
+        if low_date is not None or high_date is not None:
+            departures = self._values("departure_date", positions)
+            if low_date is not None:
+                mask &= departures >= low_date
+            if high_date is not None:
+                mask &= departures <= high_date
+        if min_price is not None or max_price is not None:
+            prices = self._values("price", positions)
+            if min_price is not None:
+                mask &= prices >= min_price
+            if max_price is not None:
+                mask &= prices <= max_price
+        if region_coords is not None:
+            min_lat, min_lon, max_lat, max_lon = region_coords
+            latitudes, longitudes = self._values("latitude", positions), self._values("longitude", positions)
+            mask &= (latitudes >= min_lat) & (latitudes <= max_lat) & longitude_mask(longitudes, min_lon, max_lon)
+        positions = np.sort(positions[mask])
+        if any(value is not None for value in fare_filters.values()):
+            positions = positions[fare_mask(self._take(positions), **fare_filters)]
+        return positions
+
+    def query(self, start_date=None, end_date=None, region_coords=None, max_price=None, min_price=None, **fare_filters):
+        """Fares matching the bounds, as a new frame holding only those rows."""
+        if not self.resident:
+            fares = scan_fares(self.path, start_date, end_date, region_coords, max_price, **fare_filters)
+            return fares if min_price is None else fares[fares["price"].to_numpy() >= min_price]
+        return self._take(self.query_positions(start_date, end_date, region_coords, max_price, min_price, **fare_filters))
@@ -1,60 +1,119 @@
 import datetime
-from dateutil.relativedelta import relativedelta  # For flexible date calculations
 # import requests  # For making HTTP requests to flight data sources (APIs or scraping)
 # from bs4 import BeautifulSoup  # For parsing HTML if scraping
-import pandas as pd  # For handling and organizing flight data
+import numpy as np
+from catalog_store import LazyCatalog
+from date_phrases import FlexibleDateParser
+from fare_cache import FareCache
+from fare_store import FareStore, GridIndex, fare_mask
+from geo_index import FareTiles, RegionRegistry, geojson_features, load_airports
+from instrumentation import count, instrumented
+from lazy_imports import lazy_module, warm_in_background
+from price_calendar import ONE_WAY_REUSED, RETURN_FARES, build_price_calendar, cheapest_by_departure
 # import folium  # For map visualization (optional, but cool!)
 
+pd = lazy_module("pandas")  # For handling and organizing flight data; imported on first use
+
+AIRLINES = ["BudgetAir", "FlyLow", "CheapWings"]
+CITIES = [f"City {i}" for i in range(1, 11)] # Placeholder
+MAX_PLAIN_MARKERS = 1000
+CLUSTER_MARKER_CALLBACK = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindPopup(row[2]);
+    return marker;
+};
+"""
+
+
+def _uniform_longitudes(rng, min_lon, max_lon, size):
+    """Uniform in [min_lon, max_lon], wrapping across the antimeridian when min_lon > max_lon."""
+    if min_lon <= max_lon:
+        return rng.uniform(min_lon, max_lon, size)
+    return (rng.uniform(min_lon, max_lon + 360, size) + 180) % 360 - 180
+
+
+def iter_synthetic_fares(start_date, end_date, region_coords, budget, num_rows, rng=None, chunk_size=None):
+    """
+    Yields simulated fares in frames of up to chunk_size rows, built column-wise with NumPy.
+    This is the stand-in for a real fare API (see FlightExplorer.fetch_flight_data).
+    """
+    rng = np.random.default_rng(rng)
+    min_lat, min_lon, max_lat, max_lon = region_coords
+    first_hour = np.datetime64(start_date, "D").astype("datetime64[h]")
+    num_days = (end_date - start_date).days + 1
+    chunk_size = chunk_size or max(1, num_rows)  # no rows: no chunks
+    for offset in range(0, num_rows, chunk_size):
+        size = min(chunk_size, num_rows - offset)
+        departures = first_hour + (rng.integers(0, num_days, size) * 24 + rng.integers(0, 24, size)).astype("timedelta64[h]")
+        yield pd.DataFrame({
+            "departure_date": departures.astype("datetime64[ns]"),
+            "arrival_date": (departures + rng.integers(2, 16, size).astype("timedelta64[h]")).astype("datetime64[ns]"),
+            "price": rng.uniform(50, budget, size),
+            "latitude": rng.uniform(min_lat, max_lat, size),
+            "longitude": _uniform_longitudes(rng, min_lon, max_lon, size),
+            "destination_city": pd.Categorical.from_codes(rng.integers(0, len(CITIES), size), CITIES),
+            "airline": pd.Categorical.from_codes(rng.integers(0, len(AIRLINES), size), AIRLINES),
+            "stops": rng.integers(0, 3, size),
+        })
+
+
+def synthetic_fares(start_date, end_date, region_coords, budget, num_rows, rng=None):
+    """All num_rows simulated fares as one frame."""
+    chunks = list(iter_synthetic_fares(start_date, end_date, region_coords, budget, num_rows, rng))
+    return chunks[0] if chunks else pd.DataFrame()
+
+
 class FlightExplorer:
-    def __init__(self):
-        self.flight_data = pd.DataFrame() # Placeholder for flight data
-
-    def get_flexible_dates(self, date_input):
-        """
-        Interprets user's flexible date input and returns a date range.
-        (This would need more sophisticated logic for truly natural language input)
-        """
-        today = datetime.date.today()
-        if "next month" in date_input.lower():
-            start_date = today + relativedelta(months=1, day=1)
-            end_date = today + relativedelta(months=2, day=1, days=-1)
-        elif "long weekend" in date_input.lower():
-            # Simple example: next available long weekend (Fri-Sun)
-            now = datetime.datetime.now()
-            days_until_friday = (4 - now.weekday() + 7) % 7
-            start_date = now.date() + datetime.timedelta(days=days_until_friday)
-            end_date = start_date + datetime.timedelta(days=2)
-        elif "within the next" in date_input.lower():
-            try:
-                weeks = int(date_input.lower().split("next ")[1].split(" week")[0])
-                start_date = today
-                end_date = today + datetime.timedelta(weeks=weeks)
-            except ValueError:
-                return None, None
-        else:
-            # For simplicity, assume a specific date range if no keywords are found
-            return None, None # Need to handle specific date input later
+    def __init__(self, rng=None, fare_store=None, fare_cache=None, store_fares=True, destinations=None):
+        self._flight_data = None  # Placeholder for flight data (an empty frame until the first fetch)
+        # Every fetch is also appended here so earlier searches stay queryable (unless store_fares is False).
+        self.store_fares = store_fares
+        self.fare_store = fare_store if fare_store is not None else FareStore(tiles=FareTiles())
+        # Airports and the planner's destinations (those with coordinates) can be looked up by region or distance.
+        self.regions = RegionRegistry()
+        self.regions.add_airports(load_airports())
+        self.regions.add_destinations(destinations if destinations is not None else LazyCatalog("destinations"))
+        # rng may be a seed, a SeedSequence or a numpy Generator; all randomness goes through it.
+        self.rng = np.random.default_rng(rng)
+        self.fetch_errors = []
+        # Repeated flexible searches are answered from here instead of fetching again.
+        self.fare_cache = fare_cache if fare_cache is not None else FareCache()
+        self.date_parser = FlexibleDateParser()
+
+    @property
+    def flight_data(self):
+        if self._flight_data is None:
+            self._flight_data = pd.DataFrame()
+        return self._flight_data
+
+    @flight_data.setter
+    def flight_data(self, flights):
+        self._flight_data = flights
+
+    @instrumented("flights.get_flexible_dates")
+    def get_flexible_dates(self, date_input, today=None):
+        """
+        Interprets user's flexible date input and returns a date range,
+        or (None, None) if it isn't understood (see date_phrases for the phrases handled).
+        """
+        return self.date_parser.parse(date_input, today)
 
-        return start_date, end_date
+    def get_flexible_date_windows(self, date_input, today=None):
+        """
+        Every window the input refers to, e.g. each long weekend in the fall.
+        """
+        return self.date_parser.parse_windows(date_input, today)
 
     def get_region_coordinates(self, region_input):
         """
-        Returns approximate latitude and longitude boundaries for a given region.
-        (This would need a more comprehensive database or API for regions)
-        """
-        region_input_lower = region_input.lower()
-        if "southern europe" in region_input_lower:
-            return (35, -10, 45, 30) # (min_lat, min_lon, max_lat, max_lon)
-        elif "southeast asia" in region_input_lower:
-            return (-10, 95, 25, 145)
-        elif "caribbean" in region_input_lower:
-            return (10, -85, 28, -59)
-        elif "west coast usa" in region_input_lower:
-            return (30, -125, 50, -115)
-        else:
-            return None # Region not found
+        Returns approximate latitude and longitude boundaries for a given region
+        as (min_lat, min_lon, max_lat, max_lon), or None (see geo_index.RegionRegistry).
+        """
+        return self.regions.lookup(region_input)
 
-    def fetch_flight_data(self, start_date, end_date, region_coords, budget):
+    @instrumented("flights.fetch_flight_data")
+    def fetch_flight_data(self, start_date, end_date, region_coords, budget, rng=None):
         """
         This is the core function to fetch flight data based on criteria.
         (This would involve interacting with flight APIs or scraping websites)
@@ -64,56 +123,161 @@ class FlightExplorer:
             print("Invalid date range or region.")
             return pd.DataFrame()
 
-        min_lat, min_lon, max_lat, max_lon = region_coords
-        num_flights = random.randint(5, 20)
-        data = []
-        for _ in range(num_flights):
-            departure_date = start_date + datetime.timedelta(days=random.randint(0, (end_date - start_date).days))
-            arrival_date = departure_date + datetime.timedelta(hours=random.randint(2, 15))
-            price = random.uniform(50, budget)
-            latitude = random.uniform(min_lat, max_lat)
-            longitude = random.uniform(min_lon, max_lon)
-            city = f"City {random.randint(1, 10)}" # Placeholder
-            airline = random.choice(["BudgetAir", "FlyLow", "CheapWings"])
-            data.append({"departure_date": departure_date, "arrival_date": arrival_date,
-                         "price": price, "latitude": latitude, "longitude": longitude,
-                         "destination_city": city, "airline": airline})
-        self.flight_data = pd.DataFrame(data)
+        rng = rng if rng is not None else self.rng
+        self.flight_data = synthetic_fares(start_date, end_date, region_coords, budget, int(rng.integers(5, 21)), rng)
+        if self.store_fares:
+            self.fare_store.append(self.flight_data)
+        count("flights.fares_fetched", len(self.flight_data))
+        return self.flight_data
+
+    @instrumented("flights.search_flights")
+    def search_flights(self, start_date, end_date, region_coords, budget):
+        """
+        fetch_flight_data behind the fare cache: a repeated or narrower search is served from it.
+        """
+        if start_date is None or end_date is None or region_coords is None:
+            print("Invalid date range or region.")
+            return pd.DataFrame()
+        self.flight_data = self.fare_cache.get_or_fetch(start_date, end_date, region_coords, budget, self.fetch_flight_data)
+        return self.flight_data
+
+    async def fetch_flight_data_async(self, start_date, end_date, region_coords, budget, providers, session=None):
+        """
+        Fetches fares from every provider for every day in the range concurrently (see fare_providers).
+        Each response is appended to the fare store as soon as it arrives.
+        """
+        from fare_providers import iter_provider_fares
+
+        if start_date is None or end_date is None or region_coords is None:
+            print("Invalid date range or region.")
+            return pd.DataFrame()
+
+        frames, self.fetch_errors = [], []
+        async for provider_name, day, fares, error in iter_provider_fares(providers, start_date, end_date, region_coords, budget, session):
+            if error is not None:
+                self.fetch_errors.append((provider_name, day, error))
+            elif not fares.empty:
+                if self.store_fares:
+                    self.fare_store.append(fares)
+                frames.append(fares)
+        self.flight_data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
         return self.flight_data
 
+    def fetch_from_providers(self, start_date, end_date, region_coords, budget, providers):
+        """Blocking wrapper around fetch_flight_data_async for the CLI."""
+        import asyncio
+
+        return asyncio.run(self.fetch_flight_data_async(start_date, end_date, region_coords, budget, providers))
+
+    @instrumented("flights.query_fares")
+    def query_fares(self, start_date=None, end_date=None, region_coords=None, max_budget=None,
+                    max_duration_hours=None, max_stops=None, preferred_airlines=None):
+        """
+        Region + date + budget lookup over every fare fetched so far (see FareStore.query).
+        """
+        return self.fare_store.query(start_date, end_date, region_coords, max_price=max_budget,
+                                     max_duration_hours=max_duration_hours, max_stops=max_stops, airlines=preferred_airlines)
+
+    def _round_trip_fares(self, start_date, end_date, max_length, region_coords, max_budget, return_fares, fare_filters):
+        """(outbound, inbound, return_legs) for the price calendar."""
+        outbound = self.query_fares(start_date, end_date, region_coords, max_budget, **fare_filters)
+        if return_fares is not None:
+            return outbound, return_fares, RETURN_FARES
+        # The store holds one-way fares without an origin, so they are used for both legs; the result
+        # is labelled ONE_WAY_REUSED, since that only estimates a round trip.
+        inbound = self.query_fares(start_date, end_date + datetime.timedelta(days=max_length), region_coords, max_budget, **fare_filters)
+        return outbound, inbound, ONE_WAY_REUSED
+
+    @instrumented("flights.price_calendar")
+    def price_calendar(self, start_date, end_date, min_length=1, max_length=14, region_coords=None, max_budget=None,
+                       return_fares=None, **fare_filters):
+        """
+        Cheapest outbound + return for every departure date and trip length over the fare store
+        (see price_calendar.PriceCalendar). return_fares, if given, are the return legs, with
+        destination_city being the city flown back from; otherwise stored one-way fares serve as both
+        legs and the calendar's return_legs is ONE_WAY_REUSED.
+        fare_filters are query_fares' max_duration_hours, max_stops and preferred_airlines.
+        """
+        outbound, inbound, return_legs = self._round_trip_fares(start_date, end_date, max_length, region_coords, max_budget,
+                                                                return_fares, fare_filters)
+        return build_price_calendar(outbound, inbound, start_date, end_date, min_length, max_length, return_legs)
+
+    def cheapest_trips(self, start_date, end_date, min_length=1, max_length=14, region_coords=None, max_budget=None,
+                       return_fares=None, **fare_filters):
+        """
+        Cheapest trip lasting min_length..max_length days for each departure date (see price_calendar.cheapest_by_departure).
+        Without return_fares, attrs["return_legs"] is ONE_WAY_REUSED as for price_calendar.
+        """
+        outbound, inbound, return_legs = self._round_trip_fares(start_date, end_date, max_length, region_coords, max_budget,
+                                                                return_fares, fare_filters)
+        return cheapest_by_departure(outbound, inbound, start_date, end_date, min_length, max_length, return_legs)
+
+    @instrumented("flights.filter_flights")
     def filter_flights(self, max_budget=None, max_duration_hours=None, max_stops=None, preferred_airlines=None):
         """
         Filters the fetched flight data based on user preferences.
+        All filters are fused into one boolean mask, so only the matching rows are copied.
         """
-        filtered_data = self.flight_data.copy()
-        if max_budget is not None:
-            filtered_data = filtered_data[filtered_data['price'] <= max_budget]
-        # Add more filtering logic for duration, stops, airlines later
-        return filtered_data
+        if self.flight_data.empty:
+            return self.flight_data
+        mask = fare_mask(self.flight_data, max_budget=max_budget, max_duration_hours=max_duration_hours,
+                         max_stops=max_stops, airlines=preferred_airlines)
+        return self.flight_data[mask]
 
+    @instrumented("flights.sort_flights")
     def sort_flights(self, sort_by="price"):
         """
         Sorts the filtered flight data.
         """
         return self.flight_data.sort_values(by=sort_by)
 
-    def visualize_cheap_destinations(self, filtered_flights):
+    def aggregate_cheap_destinations(self, flights, group_by="destination", cell_degrees=1.0):
+        """
+        Cheapest price and fare count per destination city (or per lat/lon grid cell), vectorized.
+        """
+        if group_by == "cell":
+            keys = GridIndex(cell_degrees).cell_ids(flights["latitude"].to_numpy(), flights["longitude"].to_numpy())
+        else:
+            keys = flights["destination_city"].astype(str).to_numpy()
+        return FareTiles.aggregate(flights, keys, key_name=group_by)
+
+    def visualize_cheap_destinations(self, filtered_flights, mode="auto", group_by="destination", output="cheap_destinations_map.html"):
         """
         (Optional) Uses folium to display cheap destinations on a map.
+        mode "markers" draws one marker per flight; "cluster" and "geojson" aggregate first
+        (see aggregate_cheap_destinations) and draw one clustered marker or GeoJSON point per group.
+        "auto" uses markers up to MAX_PLAIN_MARKERS flights and clusters above that.
         """
         if not filtered_flights.empty:
             import folium
+            from folium.plugins import FastMarkerCluster
+            if mode == "auto":
+                mode = "markers" if len(filtered_flights) <= MAX_PLAIN_MARKERS else "cluster"
             m = folium.Map(location=[filtered_flights['latitude'].mean(), filtered_flights['longitude'].mean()], zoom_start=3)
-            for index, row in filtered_flights.iterrows():
-                folium.Marker([row['latitude'], row['longitude']],
-                              popup=f"{row['destination_city']} - ${row['price']:.2f} ({row['airline']})").add_to(m)
-            m.save("cheap_destinations_map.html")
-            print("Map of cheap destinations saved to cheap_destinations_map.html")
+            if mode == "markers":
+                for index, row in filtered_flights.iterrows():
+                    folium.Marker([row['latitude'], row['longitude']],
+                                  popup=f"{row['destination_city']} - ${row['price']:.2f} ({row['airline']})").add_to(m)
+            elif mode == "geojson":
+                aggregated = self.aggregate_cheap_destinations(filtered_flights, group_by)
+                folium.GeoJson(geojson_features(aggregated), name="cheapest fares",
+                               tooltip=folium.GeoJsonTooltip(fields=["destination_city", "min_price", "count"])).add_to(m)
+            else:
+                aggregated = self.aggregate_cheap_destinations(filtered_flights, group_by)
+                popups = [f"{city} - from ${price:.2f} ({count} fares)" for city, price, count in zip(
+                    aggregated["destination_city"].astype(str).tolist(), aggregated["min_price"].tolist(), aggregated["count"].tolist())]
+                # Markers are built in the browser from this array instead of one Python object each.
+                FastMarkerCluster(list(zip(aggregated["latitude"].tolist(), aggregated["longitude"].tolist(), popups)),
+                                  callback=CLUSTER_MARKER_CALLBACK).add_to(m)
+            m.save(output)
+            print(f"Map of cheap destinations saved to {output}")
         else:
             print("No flights found within your criteria to visualize.")
 
     def run(self):
         print("Welcome to the Flexi-Date, Flexi-Destination Flight Explorer!")
+        # pandas is first needed for the search; import it while the user types.
+        warm_in_background("pandas")
 
         date_input = input("Enter a flexible date range (e.g., next month, long weekend in the fall, within the next 4 weeks): ")
         start_date, end_date = self.get_flexible_dates(date_input)
@@ -125,7 +289,7 @@ class FlightExplorer:
                 try:
                     budget = float(input("Enter your maximum budget for the flight: "))
                     print("Fetching flight data...")
-                    flights = self.fetch_flight_data(start_date, end_date, region_coords, budget)
+                    flights = self.search_flights(start_date, end_date, region_coords, budget)
                     if not flights.empty:
                         print("\nPotential cheap flights within your criteria:")
                         sorted_flights = self.sort_flights()
@@ -0,0 +1,242 @@
+"""
+Region registry and spatial lookups for the flight explorer.
+
+Regions are named bounding boxes (min_lon > max_lon for one that crosses the antimeridian).
+Points (airports from data/airports.json, catalog destinations) are kept in a lat/lon grid
+(fare_store.GridIndex), so "what is in this region" and "nearest airports to here" only look at
+the grid cells involved. FareTiles keeps the cheapest fare per grid cell up to date as fares are
+appended, so a map can be drawn from tiles instead of the full fare table.
+"""
+import json
+import os
+
+import numpy as np
+
+from catalog_store import DATA_DIR
+from fare_store import GridIndex, longitude_mask
+from lazy_imports import lazy_module
+
+pd = lazy_module("pandas")
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.19
+AIRPORTS_PATH = os.path.join(DATA_DIR, "airports.json")
+
+# (name, (min_lat, min_lon, max_lat, max_lon)), checked in this order against the user's text.
+DEFAULT_REGIONS = [
+    ("southern europe", (35, -10, 45, 30)),
+    ("southeast asia", (-10, 95, 25, 145)),
+    ("caribbean", (10, -85, 28, -59)),
+    ("west coast usa", (30, -125, 50, -115)),
+]
+
+
+def load_airports(path=AIRPORTS_PATH):
+    """{IATA code: {"city", "latitude", "longitude"}}."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def haversine_km(lat, lon, lats, lons):
+    lat, lon, lats, lons = map(np.radians, (lat, lon, lats, lons))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class PointSet:
+    """Named points (e.g. airports) in a lat/lon grid."""
+
+    def __init__(self, cell_degrees=1.0):
+        self.grid = GridIndex(cell_degrees)
+        self.names = []
+        self.latitudes = np.empty(0)
+        self.longitudes = np.empty(0)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, names, latitudes, longitudes):
+        positions = np.arange(len(self.names), len(self.names) + len(names), dtype=np.int64)
+        latitudes, longitudes = np.asarray(latitudes, dtype=float), np.asarray(longitudes, dtype=float)
+        self.names.extend(names)
+        self.latitudes = np.concatenate([self.latitudes, latitudes])
+        self.longitudes = np.concatenate([self.longitudes, longitudes])
+        self.grid.insert(latitudes, longitudes, positions)
+
+    def in_box(self, region_coords):
+        min_lat, min_lon, max_lat, max_lon = region_coords
+        positions = self.grid.range(region_coords)
+        lats, lons = self.latitudes[positions], self.longitudes[positions]
+        inside = (lats >= min_lat) & (lats <= max_lat) & longitude_mask(lons, min_lon, max_lon)
+        return [self.names[i] for i in np.sort(positions[inside])]
+
+    def _near(self, latitude, longitude, reach):
+        """Rows in every cell within reach degrees of the point; the longitude range wraps around the antimeridian."""
+        min_lat, max_lat = max(-90.0, latitude - reach), min(90.0, latitude + reach)
+        west, east = longitude - reach, longitude + reach
+        if reach >= 180:
+            spans = [(-180.0, 180.0)]
+        else:
+            spans = [(max(-180.0, west), min(180.0, east))]
+            if west < -180:
+                spans.append((west + 360, 180.0))
+            if east > 180:
+                spans.append((-180.0, east - 360))
+        # Spans meeting at +-180 can share an edge cell, hence unique.
+        return np.unique(np.concatenate([self.grid.range((min_lat, low, max_lat, high)) for low, high in spans]))
+
+    def nearest(self, latitude, longitude, k=5):
+        """The k closest points as [(name, distance_km)], searching outwards ring by ring of grid cells."""
+        if not self.names:
+            return []
+        cell = self.grid.cell_degrees
+        rings = 0
+        while True:
+            reach = (rings + 0.5) * cell
+            positions = self._near(latitude, longitude, reach)
+            # Anything outside the searched box is at least this far away.
+            covered_km = reach * KM_PER_DEGREE * np.cos(np.radians(min(89.0, abs(latitude) + reach)))
+            if len(positions) >= k or reach >= 180:
+                # haversine is periodic in longitude, so points across the antimeridian get their true distance.
+                distances = haversine_km(latitude, longitude, self.latitudes[positions], self.longitudes[positions])
+                order = np.argsort(distances, kind="stable")[:k]
+                if reach >= 180 or (len(order) == k and distances[order[-1]] <= covered_km):
+                    return [(self.names[positions[i]], float(distances[i])) for i in order]
+            rings = rings * 2 + 1
+
+
+class RegionRegistry:
+    """Named regions plus the airports and destinations that can be looked up inside them."""
+
+    def __init__(self, regions=None, cell_degrees=1.0):
+        self.regions = {}
+        for name, region_coords in (regions if regions is not None else DEFAULT_REGIONS):
+            self.add_region(name, region_coords)
+        self.airports = PointSet(cell_degrees)
+        self.destinations = PointSet(cell_degrees)
+
+    def add_region(self, name, region_coords):
+        self.regions[name.lower()] = tuple(region_coords)
+
+    def lookup(self, region_input):
+        """Bounding box of the first region named in the text, or None."""
+        region_input_lower = region_input.lower()
+        for name, region_coords in self.regions.items():
+            if name in region_input_lower:
+                return region_coords
+        return None
+
+    @staticmethod
+    def _add_located(points, entries):
+        located = [(name, details["latitude"], details["longitude"]) for name, details in entries.items()
+                   if "latitude" in details and "longitude" in details]
+        if located:
+            names, latitudes, longitudes = zip(*located)
+            points.add(list(names), latitudes, longitudes)
+
+    def add_airports(self, airports):
+        """Registers airports given as {code: {"latitude", "longitude", ...}} (see load_airports)."""
+        self._add_located(self.airports, airports)
+
+    def add_destinations(self, catalog):
+        """Registers every catalog destination that has latitude/longitude."""
+        self._add_located(self.destinations, catalog)
+
+    def _in(self, points, region):
+        region_coords = self.lookup(region) if isinstance(region, str) else region
+        return points.in_box(region_coords) if region_coords else []
+
+    def airports_in(self, region):
+        return self._in(self.airports, region)
+
+    def destinations_in(self, region):
+        return self._in(self.destinations, region)
+
+    def nearest_airports(self, latitude, longitude, k=5):
+        return self.airports.nearest(latitude, longitude, k)
+
+    def nearest_destinations(self, latitude, longitude, k=5):
+        return self.destinations.nearest(latitude, longitude, k)
+
+
+class FareTiles:
+    """Cheapest fare and fare count per grid cell, updated incrementally from appended fares."""
+
+    def __init__(self, cell_degrees=1.0):
+        self.grid = GridIndex(cell_degrees)
+        self._tiles = None  # no frame until the first update, so constructing this doesn't import pandas
+        self._dirty_cells = set()
+
+    @property
+    def tiles(self):
+        if self._tiles is None:
+            self._tiles = pd.DataFrame(columns=["min_price", "count", "latitude", "longitude", "destination_city"])
+        return self._tiles
+
+    @tiles.setter
+    def tiles(self, tiles):
+        self._tiles = tiles
+
+    @staticmethod
+    def aggregate(fares, keys, key_name="cell"):
+        """Cheapest fare (its coordinates and city) and fare count per key, computed with one sort."""
+        grouped = fares.assign(**{key_name: keys}).sort_values("price", kind="stable")
+        cheapest = grouped.drop_duplicates(key_name).set_index(key_name)
+        tiles = cheapest[["price", "latitude", "longitude", "destination_city"]].rename(columns={"price": "min_price"})
+        tiles["count"] = grouped.groupby(key_name, sort=False).size()
+        return tiles[["min_price", "count", "latitude", "longitude", "destination_city"]]
+
+    def update(self, fares):
+        if fares.empty:
+            return
+        new_tiles = self.aggregate(fares, self.grid.cell_ids(fares["latitude"].to_numpy(), fares["longitude"].to_numpy()))
+        self._dirty_cells.update(new_tiles.index.tolist())
+        if self._tiles is None or self._tiles.empty:
+            self.tiles = new_tiles
+            return
+        combined = pd.concat([self.tiles, new_tiles])
+        counts = combined.groupby(level=0)["count"].sum()
+        self.tiles = combined.sort_values("min_price", kind="stable").loc[lambda t: ~t.index.duplicated()].assign(count=counts)
+
+    def write_geojson(self, directory, tile_degrees=10.0):
+        """
+        Writes tiles as GeoJSON files of tile_degrees x tile_degrees, one per file.
+        Only files covering cells changed since the last call are rewritten.
+        """
+        os.makedirs(directory, exist_ok=True)
+        if not self._dirty_cells or self.tiles.empty:
+            return []
+        factor = max(1, int(round(tile_degrees / self.grid.cell_degrees)))
+        num_cols = self.grid.num_lon_cells
+
+        def tile_ids(cells):
+            return (cells // num_cols // factor) * num_cols + cells % num_cols // factor
+
+        dirty_tiles = set(tile_ids(np.fromiter(self._dirty_cells, dtype=np.int64)).tolist())
+        written = []
+        for tile_id, tile in self.tiles.groupby(tile_ids(self.tiles.index.to_numpy()), sort=False):
+            if tile_id not in dirty_tiles:
+                continue
+            file_path = os.path.join(directory, f"tile_{tile_id // num_cols}_{tile_id % num_cols}.geojson")
+            with open(file_path, "w") as f:
+                # dumps, not dump: dump streams through the pure-Python encoder.
+                f.write(json.dumps(geojson_features(tile)))
+            written.append(file_path)
+        self._dirty_cells.clear()
+        return written
+
+    def in_box(self, region_coords):
+        min_lat, min_lon, max_lat, max_lon = region_coords
+        tiles = self.tiles
+        inside = tiles["latitude"].between(min_lat, max_lat) & longitude_mask(tiles["longitude"], min_lon, max_lon)
+        return tiles[inside.to_numpy()]
+
+
+def geojson_features(aggregated):
+    """FeatureCollection with one point per aggregated row (see FareTiles.aggregate)."""
+    return {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+         "properties": {"destination_city": str(city), "min_price": round(price, 2), "count": count}}
+        for latitude, longitude, city, price, count in zip(
+            aggregated["latitude"].tolist(), aggregated["longitude"].tolist(), aggregated["destination_city"].tolist(),
+            aggregated["min_price"].tolist(), aggregated["count"].tolist())]}
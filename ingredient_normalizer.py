@@ -0,0 +1,161 @@
+"""
+Ingredient normalization for the recipe generator.
+
+Free-text ingredients ("2 Tomatoes", "scallions", "mozarella") are resolved to canonical
+ingredient IDs: lowercased, quantities stripped, synonyms replaced and the last word stemmed
+to its singular, so "tomatoes" and "tomato" or "cucumbers" and "cucumber" are the same ID.
+Tokens that still aren't in the vocabulary are matched to the closest vocabulary ID within a
+small edit distance through a BK-tree built once over the vocabulary. Every token is resolved
+once and memoized, so repeated pantries cost a dictionary lookup per ingredient.
+"""
+import re
+from functools import lru_cache
+
+# Alternative name -> the name used in the catalog.
+SYNONYMS = {
+    "scallion": "spring onion", "green onion": "spring onion", "aubergine": "eggplant", "brinjal": "eggplant",
+    "courgette": "zucchini", "capsicum": "bell pepper", "garbanzo": "chickpea",
+    "garbanzo bean": "chickpea", "chana": "chickpea", "minced meat": "ground meat", "mince": "ground meat",
+    "ground beef": "ground meat", "parmigiano": "parmesan", "parmigiano reggiano": "parmesan", "evoo": "olive oil",
+    "extra virgin olive oil": "olive oil", "bbq sauce": "barbecue sauce", "prawn": "shrimp", "curd": "yogurt",
+    "yoghurt": "yogurt", "dahi": "yogurt", "chilli": "chili", "chillies": "chili", "chilies": "chili", "chile": "chili", "paneer cheese": "paneer",
+    "jeera": "cumin", "haldi": "turmeric", "tamatar": "tomato", "pyaz": "onion", "aloo": "potato",
+    "rocket": "arugula", "maize": "corn", "tortilla chip": "tortilla",
+    # Coriander seed (the spice) and its leaves (cilantro) are different ingredients; plain "coriander" is the spice.
+    "coriander seed": "coriander", "ground coriander": "coriander", "coriander leaf": "cilantro", "dhania": "cilantro",
+    # Herbs whose leaves are the ingredient. Other leaves are ingredients of their own ("bay leaf", "curry leaf").
+    "basil leaf": "basil", "mint leaf": "mint", "cilantro leaf": "cilantro", "parsley leaf": "parsley",
+}
+# Leading quantities and units ("2 cups", "500g", "a pinch of") that don't change the ingredient.
+QUANTITY_PATTERN = re.compile(r"""
+    ^(?:\d+(?:[./]\d+)?\s*|a\s+|an\s+|some\s+|few\s+)*
+    (?:(?:cups?|tbsps?|tsps?|tablespoons?|teaspoons?|g|kg|grams?|ml|l|lbs?|oz|pinch(?:es)?|cloves?\s+of|handful|bunch(?:es)?)\b\s*(?:of\s+)?)?
+""", re.VERBOSE)
+NON_WORD_PATTERN = re.compile(r"[^a-z\s]+")
+# Preparation words that don't change which ingredient it is ("fresh basil", "chopped onions", "thyme sprigs").
+# Only words that can't be part of an ingredient's name: "leaf" is kept, since "bay leaf" isn't "bay".
+DESCRIPTOR_PATTERN = re.compile(r"\b(?:fresh|freshly|chopped|diced|sliced|grated|shredded|dried|frozen|canned|tinned|ripe|raw|"
+                                r"organic|large|small|whole|crushed|peeled|finely|roughly)\b|\s+sprigs?$")
+# Words that end in s but aren't plurals, and plurals the suffix rules get wrong.
+NOT_PLURAL = ("ss", "us", "is")
+IRREGULAR_PLURALS = {"leaves": "leaf", "halves": "half", "loaves": "loaf", "knives": "knife", "cookies": "cookie",
+                     "molasses": "molasses", "pies": "pie", "fries": "fries", "greens": "greens"}
+
+
+def stem(word):
+    """Singular form of an English plural (tomatoes -> tomato, berries -> berry, olives -> olive)."""
+    if word in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[word]
+    if len(word) <= 3 or word.endswith(NOT_PLURAL) or not word.endswith("s"):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes", "zes", "sses")):
+        return word[:-2]
+    return word[:-1]
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 once it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """Burkhard-Keller tree over strings: finds every term within an edit distance without scanning them all."""
+
+    def __init__(self, terms=()):
+        self.root = None
+        for term in terms:
+            self.add(term)
+
+    def add(self, term):
+        if self.root is None:
+            self.root = (term, {})
+            return
+        node = self.root
+        while True:
+            distance = edit_distance(term, node[0], max(len(term), len(node[0])))
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (term, {})
+                return
+            node = child
+
+    def search(self, term, max_distance):
+        """(distance, term) for every term within max_distance, closest first."""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_term, children = stack.pop()
+            distance = edit_distance(term, node_term, max(len(term), len(node_term)))
+            if distance <= max_distance:
+                found.append((distance, node_term))
+            stack.extend(child for d, child in children.items() if distance - max_distance <= d <= distance + max_distance)
+        return sorted(found)
+
+
+def typo_tolerance(token):
+    """Edits allowed for a token of this length: none for short words, where one edit is another word."""
+    return 0 if len(token) <= 5 else 1 if len(token) <= 9 else 2
+
+
+class IngredientNormalizer:
+    def __init__(self, vocabulary=(), synonyms=None, cache_size=16384):
+        self.synonyms = {}
+        for alias, name in (SYNONYMS if synonyms is None else synonyms).items():
+            self.synonyms[self._stem_phrase(self._clean(alias))] = self._stem_phrase(self._clean(name))
+        self.vocabulary = {}  # canonical ID -> position, in the order terms were first seen
+        for term in vocabulary:
+            self.vocabulary.setdefault(self._canonical(term), len(self.vocabulary))
+        self._tree = BKTree(self.vocabulary)
+        self.normalize = lru_cache(maxsize=cache_size)(self._resolve)
+
+    @staticmethod
+    def _clean(text):
+        text = NON_WORD_PATTERN.sub(" ", QUANTITY_PATTERN.sub("", text.lower().strip()))
+        return " ".join(DESCRIPTOR_PATTERN.sub(" ", " ".join(text.split())).split())
+
+    @staticmethod
+    def _stem_phrase(text):
+        words = text.split(" ")
+        words[-1] = stem(words[-1])
+        return " ".join(words)
+
+    def _canonical(self, text):
+        """Canonical ID from spelling rules alone (no typo matching)."""
+        cleaned = self._clean(text)
+        stemmed = self._stem_phrase(cleaned) if cleaned else cleaned
+        return self.synonyms.get(cleaned) or self.synonyms.get(stemmed) or stemmed
+
+    def _resolve(self, token):
+        canonical = self._canonical(token)
+        if not canonical or canonical in self.vocabulary:
+            return canonical
+        tolerance = typo_tolerance(canonical)
+        if tolerance:
+            matches = self._tree.search(canonical, tolerance)
+            if matches:
+                best = matches[0][0]
+                # Among equally close terms prefer the one seen first in the catalog.
+                return min((term for distance, term in matches if distance == best), key=self.vocabulary.get)
+        return canonical
+
+    def normalize_many(self, tokens):
+        """Canonical IDs for a list of tokens (normalize is memoized per token)."""
+        return [self.normalize(token) for token in tokens]
+
+    def parse(self, text):
+        """Canonical IDs from a search-box string: items separated by commas, semicolons or "and"."""
+        return [ingredient for ingredient in self.normalize_many(re.split(r",|;|\band\b", text)) if ingredient]
@@ -0,0 +1,171 @@
+"""
+Opt-in timing and counters for the hot paths of the planner, the flight explorer and the recipe generator.
+
+    TRAVEL_INSTRUMENT=1 python surprise_itinerary.py       # per-stage timing histograms and counters on exit
+    TRAVEL_PROFILE=run.prof python surprise_itinerary.py   # cProfile the whole run into run.prof
+    TRAVEL_PROFILE=1 python surprise_itinerary.py          # ... or print the top functions on exit
+
+Stages are functions decorated with @instrumented("name") or blocks under `with stage("name")`.
+Each stage's durations go into a histogram of power-of-two microsecond buckets, which is enough
+for percentiles without keeping every sample. Switched off (the default), a stage costs one flag
+check per call. enable() / disable() switch instrumentation at runtime, e.g. from a benchmark.
+"""
+import atexit
+import functools
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+NUM_BUCKETS = 40  # bucket i holds durations in [2**(i-1), 2**i) microseconds; the last one everything longer
+
+_enabled = bool(os.environ.get("TRAVEL_INSTRUMENT"))
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+
+
+class Histogram:
+    """Durations in power-of-two microsecond buckets, plus exact count, total, min and max."""
+
+    __slots__ = ("buckets", "count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.buckets = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = 0.0
+
+    def add(self, seconds):
+        microseconds = int(seconds * 1e6)
+        self.buckets[min(microseconds.bit_length(), NUM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        self.minimum = min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples, in seconds (capped at the max)."""
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min(2 ** bucket / 1e6, self.maximum)
+        return self.maximum
+
+    def summary(self):
+        return {"count": self.count, "total": self.total, "mean": self.total / self.count if self.count else 0.0,
+                "min": self.minimum if self.count else 0.0, "p50": self.percentile(0.5), "p90": self.percentile(0.9),
+                "p99": self.percentile(0.99), "max": self.maximum}
+
+
+def enabled():
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def record(name, seconds):
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(seconds)
+
+
+def count(name, amount=1):
+    """Adds amount to counter name (when instrumentation is on)."""
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + amount
+
+
+@contextmanager
+def stage(name):
+    """Times the block as stage name (when instrumentation is on)."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def instrumented(name):
+    """Decorator: times every call of the function as stage name (when instrumentation is on)."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    """{"stages": {name: summary}, "counters": {name: value}} of everything recorded so far."""
+    with _lock:
+        return {"stages": {name: histogram.summary() for name, histogram in sorted(_histograms.items())},
+                "counters": dict(sorted(_counters.items()))}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def report(out=None):
+    """Prints the stage timings (in milliseconds) and the counters."""
+    out = out or sys.stderr
+    data = snapshot()
+    if data["stages"]:
+        out.write(f"{'stage':<44} {'calls':>8} {'total':>10} {'mean':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}\n")
+        for name, summary in data["stages"].items():
+            out.write(f"{name:<44} {summary['count']:>8} {summary['total'] * 1000:>10.3f} "
+                      + " ".join(f"{summary[key] * 1000:>9.3f}" for key in ("mean", "p50", "p90", "p99", "max")) + "\n")
+    for name, value in data["counters"].items():
+        out.write(f"{name:<44} {value:>8}\n")
+
+
+def _start_profiler(target):
+    import cProfile
+
+    profiler = cProfile.Profile()
+
+    def finish():
+        profiler.disable()
+        if target in ("1", "true", "yes"):
+            import pstats
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+        else:
+            profiler.dump_stats(target)
+            sys.stderr.write(f"Profile written to {target}\n")
+
+    atexit.register(finish)
+    profiler.enable()
+    return profiler
+
+
+if _enabled:
+    atexit.register(report)
+if os.environ.get("TRAVEL_PROFILE"):
+    _profiler = _start_profiler(os.environ["TRAVEL_PROFILE"])
@@ -0,0 +1,291 @@
+"""
+Saved itineraries: compact day records, indexed by ID, user and destination, with incremental edits.
+
+A stored itinerary keeps its days as an int32 array with one row per day, holding the catalog
+positions of that day's activity, accommodation, meal and optional second meal (-1 for none).
+It is materialized into the planner's usual itinerary dict only when it is read. Edits re-plan
+only the days they touch. Changing the budget or the number of days redraws just the picks that
+no longer fit the new daily budget, plus any added days. Draws come from the planner's
+ItineraryEngine affordable sets, which are cached per (destination, daily budget).
+
+With a path, records are also written through to sqlite (WAL mode) and loaded on startup.
+"""
+import sqlite3
+import threading
+import uuid
+from dataclasses import dataclass
+
+import numpy as np
+
+ACTIVITY, ACCOMMODATION, FOOD, EXTRA_FOOD = range(4)
+# Columns drawn from a budget-limited affordable set; the second meal is drawn from all food, as in generation.
+BUDGETED_COLUMNS = ((ACTIVITY, "activities"), (ACCOMMODATION, "accommodations"), (FOOD, "food"))
+
+
+@dataclass(slots=True)
+class StoredItinerary:
+    itinerary_id: str
+    user: str
+    destination: str
+    budget: float
+    days: np.ndarray  # int32, (num_days, 4): activity, accommodation, food, extra food (-1 for none)
+    version: int = 1
+
+
+class ItineraryStore:
+    def __init__(self, planner, path=None):
+        self.planner = planner
+        self._records = {}
+        self._by_user = {}  # user -> {itinerary_id: None}, in insertion order
+        self._by_destination = {}  # destination (lowercase) -> {itinerary_id: None}
+        # Both are cached with what they were built from (the catalog entry, the engine's pools), so a
+        # replaced or removed catalog entry is never read through a stale cache.
+        self._positions = {}  # (destination, category) -> (details, {entry name: catalog position})
+        self._affordable = {}  # (destination, daily budget) -> (pools, {column: bool mask over the catalog entries})
+        self._lock = threading.RLock()
+        self._db = None
+        if path:
+            self._open(path)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, itinerary_id):
+        return itinerary_id in self._records
+
+    def _details(self, destination):
+        details = self.planner.get_destination_details(destination)
+        if not details:
+            return "Destination not found."
+        if not all(details.get(category) for _, category in BUDGETED_COLUMNS):
+            return "Insufficient data for a surprise itinerary for this destination."
+        return details
+
+    def _pools(self, destination, budget, num_days):
+        return self.planner.engine.pools(destination, budget / num_days if budget else None)
+
+    def _affordable_masks(self, destination, budget, num_days, pools):
+        key = (destination.lower(), budget / num_days if budget else None)
+        cached = self._affordable.get(key)
+        if cached is None or cached[0] is not pools:
+            masks = {}
+            for column, category in BUDGETED_COLUMNS:
+                items, choices = pools[category]
+                masks[column] = np.zeros(len(items), dtype=bool)
+                masks[column][choices] = True
+            cached = self._affordable[key] = (pools, masks)
+        return cached[1]
+
+    def invalidate(self, destination=None):
+        """Drops the catalog positions and affordable masks cached for destination (for every destination if None)."""
+        with self._lock:
+            for cache in (self._positions, self._affordable):
+                if destination is None:
+                    cache.clear()
+                else:
+                    for key in [key for key in cache if key[0] == destination.lower()]:
+                        del cache[key]
+
+    def _draw(self, pools, num_days):
+        rng = self.planner.rng
+        days = np.empty((num_days, 4), dtype=np.int32)
+        for column, category in BUDGETED_COLUMNS:
+            choices = pools[category][1]
+            days[:, column] = choices[rng.integers(len(choices), size=num_days)]
+        extra = rng.integers(len(pools["food"][0]), size=num_days)
+        days[:, EXTRA_FOOD] = np.where(rng.random(num_days) < 0.7, extra, -1)
+        return days
+
+    def _add(self, record):
+        with self._lock:
+            self._records[record.itinerary_id] = record
+            self._by_user.setdefault(record.user, {})[record.itinerary_id] = None
+            self._by_destination.setdefault(record.destination.lower(), {})[record.itinerary_id] = None
+            self._persist(record)
+        return record.itinerary_id
+
+    def create(self, user, destination, budget=None, num_days=3, itinerary_id=None):
+        """Plans and saves a random itinerary for user; returns its ID, or an error string."""
+        details = self._details(destination)
+        if isinstance(details, str):
+            return details
+        days = self._draw(self._pools(destination, budget, num_days), num_days)
+        return self._add(StoredItinerary(itinerary_id or f"itinerary_{uuid.uuid4().hex[:12]}", user, destination, budget, days))
+
+    def save(self, user, itinerary, budget=None):
+        """Saves an itinerary dict from any of the planner's generators for user; returns its ID, or an error string."""
+        destination = itinerary["destination"]
+        details = self._details(destination)
+        if isinstance(details, str):
+            return details
+        days = np.full((len(itinerary["days"]), 4), -1, dtype=np.int32)
+        try:
+            for row, day_plan in enumerate(itinerary["days"]):
+                days[row, ACTIVITY] = self._position(destination, "activities", day_plan["activities"][0]["name"])
+                days[row, ACCOMMODATION] = self._position(destination, "accommodations", day_plan["accommodation"]["name"])
+                for column, meal in zip((FOOD, EXTRA_FOOD), day_plan["food"]):
+                    days[row, column] = self._position(destination, "food", meal["name"])
+        except (KeyError, IndexError):
+            return "Itinerary doesn't match the destination's catalog."
+        itinerary_id = itinerary.get("id")
+        if not itinerary_id or itinerary_id in self._records:
+            itinerary_id = f"itinerary_{uuid.uuid4().hex[:12]}"
+        return self._add(StoredItinerary(itinerary_id, user, destination, budget, days))
+
+    def _position(self, destination, category, name):
+        key = (destination.lower(), category)
+        details = self.planner.get_destination_details(destination)
+        cached = self._positions.get(key)
+        if cached is None or cached[0] is not details:
+            positions = {}
+            for position, entry in enumerate(details.get(category, [])):
+                positions.setdefault(entry["name"], position)
+            cached = self._positions[key] = (details, positions)
+        return cached[1][name]
+
+    def get(self, itinerary_id):
+        """
+        The itinerary as the planner's usual dict, None if there is no such ID, or an error string if
+        the destination has since been removed from the catalog or no longer has the saved picks.
+        """
+        record = self._records.get(itinerary_id)
+        if record is None:
+            return None
+        details = self._details(record.destination)
+        if isinstance(details, str):
+            return details
+        activities, accommodations, food = details["activities"], details["accommodations"], details["food"]
+        days = []
+        try:
+            for day, (activity, accommodation, meal, extra) in enumerate(record.days.tolist(), 1):
+                if activity < 0 or accommodation < 0:
+                    raise IndexError(day)
+                # -1 is "no meal" (a saved itinerary may have days without food), never food[-1].
+                meals = [food[position] for position in (meal, extra) if position >= 0]
+                days.append({"day": day, "activities": [activities[activity]], "accommodation": accommodations[accommodation], "food": meals})
+        except IndexError:
+            return "Itinerary doesn't match the destination's catalog."
+        return {"id": record.itinerary_id, "destination": record.destination, "days": days}
+
+    def record(self, itinerary_id):
+        return self._records.get(itinerary_id)
+
+    def find(self, user=None, destination=None):
+        """IDs of saved itineraries for user and/or destination, oldest first."""
+        if user is None and destination is None:
+            return list(self._records)
+        by_user = self._by_user.get(user, {}) if user is not None else None
+        by_destination = self._by_destination.get(destination.lower(), {}) if destination is not None else None
+        if by_user is None or by_destination is None:
+            return list(by_user if by_user is not None else by_destination)
+        smaller, larger = sorted((by_user, by_destination), key=len)
+        return [itinerary_id for itinerary_id in smaller if itinerary_id in larger]
+
+    def delete(self, itinerary_id):
+        with self._lock:
+            record = self._records.pop(itinerary_id, None)
+            if record is None:
+                return False
+            self._by_user[record.user].pop(itinerary_id, None)
+            self._by_destination[record.destination.lower()].pop(itinerary_id, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM itineraries WHERE itinerary_id = ?", (itinerary_id,))
+            return True
+
+    def _update(self, record, days, budget):
+        with self._lock:
+            record.days = days
+            record.budget = budget
+            record.version += 1
+            self._persist(record)
+        return self.get(record.itinerary_id)
+
+    def swap_activity(self, itinerary_id, day, activity_name=None):
+        """
+        Replaces one day's activity (day numbers start at 1) with activity_name, or with another
+        affordable activity drawn at random. Returns the updated itinerary, or an error string.
+        """
+        record = self._records.get(itinerary_id)
+        if record is None:
+            return "Itinerary not found."
+        if not 1 <= day <= len(record.days):
+            return "Day not in itinerary."
+        details = self._details(record.destination)
+        if isinstance(details, str):
+            return details
+        current = record.days[day - 1, ACTIVITY]
+        if activity_name is not None:
+            try:
+                activity = self._position(record.destination, "activities", activity_name)
+            except KeyError:
+                return "Activity not found."
+        else:
+            choices = self._pools(record.destination, record.budget, len(record.days))["activities"][1]
+            choices = choices[choices != current]
+            if not len(choices):
+                return "No other activity fits this budget."
+            activity = choices[self.planner.rng.integers(len(choices))]
+        days = record.days.copy()
+        days[day - 1, ACTIVITY] = activity
+        return self._update(record, days, record.budget)
+
+    def replan(self, itinerary_id, budget=None, num_days=None):
+        """
+        Changes the trip budget and/or length. Kept days keep every pick that still fits the new daily
+        budget; only the picks that don't, and any added days, are drawn again. Returns the updated
+        itinerary, or an error string.
+        """
+        record = self._records.get(itinerary_id)
+        if record is None:
+            return "Itinerary not found."
+        details = self._details(record.destination)
+        if isinstance(details, str):
+            return details
+        budget = record.budget if budget is None else budget
+        num_days = len(record.days) if num_days is None else num_days
+        if num_days < 1:
+            return "An itinerary needs at least one day."
+        pools = self._pools(record.destination, budget, num_days)
+        days = record.days[:num_days]
+        masks = self._affordable_masks(record.destination, budget, num_days, pools)
+        # A meal of -1 (none) stays none.
+        stale = {column: np.flatnonzero((days[:, column] >= 0) & ~mask[days[:, column]]) for column, mask in masks.items()}
+        if len(days) < num_days or any(len(rows) for rows in stale.values()):
+            drawn = self._draw(pools, num_days)
+            days = np.concatenate([days, drawn[len(days):]])
+            for column, rows in stale.items():
+                days[rows, column] = drawn[rows, column]
+        return self._update(record, days, budget)
+
+    def set_budget(self, itinerary_id, budget):
+        return self.replan(itinerary_id, budget=budget)
+
+    def set_num_days(self, itinerary_id, num_days):
+        return self.replan(itinerary_id, num_days=num_days)
+
+    def _open(self, path):
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS itineraries (itinerary_id TEXT PRIMARY KEY, user TEXT, destination TEXT, "
+                         "budget REAL, version INTEGER, days BLOB)")
+        rows = self._db.execute("SELECT itinerary_id, user, destination, budget, version, days FROM itineraries ORDER BY rowid")
+        for itinerary_id, user, destination, budget, version, days in rows.fetchall():
+            record = StoredItinerary(itinerary_id, user, destination, budget, np.frombuffer(days, dtype=np.int32).reshape(-1, 4).copy(),
+                                     version)
+            self._records[itinerary_id] = record
+            self._by_user.setdefault(user, {})[itinerary_id] = None
+            self._by_destination.setdefault(destination.lower(), {})[itinerary_id] = None
+
+    def _persist(self, record):
+        if self._db is not None:
+            # An upsert rather than INSERT OR REPLACE keeps the rowid, and with it the load order.
+            self._db.execute("INSERT INTO itineraries VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (itinerary_id) DO UPDATE SET "
+                             "budget = excluded.budget, version = excluded.version, days = excluded.days",
+                             (record.itinerary_id, record.user, record.destination, record.budget, record.version,
+                              record.days.astype(np.int32).tobytes()))
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
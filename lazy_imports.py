@@ -0,0 +1,62 @@
+"""
+Deferred imports for heavy dependencies.
+
+    pd = lazy_module("pandas")
+
+binds a stand-in that imports pandas the first time one of its attributes is used (or pandas
+itself, if it was already imported), so importing a module (or starting a CLI that never reaches
+a DataFrame) doesn't pay pandas' import time.
+warm_in_background starts those imports on a daemon thread, e.g. while a CLI waits for input.
+"""
+import importlib
+import sys
+import threading
+
+
+class LazyModule:
+    """Stands in for a module until one of its attributes is used."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            # import_module holds the import lock, so concurrent first uses import only once.
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+_lazy_modules = {}
+
+
+def lazy_module(name):
+    """The module itself if it's already imported, else the shared LazyModule for name."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    module = _lazy_modules.get(name)
+    if module is None:
+        module = _lazy_modules[name] = LazyModule(name)
+    return module
+
+
+def warm_in_background(*names):
+    """Imports names on a daemon thread; returns the thread."""
+    def load():
+        for name in names:
+            importlib.import_module(name)
+
+    thread = threading.Thread(target=load, name="warm-imports", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,134 @@
+"""
+Meal types by the diner's local time of day.
+
+A meal window is (meal type, start hour, end hour) in local time, end exclusive; a window whose
+end is before its start wraps past midnight. A time no window covers gets the fallback meal type,
+"snack". The default windows and the per-cuisine ones in the catalog run back to back, so only the
+night falls through. Windows are compiled once into a table of the day's 15-minute slots, so
+bucketing a time is an array lookup.
+
+Timezones are IANA names ("Europe/Paris"), "UTC" or fixed offsets ("+05:30"), resolved through
+zoneinfo once per name. For a batch, the UTC offset is looked up once per (timezone, UTC day)
+actually present, and everything else is numpy arithmetic over the whole batch.
+"""
+import datetime
+import re
+import zoneinfo
+from functools import lru_cache
+
+import numpy as np
+
+DEFAULT_TIMEZONE = "Asia/Kolkata"
+FALLBACK_MEAL = "snack"
+# Back to back from 05:00 to 23:00; only the night, 23:00-05:00, falls through to FALLBACK_MEAL.
+DEFAULT_MEAL_WINDOWS = (("breakfast", 5, 11), ("lunch", 11, 16), ("dinner", 16, 23))
+SLOT_SECONDS = 15 * 60
+SLOTS_PER_DAY = 24 * 3600 // SLOT_SECONDS
+OFFSET_PATTERN = re.compile(r"(?:UTC|GMT)?([+-])(\d{1,2})(?::?(\d{2}))?")
+
+
+@lru_cache(maxsize=None)
+def get_zone(name):
+    """tzinfo for a timezone name or UTC offset; ValueError if it isn't one."""
+    if isinstance(name, datetime.tzinfo):
+        return name
+    text = str(name).strip()
+    match = OFFSET_PATTERN.fullmatch(text)
+    if match:
+        sign, hours, minutes = match.groups()
+        offset = datetime.timedelta(hours=int(hours), minutes=int(minutes or 0))
+        if offset > datetime.timedelta(hours=14):
+            raise ValueError(f"Unknown timezone: {name}")
+        return datetime.timezone(-offset if sign == "-" else offset)
+    try:
+        return zoneinfo.ZoneInfo(text)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name}") from None
+
+
+def local_time(tz=DEFAULT_TIMEZONE, now=None):
+    """now (default: the current time; naive datetimes are UTC) as an aware datetime in tz."""
+    zone = get_zone(tz)
+    if now is None:
+        return datetime.datetime.now(zone)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=datetime.timezone.utc)
+    return now.astimezone(zone)
+
+
+def _epoch_seconds(timestamps):
+    values = np.asarray(timestamps)
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[s]").astype(np.int64)
+    if values.dtype.kind in "iuf":
+        return np.floor(values).astype(np.int64)
+    # datetimes (naive ones are UTC) mixed with epoch seconds
+    return np.array([local_time("UTC", value).timestamp() if isinstance(value, datetime.datetime) else value
+                     for value in values.tolist()], dtype=float).astype(np.int64)
+
+
+def _utc_offset(zone, epoch_second):
+    return int(datetime.datetime.fromtimestamp(epoch_second, zone).utcoffset().total_seconds())
+
+
+def local_seconds(timestamps, timezones):
+    """
+    Local wall-clock time, as seconds since the epoch, for each timestamp (epoch seconds,
+    datetimes or datetime64) in its timezone; timezones is one name or one per timestamp.
+    """
+    seconds = _epoch_seconds(timestamps)
+    if isinstance(timezones, (str, datetime.tzinfo)):
+        zone_names, zone_ids = [timezones], np.zeros(len(seconds), dtype=np.int64)
+    else:
+        zone_names, zone_ids = np.unique(np.asarray(timezones, dtype=object).astype(str), return_inverse=True)
+        zone_ids = zone_ids.reshape(-1)
+    zones = [get_zone(name) for name in zone_names]
+    days = seconds // 86400
+    low = days.min(initial=0)
+    # One offset lookup per distinct (zone, UTC day); only rows on a day with a DST change are looked up one by one.
+    _, first, inverse = np.unique(zone_ids * (days.max(initial=0) - low + 1) + (days - low), return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    day_starts = [(zones[zone_ids[i]], int(days[i]) * 86400) for i in first.tolist()]
+    at_start = np.array([_utc_offset(zone, start) for zone, start in day_starts], dtype=np.int64)
+    at_end = np.array([_utc_offset(zone, start + 86399) for zone, start in day_starts], dtype=np.int64)
+    offsets = at_start[inverse]
+    for i in np.flatnonzero((at_start != at_end)[inverse]).tolist():
+        offsets[i] = _utc_offset(zones[zone_ids[i]], int(seconds[i]))
+    return seconds + offsets
+
+
+class MealWindows:
+    """(meal type, start hour, end hour) windows over the day; hours outside every window are the fallback meal."""
+
+    def __init__(self, windows=DEFAULT_MEAL_WINDOWS, fallback=FALLBACK_MEAL):
+        self.windows = tuple((meal, start, end) for meal, start, end in windows)
+        self.meal_types = np.array([fallback] + [meal for meal, _, _ in self.windows])
+        self.table = np.zeros(SLOTS_PER_DAY, dtype=np.int8)
+        for position, (meal, start, end) in enumerate(self.windows, 1):
+            if not (0 <= start <= 24 and 0 <= end <= 24):
+                raise ValueError(f"Meal window hours must be 0-24: {meal} {start}-{end}")
+            first, last = round(start * 3600 / SLOT_SECONDS), round(end * 3600 / SLOT_SECONDS)
+            if first <= last:
+                self.table[first:last] = position
+            else:
+                self.table[first:] = position
+                self.table[:last] = position
+
+    def __repr__(self):
+        return f"MealWindows({list(self.windows)!r})"
+
+    def meal_at(self, when):
+        """Meal type for a local datetime or time."""
+        seconds = when.hour * 3600 + when.minute * 60 + when.second
+        return str(self.meal_types[self.table[seconds // SLOT_SECONDS]])
+
+    def meals_at(self, local_epoch_seconds):
+        """Meal types (a string array) for local wall-clock times from local_seconds."""
+        return self.meal_types[self.table[(np.asarray(local_epoch_seconds) % 86400) // SLOT_SECONDS]]
+
+    def bucket(self, users, timestamps, timezones):
+        """meal type -> users, in input order, for parallel sequences of users, timestamps and timezones."""
+        buckets = {}
+        for user, meal in zip(users, self.meals_at(local_seconds(timestamps, timezones)).tolist()):
+            buckets.setdefault(meal, []).append(user)
+        return buckets
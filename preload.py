@@ -0,0 +1,216 @@
+"""
+Preloaded fork server for the command-line tools.
+
+    python preload.py serve &     # imports everything and warms the catalogs, once
+    python preload.py planner     # TravelPlanner.run
+    python preload.py flights     # FlightExplorer.run
+    python preload.py recipes     # the recipe generator's main()
+
+The server imports numpy and pandas, decodes both catalogs, builds the ingredient normalizer and
+the date tables, then waits on a Unix socket. A tool invocation connects and hands over its stdin,
+stdout and stderr; the server forks a child that runs the tool on those descriptors from the warm
+state (copy-on-write, so the warmed pages are shared, not copied) and reports its exit status
+straight back to the caller. Each child draws from fresh random streams, so runs don't repeat each
+other's itineraries. With no server listening the tool simply runs in-process.
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+
+DEFAULT_SOCKET = os.environ.get("TRAVEL_PRELOAD_SOCKET", os.path.join(tempfile.gettempdir(), f"travel-preload-{os.getuid()}.sock"))
+COMMANDS = ("planner", "flights", "recipes")
+# How often (seconds) an idle server wakes to reap finished children.
+REAP_INTERVAL = 1.0
+
+
+def warm_state():
+    """One warmed instance of each tool: catalogs decoded, lookup tables built and pandas imported."""
+    from dynamic_recipe_generator import RecipeGenerator
+    from flexi_date_flexi_destination_flight import FlightExplorer
+    from surprise_itinerary import TravelPlanner
+
+    planner = TravelPlanner()
+    for name in list(planner.destinations_data):
+        planner.get_destination_details(name)
+    recipes = RecipeGenerator()
+    for name in list(recipes.cuisine_data):
+        recipes.find_matching_hints([], name)  # decodes the cuisine and indexes its hints
+    recipes.normalizer
+    explorer = FlightExplorer()
+    explorer.get_flexible_dates("next weekend")
+    explorer.flight_data  # imports pandas
+    return {"planner": planner, "flights": explorer, "recipes": recipes}
+
+
+def run_tool(command, state=None):
+    """Runs one tool, from a warm state or built from scratch."""
+    if command == "planner":
+        from surprise_itinerary import TravelPlanner
+        (state["planner"] if state else TravelPlanner()).run()
+    elif command == "flights":
+        from flexi_date_flexi_destination_flight import FlightExplorer
+        (state["flights"] if state else FlightExplorer()).run()
+    else:
+        from dynamic_recipe_generator import main
+        main(state["recipes"] if state else None)
+
+
+def _send(conn, message):
+    conn.sendall(json.dumps(message).encode() + b"\n")
+
+
+def _run_child(conn, request, fds, state):
+    """In the forked child: adopt the caller's stdio, run the tool and report the exit status."""
+    import numpy as np
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    os.chdir(request.get("cwd") or os.getcwd())
+    for fd, target in zip(fds, (0, 1, 2)):
+        os.dup2(fd, target)
+        os.close(fd)
+    sys.stdin = open(0, "r", closefd=False)
+    sys.stdout = open(1, "w", buffering=1, closefd=False)
+    sys.stderr = open(2, "w", buffering=1, closefd=False)
+    for tool in state.values():
+        tool.rng = np.random.default_rng()
+    _send(conn, {"pid": os.getpid()})
+    status = 0
+    try:
+        run_tool(request["command"], state)
+    except SystemExit as error:
+        # As the interpreter exits: None is success, anything but an int is printed and fails.
+        if error.code is None or isinstance(error.code, int):
+            status = error.code or 0
+        else:
+            print(error.code, file=sys.stderr)
+            status = 1
+    except KeyboardInterrupt:
+        status = 130
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        status = 1
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        _send(conn, {"status": status})
+    except OSError:
+        pass  # the caller went away (closed pipe or socket); nothing left to report to
+    return status
+
+
+def _reap(children):
+    """Collects the children that have finished; each reports its own status to its caller."""
+    while children:
+        pid, _ = os.waitpid(-1, os.WNOHANG)
+        if not pid:
+            break
+        children.discard(pid)
+
+
+def _stop(signum, frame):
+    raise SystemExit(0)
+
+
+def serve(path=DEFAULT_SOCKET, state=None):
+    """Serves tool runs on path until stopped; state is the warmed tools (warm_state() if None)."""
+    signal.signal(signal.SIGTERM, _stop)  # so a plain kill still removes the socket
+    state = warm_state() if state is None else state
+    if os.path.exists(path):
+        os.unlink(path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Owner-only from the moment it exists: a chmod after bind would leave a window where anyone could connect.
+    umask = os.umask(0o177)
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(umask)
+    listener.listen()
+    # Accepting with a timeout wakes an idle server to reap, so finished children don't linger as zombies.
+    listener.settimeout(REAP_INTERVAL)
+    print(f"Preloaded {', '.join(COMMANDS)}; listening on {path}", flush=True)
+    children = set()
+    try:
+        while True:
+            _reap(children)
+            try:
+                conn, _ = listener.accept()
+            except TimeoutError:
+                continue
+            try:
+                message, fds, _, _ = socket.recv_fds(conn, 4096, 3)
+                request = json.loads(message or b"{}")
+            except (OSError, ValueError):
+                conn.close()
+                continue
+            if request.get("command") not in COMMANDS or len(fds) != 3:
+                for fd in fds:
+                    os.close(fd)
+                _send(conn, {"error": f"Expected one of {', '.join(COMMANDS)} and three descriptors."})
+                conn.close()
+                continue
+            sys.stdout.flush()
+            pid = os.fork()
+            if pid == 0:
+                # The child must never return into this loop (or its finally, which removes the socket).
+                status = 1
+                try:
+                    listener.close()
+                    status = _run_child(conn, request, fds, state)
+                finally:
+                    os._exit(status)
+            children.add(pid)
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+    finally:
+        listener.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def run_client(command, path=DEFAULT_SOCKET):
+    """Runs command in the preload server; returns its exit status, or None if no server is listening."""
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        conn.close()
+        return None
+    with conn:
+        socket.send_fds(conn, [json.dumps({"command": command, "cwd": os.getcwd()}).encode()], [0, 1, 2])
+        replies = conn.makefile("rb")
+        reply = json.loads(replies.readline() or b"{}")
+        if "pid" not in reply:
+            print(reply.get("error", "The preload server closed the connection."), file=sys.stderr)
+            return 1
+        # Ctrl-C reaches this process, not the forked child running the tool: pass it on.
+        signal.signal(signal.SIGINT, lambda signum, frame: os.kill(reply["pid"], signal.SIGINT))
+        line = replies.readline()
+        return json.loads(line)["status"] if line else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the travel tools from a preloaded fork server.")
+    parser.add_argument("command", choices=("serve",) + COMMANDS)
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    args = parser.parse_args()
+    if args.command == "serve":
+        try:
+            serve(args.socket)
+        except KeyboardInterrupt:
+            pass
+        return 0
+    status = run_client(args.command, args.socket)
+    if status is None:
+        run_tool(args.command)
+        status = 0
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
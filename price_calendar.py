@@ -0,0 +1,167 @@
+"""
+Price calendar: the cheapest round trip for every departure date and trip length.
+
+Fares are first reduced to a (destination x day) matrix of daily minimum prices, outbound and
+return separately. A round trip of length L departing on day d to destination X then costs
+outbound[X, d] + inbound[X, d + L], so the whole calendar is a few shifted array additions and
+a min over destinations, independent of how many fares there are. A range of trip lengths
+("3-5 days") is a sliding-window minimum over the return days.
+
+Results carry where their return legs came from (return_legs): real return fares, or one-way fares
+to the destination reused as the way back when no return fares were available, which only
+estimates a round trip.
+"""
+import datetime
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from lazy_imports import lazy_module
+
+pd = lazy_module("pandas")
+
+# Values of return_legs.
+RETURN_FARES = "return_fares"
+ONE_WAY_REUSED = "one_way_reused"
+
+
+def _city_names(fares):
+    city = fares["destination_city"]
+    if isinstance(city.dtype, pd.CategoricalDtype):
+        # Only the categories actually used, without casting every row to str.
+        return set(city.cat.categories[np.unique(city.cat.codes.to_numpy())].astype(str))
+    return set(city.astype(str).unique())
+
+
+def _city_codes(fares, cities):
+    """Position of each fare's destination_city in cities, or -1."""
+    city = fares["destination_city"]
+    if isinstance(city.dtype, pd.CategoricalDtype):
+        lookup = np.append(pd.Index(cities).get_indexer(city.cat.categories.astype(str)), -1)
+        return lookup[city.cat.codes.to_numpy()]
+    return pd.Index(cities).get_indexer(city.astype(str))
+
+
+def _common_cities(outbound, inbound):
+    return sorted(_city_names(outbound) & _city_names(inbound)) if not (outbound.empty or inbound.empty) else []
+
+
+def daily_minimum(fares, first_day, num_days, cities):
+    """(len(cities) x num_days) matrix of the cheapest fare per destination and departure day; inf where none."""
+    prices = np.full((len(cities), num_days), np.inf)
+    if fares.empty:
+        return prices
+    days = ((fares["departure_date"].to_numpy().astype("datetime64[D]") - np.datetime64(first_day, "D"))
+            .astype(np.int64))
+    city_codes = _city_codes(fares, cities)
+    inside = (days >= 0) & (days < num_days) & (city_codes >= 0)
+    np.minimum.at(prices, (city_codes[inside], days[inside]), fares["price"].to_numpy(dtype=float)[inside])
+    return prices
+
+
+def window_minimum(values, window):
+    """Minimum over each run of `window` consecutive columns: result[..., i] = min(values[..., i:i + window])."""
+    if window <= 1:
+        return values
+    return sliding_window_view(values, window, axis=-1).min(axis=-1)
+
+
+@dataclass(slots=True)
+class PriceCalendar:
+    """
+    prices[i, j] is the cheapest round trip departing departure_dates[i] for trip_lengths[j] days
+    (NaN where no trip exists); destinations[i, j] is where it goes. return_legs is RETURN_FARES,
+    or ONE_WAY_REUSED when one-way fares were priced as the return legs too.
+    """
+
+    departure_dates: list
+    trip_lengths: list
+    prices: np.ndarray
+    destinations: np.ndarray
+    cities: list
+    prices_by_destination: np.ndarray  # (city x departure date x trip length)
+    return_legs: str = RETURN_FARES
+
+    def to_frame(self):
+        """prices as a DataFrame: one row per departure date, one column per trip length."""
+        return pd.DataFrame(self.prices, index=pd.Index(self.departure_dates, name="departure_date"),
+                            columns=pd.Index(self.trip_lengths, name="trip_length"))
+
+    def for_destination(self, city):
+        """The calendar for one destination city, as a DataFrame like to_frame."""
+        prices = self.prices_by_destination[self.cities.index(city)]
+        return pd.DataFrame(np.where(np.isinf(prices), np.nan, prices), index=pd.Index(self.departure_dates, name="departure_date"),
+                            columns=pd.Index(self.trip_lengths, name="trip_length"))
+
+    def cheapest(self, min_length=None, max_length=None):
+        """(departure_date, trip_length, price, destination) of the cheapest trip in the length range, or None."""
+        lengths = np.asarray(self.trip_lengths)
+        min_length = lengths.min() if min_length is None else min_length
+        max_length = lengths.max() if max_length is None else max_length
+        columns = np.flatnonzero((lengths >= min_length) & (lengths <= max_length))
+        prices = self.prices[:, columns]
+        if not columns.size or np.isnan(prices).all():
+            return None
+        row, column = np.unravel_index(np.nanargmin(prices), prices.shape)
+        return self.departure_dates[row], int(lengths[columns[column]]), float(prices[row, column]), self.destinations[row, columns[column]]
+
+    def to_dict(self):
+        """JSON-friendly form for a calendar UI."""
+        return {"departure_dates": [day.isoformat() for day in self.departure_dates], "trip_lengths": list(self.trip_lengths),
+                "prices": [[None if np.isnan(price) else round(price, 2) for price in row] for row in self.prices.tolist()],
+                "destinations": self.destinations.tolist(), "return_legs": self.return_legs}
+
+
+def build_price_calendar(outbound, inbound, start_date, end_date, min_length=1, max_length=14, return_legs=RETURN_FARES):
+    """
+    Price calendar for departures from start_date to end_date and trip lengths min_length..max_length.
+    outbound and inbound are fare frames; inbound fares' destination_city is the city flown back from.
+    return_legs says what inbound is (RETURN_FARES or ONE_WAY_REUSED) and is recorded on the calendar.
+    """
+    num_departures = (end_date - start_date).days + 1
+    lengths = np.arange(min_length, max_length + 1)
+    num_days = num_departures + max_length
+    cities = _common_cities(outbound, inbound)
+    out = daily_minimum(outbound, start_date, num_departures, cities)
+    back = daily_minimum(inbound, start_date, num_days, cities)
+
+    # by_destination[x, d, j] = out[x, d] + back[x, d + lengths[j]]
+    by_destination = out[:, :, None] + back[:, (np.arange(num_departures)[:, None] + lengths[None, :])]
+    if cities:
+        best = by_destination.argmin(axis=0)
+        prices = np.take_along_axis(by_destination, best[None], axis=0)[0]
+        destinations = np.asarray(cities, dtype=object)[best]
+    else:
+        prices = np.full((num_departures, len(lengths)), np.inf)
+        destinations = np.full(prices.shape, None, dtype=object)
+    missing = np.isinf(prices)
+    destinations[missing] = None
+    return PriceCalendar(departure_dates=[start_date + datetime.timedelta(days=offset) for offset in range(num_departures)],
+                         trip_lengths=lengths.tolist(), prices=np.where(missing, np.nan, prices), destinations=destinations,
+                         cities=cities, prices_by_destination=by_destination, return_legs=return_legs)
+
+
+def cheapest_by_departure(outbound, inbound, start_date, end_date, min_length=1, max_length=14, return_legs=RETURN_FARES):
+    """
+    Cheapest round trip of any length in min_length..max_length per departure date, as a frame
+    with price and destination_city (and return_legs in its attrs, as for build_price_calendar).
+    Unlike build_price_calendar this never materializes the trip-length axis: the cheapest return
+    in each window comes from a sliding-window minimum.
+    """
+    num_departures = (end_date - start_date).days + 1
+    cities = _common_cities(outbound, inbound)
+    out = daily_minimum(outbound, start_date, num_departures, cities)
+    back = daily_minimum(inbound, start_date, num_departures + max_length, cities)
+    totals = out + window_minimum(back[:, min_length:], max_length - min_length + 1)[:, :num_departures]
+    index = pd.Index([start_date + datetime.timedelta(days=offset) for offset in range(num_departures)], name="departure_date")
+    if not cities:
+        trips = pd.DataFrame({"price": np.nan, "destination_city": None}, index=index)
+    else:
+        best = totals.argmin(axis=0)
+        prices = totals[best, np.arange(num_departures)]
+        missing = np.isinf(prices)
+        trips = pd.DataFrame({"price": np.where(missing, np.nan, prices),
+                              "destination_city": np.where(missing, None, np.asarray(cities, dtype=object)[best])}, index=index)
+    trips.attrs["return_legs"] = return_legs
+    return trips
@@ -1,49 +1,348 @@
-import random
-from datetime import datetime, timedelta
-import pytz
+import datetime
+import heapq
+import itertools
+import os
+import numpy as np
+from booking_inventory import BookingInventory
+from catalog_store import LazyCatalog
+from instrumentation import count, instrumented
+from itinerary_store import ItineraryStore
+
+# (category, cost field, share of the daily budget) used to decide what is affordable each day.
+BUDGET_SHARES = (("activities", "cost", 3), ("accommodations", "price_per_night", 2), ("food", "avg_cost", 4))
+# Units per night for bookable items whose catalog entry has no "rooms"/"capacity" of its own.
+DEFAULT_CAPACITY = {"accommodation": 20, "activity": 30}
+# How many booking options run() shows when there are several itineraries.
+TOP_BOOKING_OPTIONS = 30
+
+
+def _option_price(option):
+    price = option.get("price_per_night", option.get("cost", 0))
+    return price if isinstance(price, (int, float)) else 0
+
+
+def _option_rating(option):
+    rating = option.get("rating", 0)
+    return rating if isinstance(rating, (int, float)) else 0
+
+
+# Higher is better for every score.
+OPTION_SCORES = {
+    "rating": _option_rating,
+    "price": lambda option: -_option_price(option),
+    "value": lambda option: _option_rating(option) / max(_option_price(option), 1),
+}
+
+
+def _trip_start(start_date):
+    """A trip's first night as a date: a date, an ISO string, or None for today."""
+    if start_date is None:
+        return datetime.date.today()
+    return start_date if isinstance(start_date, datetime.date) else datetime.date.fromisoformat(start_date)
+
+
+@instrumented("planner.rank_booking_options")
+def rank_booking_options(options, k=None, by="rating", dedupe=True, available_only=False):
+    """
+    The k best options (all of them if k is None), best first, from any iterable of options.
+    With dedupe, the same item on the same night from several itineraries is kept once and
+    lists every itinerary in "itinerary_ids". Options are consumed in one pass and at most k are
+    kept in a heap, so a generator over thousands of itineraries never needs to be materialized.
+    Ties keep the order options arrived in.
+    """
+    score = OPTION_SCORES[by]
+    seen = {}
+    heap = []
+    for sequence, option in enumerate(options):
+        if available_only and not option.get("availability"):
+            continue
+        if dedupe:
+            key = (option.get("item") or (option["type"], option["name"]), option.get("night"))
+            first = seen.get(key)
+            if first is not None:
+                first["itinerary_ids"].append(option.get("itinerary_id"))
+                continue
+            option = seen[key] = dict(option, itinerary_ids=[option.get("itinerary_id")])
+        entry = (score(option), -sequence, option)
+        if k is None or len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    return [option for _, _, option in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+
+
+class ItineraryEngine:
+    """
+    Vectorized "Surprise Me" itinerary generation.
+    Affordable sets are computed once per (destination, daily_budget) from sorted cost arrays,
+    and every day of every requested itinerary is drawn in one sampling pass.
+    """
+
+    def __init__(self, planner, rng=None):
+        self.planner = planner
+        self._rng = rng
+        self._pools = {}
+
+    @property
+    def rng(self):
+        # The planner's current rng unless one was given, so reseeding the planner (per pooled job, or
+        # after a fork in preload) reseeds this too.
+        return self._rng if self._rng is not None else self.planner.rng
+
+    def _pool(self, details, category, cost_field, share, daily_budget):
+        items = details.get(category, [])
+        costs = np.array([item.get(cost_field, 0) for item in items], dtype=float)
+        order = np.argsort(costs, kind="stable")
+        if daily_budget:
+            num_affordable = int(np.searchsorted(costs[order], daily_budget / share, side="right"))
+        else:
+            num_affordable = len(items)
+        # Same fallback as generate_single_itinerary: nothing affordable means pick from everything.
+        choices = order[:num_affordable] if num_affordable else order
+        return items, choices
+
+    def pools(self, destination, daily_budget):
+        details = self.planner.get_destination_details(destination)
+        key = (destination.lower(), daily_budget)
+        cached = self._pools.get(key)
+        # Cached with the catalog entry they came from, so replacing or removing the entry rebuilds them.
+        if cached is None or cached[0] is not details:
+            pools = {category: self._pool(details, category, cost_field, share, daily_budget)
+                     for category, cost_field, share in BUDGET_SHARES} if details else None
+            cached = self._pools[key] = (details, pools)
+        return cached[1]
+
+    def invalidate(self, destination=None):
+        """Drops the cached affordable sets of destination (of every destination if None)."""
+        if destination is None:
+            self._pools.clear()
+        else:
+            for key in [key for key in self._pools if key[0] == destination.lower()]:
+                del self._pools[key]
+
+    def generate(self, destination, num_itineraries=3, budget=None, num_days=3):
+        """Same output as TravelPlanner.generate_multiple_itineraries."""
+        ids = [f"itinerary_{i+1}" for i in range(num_itineraries)]
+        details = self.planner.get_destination_details(destination)
+        if not details:
+            return dict.fromkeys(ids, "Destination not found.")
+        if not all(details.get(category) for category, _, _ in BUDGET_SHARES):
+            return dict.fromkeys(ids, "Insufficient data for a surprise itinerary for this destination.")
+
+        pools = self.pools(destination, budget / num_days if budget else None)
+        shape = (num_itineraries, num_days)
+        activities, activity_choices = pools["activities"]
+        accommodations, accommodation_choices = pools["accommodations"]
+        food, food_choices = pools["food"]
+        # .tolist() up front: indexing Python lists with NumPy scalars is slow in the assembly loop.
+        activity_picks = activity_choices[self.rng.integers(len(activity_choices), size=shape)].tolist()
+        accommodation_picks = accommodation_choices[self.rng.integers(len(accommodation_choices), size=shape)].tolist()
+        food_picks = food_choices[self.rng.integers(len(food_choices), size=shape)].tolist()
+        extra_food_picks = self.rng.integers(len(food), size=shape).tolist()
+        has_extra_food = (self.rng.random(shape) < 0.7).tolist()
+
+        itineraries = {}
+        for row, itinerary_id in enumerate(ids):
+            days = []
+            for day in range(num_days):
+                meals = [food[food_picks[row][day]]]
+                if has_extra_food[row][day]:
+                    meals.append(food[extra_food_picks[row][day]])
+                days.append({"day": day + 1, "activities": [activities[activity_picks[row][day]]],
+                             "accommodation": accommodations[accommodation_picks[row][day]], "food": meals})
+            itineraries[itinerary_id] = {"id": itinerary_id, "destination": destination, "days": days}
+        return itineraries
+
+
+class ItineraryOptimizer:
+    """
+    Budget-constrained itinerary planning: maximizes the trip's total accommodation + activity rating
+    under the trip budget with a knapsack DP over integer cost units.
+
+    - activities are distinct across days when the destination has enough of them
+    - one accommodation is chosen per night (dominated options are pruned first)
+    - one meal per day is reserved at the cheapest price; leftover budget may upgrade meals
+
+    diversity > 0 adds random noise to the ratings the DP sees, so repeated calls give
+    different near-optimal trips instead of the same one.
+    """
+
+    def __init__(self, planner, rng=None, max_units=2000):
+        self.planner = planner
+        self._rng = rng
+        self.max_units = max_units
+
+    @property
+    def rng(self):
+        # The planner's current rng unless one was given, so reseeding the planner (per pooled job, or
+        # after a fork in preload) reseeds this too.
+        return self._rng if self._rng is not None else self.planner.rng
+
+    def _noisy(self, ratings, diversity):
+        if not diversity:
+            return ratings
+        return ratings + self.rng.uniform(0, diversity, size=ratings.shape)
+
+    def _pick_activities(self, costs, ratings, count, num_units):
+        """Cardinality-constrained 0/1 knapsack. Returns (best rating by exact cost, backtrack function)."""
+        best = np.full((count + 1, num_units + 1), -np.inf)
+        best[0, 0] = 0.0
+        taken = np.zeros((len(costs), count + 1, num_units + 1), dtype=bool)
+        for i, (cost, rating) in enumerate(zip(costs, ratings)):
+            if cost > num_units:
+                continue
+            for j in range(count, 0, -1):
+                candidate = best[j - 1, :num_units + 1 - cost] + rating
+                improved = candidate > best[j, cost:]
+                taken[i, j, cost:] = improved
+                best[j, cost:] = np.where(improved, candidate, best[j, cost:])
+
+        def backtrack(units):
+            chosen, j = [], count
+            for i in range(len(costs) - 1, -1, -1):
+                if j and taken[i, j, units]:
+                    chosen.append(i)
+                    units -= costs[i]
+                    j -= 1
+            return chosen
+
+        return best[count], backtrack
+
+    @staticmethod
+    def _pareto(costs, ratings):
+        """Indices of options not beaten by a cheaper-or-equal, better-rated one."""
+        frontier, top = [], -np.inf
+        for i in np.lexsort((-ratings, costs)):
+            if ratings[i] > top:
+                frontier.append(i)
+                top = ratings[i]
+        return np.array(frontier, dtype=int)
+
+    def optimize(self, destination, budget=None, num_days=3, itinerary_id=None, diversity=0.0):
+        details = self.planner.get_destination_details(destination)
+        if not details:
+            return "Destination not found."
+        activities = details.get("activities", [])
+        accommodations = details.get("accommodations", [])
+        food = details.get("food", [])
+        if not activities or not accommodations or not food:
+            return "Insufficient data for a surprise itinerary for this destination."
+
+        act_costs = np.array([act.get("cost", 0) for act in activities], dtype=float)
+        act_ratings = np.array([act.get("rating", 0) for act in activities], dtype=float)
+        acc_costs = np.array([acc.get("price_per_night", 0) for acc in accommodations], dtype=float)
+        acc_ratings = np.array([acc.get("rating", 0) for acc in accommodations], dtype=float)
+        food_costs = np.array([item.get("avg_cost", 0) for item in food], dtype=float)
+        if not budget:
+            budget = num_days * (act_costs.max() + acc_costs.max() + food_costs.max())
+
+        resolution = max(1.0, budget / self.max_units)
+        num_units = int(budget // resolution)
+        def to_units(costs):
+            return np.ceil(costs / resolution - 1e-9).astype(int)
+        act_units, acc_units = to_units(act_costs), to_units(acc_costs)
+        cheapest_meal = int(np.argmin(food_costs))
+        meal_units = num_days * int(to_units(food_costs[cheapest_meal:cheapest_meal + 1])[0])
+        if meal_units > num_units:
+            return "Budget too low for this destination."
+
+        if len(activities) >= num_days:
+            best, backtrack_activities = self._pick_activities(act_units, self._noisy(act_ratings, diversity), num_days, num_units)
+        else:
+            # Too few activities to keep them distinct: treat each day as its own group like the nights below.
+            best, backtrack_activities = np.full(num_units + 1, -np.inf), None
+            best[0] = 0.0
+        act_groups = [] if backtrack_activities else [None] * num_days
+
+        # Multiple-choice knapsack: one pick per group (activity days first if needed, then nights).
+        group_choices = []
+        for group in act_groups + ["night"] * num_days:
+            costs, ratings = (acc_units, acc_ratings) if group == "night" else (act_units, act_ratings)
+            noisy = self._noisy(ratings, diversity)
+            options = self._pareto(costs, noisy)
+            candidates = np.full((len(options), num_units + 1), -np.inf)
+            for row, option in enumerate(options):
+                if costs[option] <= num_units:
+                    candidates[row, costs[option]:] = best[:num_units + 1 - costs[option]] + noisy[option]
+            picks = candidates.argmax(axis=0)
+            best = candidates[picks, np.arange(num_units + 1)]
+            group_choices.append((group, options[picks], costs))
+
+        affordable = best[:num_units - meal_units + 1]
+        if not np.isfinite(affordable).any():
+            if backtrack_activities and num_days * (act_units.min() + acc_units.min()) + meal_units <= num_units:
+                # The trip would fit with an activity repeated; it's distinct ones the budget can't cover.
+                return f"Not enough affordable activities for {num_days} different days at this destination."
+            return "Budget too low for this destination."
+        units = int(affordable.argmax())
+        spent_units = units + meal_units
+
+        nights, day_activities = [], []
+        for group, picks, costs in reversed(group_choices):
+            option = int(picks[units])
+            units -= costs[option]
+            (nights if group == "night" else day_activities).append(option)
+        if backtrack_activities:
+            day_activities = backtrack_activities(units)
+        self.rng.shuffle(day_activities)
+
+        itinerary = {"id": itinerary_id if itinerary_id is not None else f"itinerary_{self.rng.integers(100, 1000)}",
+                     "destination": destination, "days": []}
+        slack = (num_units - spent_units) * resolution
+        for day in range(num_days):
+            meal = cheapest_meal
+            if diversity:
+                upgrades = np.flatnonzero(food_costs - food_costs[cheapest_meal] <= slack)
+                meal = int(self.rng.choice(upgrades))
+                slack -= food_costs[meal] - food_costs[cheapest_meal]
+            itinerary["days"].append({"day": day + 1, "activities": [activities[day_activities[day]]],
+                                      "accommodation": accommodations[nights[num_days - 1 - day]], "food": [food[meal]]})
+        return itinerary
+
+
+def _generate_itinerary_chunk(catalog, destination, budget, num_days, strategy, diversity, jobs):
+    """
+    Process-pool worker: one planner for the whole chunk (so the catalog entry is decoded once),
+    reseeded from each itinerary's own stream before generating it.
+    """
+    planner = TravelPlanner(catalog)
+    itineraries = {}
+    for itinerary_id, stream in jobs:
+        planner.rng = np.random.default_rng(stream)
+        if strategy == "optimized":
+            itineraries[itinerary_id] = planner.generate_optimized_itinerary(destination, budget, num_days, itinerary_id, diversity)
+        else:
+            itineraries[itinerary_id] = planner.generate_single_itinerary(destination, budget, num_days, itinerary_id)
+    return itineraries
+
 
 class TravelPlanner:
-    def __init__(self):
-        self.destinations_data = {
-            "bahrain": {
-                "activities": [
-                    {"name": "Explore Manama Souq spice stalls", "rating": 4.2, "cost": 0},
-                    {"name": "Browse Manama Souq handicrafts", "rating": 4.0, "cost": 0},
-                    {"name": "Try Machboos at a local restaurant", "rating": 4.5, "cost": 10},
-                    {"name": "Visit Bahrain National Museum", "rating": 4.4, "cost": 2},
-                    {"name": "Tour Al-Fateh Grand Mosque", "rating": 4.6, "cost": 0},
-                    {"name": "Wander Block 338 art galleries", "rating": 4.1, "cost": 0},
-                    {"name": "Relax at [Beach Name]", "rating": 4.3, "cost": 0},
-                    {"name": "Spa at [Resort Name]", "rating": 4.7, "cost": 50},
-                    {"name": "Hawar Islands day trip", "rating": 4.0, "cost": 30},
-                    {"name": "Lost Paradise of Dilmun Water Park", "rating": 4.4, "cost": 40},
-                    {"name": "Sunset viewing", "rating": 4.5, "cost": 0}
-                ],
-                "accommodations": [
-                    {"name": "Budget Inn Manama", "rating": 3.5, "price_per_night": 45},
-                    {"name": "Mid-Range Hotel Bahrain City", "rating": 4.1, "price_per_night": 80},
-                    {"name": "Luxury Resort [Resort Name]", "rating": 4.8, "price_per_night": 150}
-                ],
-                "food": [
-                    {"name": "Machboos", "avg_cost": 10},
-                    {"name": "Balaleet", "avg_cost": 8},
-                    {"name": "Shawarma", "avg_cost": 5},
-                    {"name": "Luqaimat", "avg_cost": 3}
-                ]
-            }
-        }
-        self.user_itineraries = {}
+    def __init__(self, catalog=None, rng=None, inventory=None, itinerary_path=None):
+        # Any mapping of destination name -> details works; the default reads data/destinations.json lazily.
+        self.destinations_data = catalog if catalog is not None else LazyCatalog("destinations")
+        # rng may be a seed, a SeedSequence or a numpy Generator; all randomness goes through it.
+        self.rng = np.random.default_rng(rng)
+        # Pass one shared BookingInventory to planners serving the same users.
+        self.inventory = inventory if inventory is not None else BookingInventory()
+        self._engine = None
+        self._optimizer = None
+        # Saved itineraries by ID, user and destination; itinerary_path makes them persistent.
+        self.user_itineraries = ItineraryStore(self, itinerary_path)
+
+    def _choice(self, options):
+        return options[self.rng.integers(len(options))]
 
     def get_destination_details(self, destination):
         return self.destinations_data.get(destination.lower())
 
+    @instrumented("planner.generate_single_itinerary")
     def generate_single_itinerary(self, destination, budget=None, num_days=3, itinerary_id=None):
         """Generates a single random, budget-friendly itinerary with an ID."""
         details = self.get_destination_details(destination)
         if not details:
             return "Destination not found."
 
-        itinerary = {"id": itinerary_id if itinerary_id is not None else f"itinerary_{random.randint(100, 999)}",
+        itinerary = {"id": itinerary_id if itinerary_id is not None else f"itinerary_{self.rng.integers(100, 1000)}",
                      "destination": destination, "days": []}
         possible_activities = details.get("activities", [])
         possible_accommodations = details.get("accommodations", [])
@@ -58,28 +357,84 @@ class TravelPlanner:
             daily_plan = {"day": day + 1, "activities": [], "accommodation": None, "food": []}
 
             affordable_activities = [act for act in possible_activities if not daily_budget or act.get("cost", 0) <= daily_budget / 3]
-            daily_plan["activities"].append(random.choice(affordable_activities) if affordable_activities else random.choice(possible_activities))
+            daily_plan["activities"].append(self._choice(affordable_activities) if affordable_activities else self._choice(possible_activities))
 
             affordable_accommodations = [acc for acc in possible_accommodations if not daily_budget or acc.get("price_per_night", 0) <= daily_budget / 2]
-            daily_plan["accommodation"] = random.choice(affordable_accommodations) if affordable_accommodations else random.choice(possible_accommodations)
+            daily_plan["accommodation"] = self._choice(affordable_accommodations) if affordable_accommodations else self._choice(possible_accommodations)
 
             affordable_food = [food for food in possible_food if not daily_budget or food.get("avg_cost", 0) <= daily_budget / 4]
-            daily_plan["food"].append(random.choice(affordable_food) if affordable_food else random.choice(possible_food))
-            if random.random() < 0.7:
-                daily_plan["food"].append(random.choice(possible_food))
+            daily_plan["food"].append(self._choice(affordable_food) if affordable_food else self._choice(possible_food))
+            if self.rng.random() < 0.7:
+                daily_plan["food"].append(self._choice(possible_food))
 
             itinerary["days"].append(daily_plan)
 
         return itinerary
 
-    def generate_multiple_itineraries(self, destination, num_itineraries=3, budget=None, num_days=3):
-        """Generates a dictionary of multiple random itineraries."""
+    @instrumented("planner.generate_optimized_itinerary")
+    def generate_optimized_itinerary(self, destination, budget=None, num_days=3, itinerary_id=None, diversity=0.0):
+        """Generates the highest-rated itinerary that fits the budget (see ItineraryOptimizer)."""
+        if self._optimizer is None:
+            self._optimizer = ItineraryOptimizer(self)
+        return self._optimizer.optimize(destination, budget, num_days, itinerary_id, diversity)
+
+    @instrumented("planner.generate_multiple_itineraries")
+    def generate_multiple_itineraries(self, destination, num_itineraries=3, budget=None, num_days=3, strategy="random", diversity=0.5):
+        """Generates a dictionary of multiple itineraries ("random" or budget-"optimized")."""
+        count("planner.itineraries", num_itineraries)
         itineraries = {}
         for i in range(num_itineraries):
             itinerary_id = f"itinerary_{i+1}"
-            itineraries[itinerary_id] = self.generate_single_itinerary(destination, budget, num_days, itinerary_id)
+            if strategy == "optimized":
+                itineraries[itinerary_id] = self.generate_optimized_itinerary(destination, budget, num_days, itinerary_id, diversity)
+            else:
+                itineraries[itinerary_id] = self.generate_single_itinerary(destination, budget, num_days, itinerary_id)
         return itineraries
 
+    def generate_multiple_itineraries_parallel(self, destination, num_itineraries=3, budget=None, num_days=3,
+                                               strategy="random", diversity=0.5, seed=None, max_workers=None):
+        """
+        Process-pool version of generate_multiple_itineraries.
+        Each itinerary gets its own stream spawned from seed, so the result for a given seed
+        is the same whatever max_workers is.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        streams = np.random.SeedSequence(seed).spawn(num_itineraries)
+        jobs = [(f"itinerary_{i+1}", stream) for i, stream in enumerate(streams)]
+        max_workers = max_workers or os.cpu_count() or 1
+        chunk_size = -(-num_itineraries // max_workers) if num_itineraries else 1
+        chunks = [jobs[i:i + chunk_size] for i in range(0, num_itineraries, chunk_size)]
+        itineraries = {}
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_generate_itinerary_chunk, self.destinations_data, destination, budget, num_days, strategy, diversity, chunk)
+                       for chunk in chunks]
+            for future in futures:
+                itineraries.update(future.result())
+        return itineraries
+
+    @property
+    def engine(self):
+        """ItineraryEngine sharing this planner's rng; its affordable sets are cached per (destination, daily budget)."""
+        if self._engine is None:
+            self._engine = ItineraryEngine(self)
+        return self._engine
+
+    def invalidate_destination(self, destination=None):
+        """
+        Forgets what was cached from destination's catalog entry (every destination's if None). Needed
+        only after editing an entry in place; replacing or removing an entry is picked up on its own.
+        """
+        if self._engine is not None:
+            self._engine.invalidate(destination)
+        self.user_itineraries.invalidate(destination)
+
+    @instrumented("planner.generate_itineraries_bulk")
+    def generate_itineraries_bulk(self, destination, num_itineraries=3, budget=None, num_days=3):
+        """Vectorized equivalent of generate_multiple_itineraries for large batches."""
+        count("planner.itineraries", num_itineraries)
+        return self.engine.generate(destination, num_itineraries, budget, num_days)
+
     def display_itinerary(self, itinerary):
         if isinstance(itinerary, str):
             print(itinerary)
@@ -104,32 +459,87 @@ class TravelPlanner:
             self.display_itinerary(itinerary_data)
         print("-------------------------------------\n")
 
-    def get_booking_options(self, itinerary):
-        booking_options = []
+    def resolve_itinerary(self, itinerary):
+        """
+        A copy of a client-supplied itinerary whose accommodations and activities are the catalog's own
+        entries, or an error string if its destination or any of those items isn't in the catalog.
+        """
+        details = self.get_destination_details(str(itinerary.get("destination", "")))
+        if not details:
+            return "Destination not found."
+        catalog = {category: {entry["name"]: entry for entry in details.get(category, [])} for category in ("accommodations", "activities")}
+        days = []
+        for day_plan in itinerary.get("days", []):
+            try:
+                accommodation = catalog["accommodations"].get(day_plan["accommodation"]["name"])
+                activities = [catalog["activities"].get(activity["name"]) for activity in day_plan["activities"]]
+                day = int(day_plan["day"])
+            except (KeyError, TypeError, ValueError):
+                return "Each day needs a day number, an accommodation and a list of activities."
+            if accommodation is None or None in activities:
+                return f"Unknown accommodation or activity for {itinerary['destination']}."
+            days.append(dict(day_plan, day=day, accommodation=accommodation, activities=activities))
+        return dict(itinerary, days=days)
+
+    def _inventory_item(self, itinerary, option_type, entry):
+        item = f"{itinerary['destination'].lower()}/{option_type}/{entry['name']}"
+        self.inventory.ensure_item(item, entry.get("rooms" if option_type == "accommodation" else "capacity", DEFAULT_CAPACITY[option_type]))
+        return item
+
+    @instrumented("planner.get_booking_options")
+    def get_booking_options(self, itinerary, start_date=None):
+        """
+        One option per bookable item per day. Day 1 is the night of start_date (default: the
+        itinerary's "start_date", else today), and availability is the booking inventory's for that date.
+        """
+        options = list(self.iter_booking_options(itinerary, start_date))
+        count("planner.booking_options", len(options))
+        return options
+
+    def iter_all_booking_options(self, itineraries, start_date=None):
+        """Booking options of every itinerary in a dict of itineraries, as one stream (error strings are skipped)."""
+        return itertools.chain.from_iterable(self.iter_booking_options(itinerary, start_date) for itinerary in itineraries.values()
+                                             if not isinstance(itinerary, str))
+
+    def iter_booking_options(self, itinerary, start_date=None):
+        first_night = _trip_start(start_date if start_date is not None else itinerary.get("start_date"))
         for day_plan in itinerary["days"]:
+            night = first_night + datetime.timedelta(days=day_plan["day"] - 1)
             accommodation = day_plan["accommodation"]
-            booking_options.append({
+            item = self._inventory_item(itinerary, "accommodation", accommodation)
+            yield {
                 "type": "accommodation",
                 "name": accommodation["name"],
                 "rating": accommodation["rating"],
                 "price_per_night": accommodation["price_per_night"],
-                "availability": random.randint(5, 20) > 0,
-                "itinerary_id": itinerary.get("id")
-            })
+                "availability": self.inventory.available(item, night) > 0,
+                "itinerary_id": itinerary.get("id"),
+                "item": item,
+                "night": night
+            }
             for activity in day_plan["activities"]:
-                booking_options.append({
+                item = self._inventory_item(itinerary, "activity", activity)
+                yield {
                     "type": "activity",
                     "name": activity["name"],
                     "rating": activity.get("rating", "N/A"),
                     "cost": activity.get("cost", 0),
-                    "availability": random.randint(10, 30) > 0,
-                    "itinerary_id": itinerary.get("id")
-                })
-        return booking_options
+                    "availability": self.inventory.available(item, night) > 0,
+                    "itinerary_id": itinerary.get("id"),
+                    "item": item,
+                    "night": night
+                }
 
-    def display_booking_options(self, options):
+    @instrumented("planner.hold_booking_options")
+    def hold_booking_options(self, options, ttl=None):
+        """Holds one unit of every option at once (all or nothing); returns the hold ID or None if something sold out."""
+        return self.inventory.hold([(option["item"], option["night"], 1) for option in options], ttl)
+
+    @instrumented("planner.display_booking_options")
+    def display_booking_options(self, options, k=None, by="rating", dedupe=False):
+        """Prints the top k options (all by default) ranked by rating, price or value, and returns them in that order."""
         print("\n--- Booking Options ---")
-        rated_options = sorted(options, key=lambda x: x.get('rating', 0) if isinstance(x.get('rating'), (int, float)) else 0, reverse=True)
+        rated_options = rank_booking_options(options, k, by, dedupe)
         for i, option in enumerate(rated_options):
             availability_status = "Available" if option["availability"] else "Not Available"
             price = option.get('price_per_night', option.get('cost', 'N/A'))
@@ -137,6 +547,15 @@ class TravelPlanner:
         print("-----------------------\n")
         return rated_options
 
+    @staticmethod
+    def ask_start_date():
+        answer = input("When does the trip start? (YYYY-MM-DD, blank for today): ").strip()
+        try:
+            return _trip_start(answer or None)
+        except ValueError:
+            print("Invalid date; using today.")
+            return datetime.date.today()
+
     def get_user_confirmation(self, options):
         while True:
             choices = input("Enter the numbers of the items you want to book (comma-separated), or 'done': ").lower()
@@ -146,6 +565,12 @@ class TravelPlanner:
                 selected_indices = [int(x.strip()) - 1 for x in choices.split(',')]
                 confirmed_bookings = [options[i] for i in selected_indices if 0 <= i < len(options) and options[i]['availability']]
                 if confirmed_bookings:
+                    hold_id = self.hold_booking_options(confirmed_bookings)
+                    if hold_id is None or not self.inventory.confirm(hold_id):
+                        print("Some of those items have just sold out. Please choose again.")
+                        continue
+                    for booking in confirmed_bookings:
+                        booking["booking_id"] = hold_id
                     print("\nConfirmed Bookings:")
                     for booking in confirmed_bookings:
                         print(f"- Itinerary ID: {booking.get('itinerary_id', 'N/A')}, {booking['type'].capitalize()}: {booking['name']}")
@@ -172,13 +597,10 @@ class TravelPlanner:
             self.display_multiple_itineraries(multiple_itineraries)
 
             if input("Would you like to see booking options for these itineraries? (yes/no): ").lower() == 'yes':
-                all_booking_options = []
-                for itinerary_id, itinerary_data in multiple_itineraries.items():
-                    booking_options = self.get_booking_options(itinerary_data)
-                    all_booking_options.extend(booking_options)
-
-                if all_booking_options:
-                    rated_options = self.display_booking_options(all_booking_options)
+                start_date = self.ask_start_date()
+                rated_options = rank_booking_options(self.iter_all_booking_options(multiple_itineraries, start_date), TOP_BOOKING_OPTIONS)
+                if rated_options:
+                    self.display_booking_options(rated_options)
                     self.get_user_confirmation(rated_options)
                 else:
                     print("No booking options available for these itineraries.")
@@ -191,7 +613,7 @@ class TravelPlanner:
             self.display_itinerary(single_itinerary)
 
             if input("Would you like to see booking options for this itinerary? (yes/no): ").lower() == 'yes':
-                booking_options = self.get_booking_options(single_itinerary)
+                booking_options = self.get_booking_options(single_itinerary, self.ask_start_date())
                 if booking_options:
                     rated_options = self.display_booking_options(booking_options)
                     self.get_user_confirmation(rated_options)
@@ -0,0 +1,45 @@
+import datetime
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The modules live at the repository root, as for the benchmarks.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def small_destination(rng, num_activities=6, num_accommodations=4, num_food=3):
+    """A synthetic catalog entry with integer costs, small enough for exhaustive searches."""
+    return {
+        "activities": [{"name": f"Activity {i}", "rating": round(float(rng.uniform(3.0, 5.0)), 1), "cost": int(rng.integers(0, 60))}
+                       for i in range(num_activities)],
+        "accommodations": [{"name": f"Hotel {i}", "rating": round(float(rng.uniform(3.0, 5.0)), 1),
+                            "price_per_night": int(rng.integers(20, 120))} for i in range(num_accommodations)],
+        "food": [{"name": f"Dish {i}", "avg_cost": int(rng.integers(3, 20))} for i in range(num_food)],
+    }
+
+
+@pytest.fixture
+def make_destination():
+    """small_destination(rng, num_activities=6, num_accommodations=4, num_food=3)."""
+    return small_destination
+
+
+def synthetic_fare_frame(num_rows, seed, start_date=datetime.date(2026, 6, 1), end_date=datetime.date(2026, 8, 31),
+                         region_coords=(10, -85, 28, -59), budget=800):
+    """Simulated fares; every seventh row has an unknown (null) stop count."""
+    from flexi_date_flexi_destination_flight import synthetic_fares
+
+    fares = synthetic_fares(start_date, end_date, region_coords, budget, num_rows, np.random.default_rng(seed))
+    if fares.empty:
+        return fares
+    stops = fares["stops"].astype("Int64")
+    stops[::7] = None
+    return fares.assign(stops=stops)
+
+
+@pytest.fixture
+def make_fares():
+    """synthetic_fare_frame(num_rows, seed, start_date, end_date, region_coords, budget)."""
+    return synthetic_fare_frame
@@ -0,0 +1,113 @@
+import datetime
+import sqlite3
+import threading
+
+import pytest
+
+from booking_inventory import CONFIRMED, HELD, BookingInventory
+
+NIGHT = datetime.date(2026, 7, 1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hold_confirm_release():
+    inventory = BookingInventory(default_capacity=2)
+    first = inventory.hold([("hotel", NIGHT, 1), ("hotel", NIGHT + datetime.timedelta(days=1), 1)])
+    assert inventory.state(first) == HELD
+    assert inventory.available("hotel", NIGHT) == 1
+    assert inventory.hold([("hotel", NIGHT, 2)]) is None
+    assert inventory.available("hotel", NIGHT) == 1  # all or nothing
+
+    assert inventory.confirm(first)
+    assert inventory.state(first) == CONFIRMED
+    assert not inventory.confirm(first)
+    assert inventory.release(first)
+    assert inventory.state(first) is None
+    assert not inventory.release(first)
+    assert inventory.available("hotel", NIGHT) == 2
+    assert inventory.hold([]) is None
+
+
+def test_holds_expire():
+    clock = FakeClock()
+    inventory = BookingInventory(default_capacity=1, hold_ttl=60, clock=clock)
+    late = inventory.hold([("hotel", NIGHT, 1)])
+    clock.now += 61
+    assert not inventory.confirm(late)
+    assert inventory.state(late) is None
+    assert inventory.available("hotel", NIGHT) == 1
+
+    kept = inventory.hold([("hotel", NIGHT, 1)], ttl=10)
+    clock.now += 5
+    assert inventory.expire() == 0
+    clock.now += 5
+    assert inventory.expire() == 1
+    assert inventory.state(kept) is None
+    assert inventory.available("hotel", NIGHT) == 1
+
+
+def test_threads_never_oversell():
+    inventory = BookingInventory(default_capacity=25, num_stripes=4)
+    inventory.ensure_item("hotel", 25)
+    barrier = threading.Barrier(16)
+    confirmed = []
+
+    def book():
+        barrier.wait()
+        for _ in range(20):
+            hold_id = inventory.hold([("hotel", NIGHT, 1), ("hotel", NIGHT + datetime.timedelta(days=1), 1)])
+            if hold_id is not None and inventory.confirm(hold_id):
+                confirmed.append(hold_id)
+
+    threads = [threading.Thread(target=book) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(confirmed) == 25
+    assert inventory.available("hotel", NIGHT) == 0
+
+
+def test_reload_from_sqlite(tmp_path):
+    path = str(tmp_path / "inventory.db")
+    clock = FakeClock()
+    inventory = BookingInventory(default_capacity=5, hold_ttl=60, path=path, clock=clock)
+    inventory.set_capacity("hotel", 3)
+    booked = inventory.hold([("hotel", NIGHT, 1)])
+    inventory.confirm(booked)
+    held = inventory.hold([("hotel", NIGHT, 1)])
+    released = inventory.hold([("hotel", NIGHT, 1)])
+    inventory.release(released)
+    inventory.close()
+
+    reopened = BookingInventory(default_capacity=5, hold_ttl=60, path=path, clock=clock)
+    assert reopened.capacity("hotel") == 3
+    assert reopened.state(booked) == CONFIRMED
+    assert reopened.state(held) == HELD
+    assert reopened.state(released) is None
+    assert reopened.available("hotel", NIGHT) == 1
+    clock.now += 61
+    assert reopened.available("hotel", NIGHT) == 2
+    reopened.close()
+
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT hold_id, state FROM holds").fetchall() == [(booked, CONFIRMED)]
+
+
+def test_failed_write_takes_nothing(tmp_path):
+    inventory = BookingInventory(default_capacity=1, path=str(tmp_path / "inventory.db"))
+    inventory._db.execute("CREATE TRIGGER refuse BEFORE INSERT ON holds BEGIN SELECT RAISE(ABORT, 'refused'); END")
+    with pytest.raises(sqlite3.IntegrityError):
+        inventory.hold([("hotel", NIGHT, 1)])
+    assert not inventory._db.in_transaction
+    assert inventory.available("hotel", NIGHT) == 1
+    inventory._db.execute("DROP TRIGGER refuse")
+    assert inventory.hold([("hotel", NIGHT, 1)]) is not None
+    inventory.close()
@@ -0,0 +1,71 @@
+import datetime
+
+import pytest
+
+from date_phrases import DateCalendar, FlexibleDateParser
+
+TODAY = datetime.date(2026, 10, 18)  # a Sunday
+D = datetime.date
+
+
+@pytest.fixture
+def parser():
+    return FlexibleDateParser()
+
+
+@pytest.mark.parametrize("phrase, expected", [
+    ("labor day weekend", (D(2027, 9, 3), D(2027, 9, 6))),
+    ("thanksgiving weekend", (D(2026, 11, 26), D(2026, 11, 29))),
+    ("christmas weekend", (D(2026, 12, 25), D(2026, 12, 27))),
+    ("july 4th weekend", (D(2027, 7, 2), D(2027, 7, 4))),
+    ("4th of july long weekend", (D(2027, 7, 2), D(2027, 7, 4))),
+    ("memorial day weekend 2027", (D(2027, 5, 28), D(2027, 5, 31))),
+    ("thanksgiving weekend 2028", (D(2028, 11, 23), D(2028, 11, 26))),
+])
+def test_holiday_weekends(parser, phrase, expected):
+    assert parser.parse_windows(phrase, TODAY) == (expected,)
+
+
+def test_tuesday_and_wednesday_holidays():
+    parser = FlexibleDateParser()
+    # Christmas 2029 is a Tuesday and 2030 a Wednesday.
+    assert parser.parse("christmas weekend 2029", TODAY) == (D(2029, 12, 21), D(2029, 12, 25))
+    assert parser.parse("christmas weekend 2030", TODAY) == (D(2030, 12, 25), D(2030, 12, 29))
+
+
+def test_weekends_in_a_month_of_a_given_year(parser):
+    expected = ((D(2027, 12, 3), D(2027, 12, 5)), (D(2027, 12, 10), D(2027, 12, 12)),
+                (D(2027, 12, 17), D(2027, 12, 19)), (D(2027, 12, 24), D(2027, 12, 26)), (D(2027, 12, 31), D(2028, 1, 2)))
+    assert parser.parse_windows("a weekend in december 2027", TODAY) == expected
+    assert parser.parse_windows("december 2027 weekends", TODAY) == expected
+    assert parser.parse_windows("a weekend in december", TODAY)[0] == (D(2026, 12, 4), D(2026, 12, 6))
+    # Outside the years the parser keeps a calendar for.
+    assert parser.parse("a weekend in march 2030", TODAY) == (D(2030, 3, 1), D(2030, 3, 3))
+
+
+def test_this_and_next_weekend(parser):
+    assert parser.parse("this weekend", TODAY) == (TODAY, TODAY)
+    assert parser.parse("next weekend", TODAY) == (D(2026, 10, 23), D(2026, 10, 25))
+    wednesday = D(2026, 10, 14)
+    assert parser.parse("this weekend", wednesday) == (D(2026, 10, 16), D(2026, 10, 18))
+    assert parser.parse("next weekend", wednesday) == (D(2026, 10, 23), D(2026, 10, 25))
+
+
+@pytest.mark.parametrize("phrase, expected", [
+    ("weekend", (D(2026, 10, 23), D(2026, 10, 25))),
+    ("next 2 weekends", (D(2026, 10, 23), D(2026, 10, 25))),
+    ("july 4th", (D(2027, 7, 2), D(2027, 7, 6))),
+    ("christmas", (D(2026, 12, 23), D(2026, 12, 27))),
+    ("next week", (D(2026, 10, 19), D(2026, 10, 25))),
+    ("2026-11-01 to 2026-11-05", (D(2026, 11, 1), D(2026, 11, 5))),
+    ("gibberish", (None, None)),
+])
+def test_other_phrases_are_unchanged(parser, phrase, expected):
+    assert parser.parse(phrase, TODAY) == expected
+
+
+def test_holiday_long_weekends():
+    calendar = DateCalendar(2026)
+    assert calendar.weekends_between(D(2026, 11, 1), D(2026, 12, 31), long=True) == [
+        (D(2026, 11, 26), D(2026, 11, 29)), (D(2026, 12, 25), D(2026, 12, 27))]
+    assert calendar.weekends_from(D(2026, 10, 17), 2) == [(D(2026, 10, 17), D(2026, 10, 18)), (D(2026, 10, 23), D(2026, 10, 25))]
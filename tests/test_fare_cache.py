@@ -0,0 +1,120 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from fare_cache import FareCache
+
+REGION = (10, -85, 28, -59)
+JUNE, JULY_END = datetime.date(2026, 6, 1), datetime.date(2026, 7, 31)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Fetcher:
+    """fetch() for get_or_fetch that records its calls and returns fixed synthetic fares."""
+
+    def __init__(self, make_fares, num_rows=400):
+        self.make_fares = make_fares
+        self.num_rows = num_rows
+        self.calls = []
+
+    def __call__(self, start_date, end_date, region_coords, budget):
+        self.calls.append((start_date, end_date, region_coords, budget))
+        return self.make_fares(self.num_rows, len(self.calls), start_date, end_date, region_coords, budget)
+
+
+def expected_slice(fares, start_date, end_date, budget):
+    departures = fares["departure_date"]
+    return fares[(departures >= pd.Timestamp(start_date)) & (departures < pd.Timestamp(end_date) + pd.Timedelta(days=1))
+                 & (fares["price"] <= budget)]
+
+
+def test_sub_range_and_same_bucket_hits(make_fares):
+    cache, fetch = FareCache(budget_bucket=50), Fetcher(make_fares)
+    first = cache.get_or_fetch(JUNE, JULY_END, REGION, 420, fetch)
+    assert fetch.calls == [(JUNE, JULY_END, REGION, 450)]
+    fetched = make_fares(400, 1, JUNE, JULY_END, REGION, 450)
+    pd.testing.assert_frame_equal(first, expected_slice(fetched, JUNE, JULY_END, 420))
+
+    july = (datetime.date(2026, 7, 1), datetime.date(2026, 7, 15))
+    narrower = cache.get_or_fetch(*july, REGION, 440, fetch)
+    assert len(fetch.calls) == 1
+    pd.testing.assert_frame_equal(narrower, expected_slice(fetched, *july, 440))
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+    cache.get_or_fetch(JUNE, datetime.date(2026, 8, 5), REGION, 420, fetch)  # wider window
+    cache.get_or_fetch(JUNE, JULY_END, REGION, 460, fetch)  # next budget bucket
+    cache.get_or_fetch(JUNE, JULY_END, (12, -80, 20, -70), 420, fetch)  # another region
+    assert len(fetch.calls) == 4
+
+
+def test_entries_expire_after_their_ttl(make_fares):
+    clock = FakeClock()
+    cache, fetch = FareCache(ttl=60, clock=clock), Fetcher(make_fares)
+    cache.get_or_fetch(JUNE, JULY_END, REGION, 400, fetch)
+    clock.now += 59
+    assert cache.get(JUNE, JULY_END, REGION, 400) is not None
+    clock.now += 1
+    assert cache.get(JUNE, JULY_END, REGION, 400) is None
+    assert cache.stats["expirations"] == 1 and len(cache) == 0
+
+    cache.put(JUNE, JULY_END, (0, 0, 1, 1), 400, fetch(JUNE, JULY_END, REGION, 400))
+    clock.now += 61
+    cache.get(JUNE, JULY_END, REGION, 400)  # another group: expired entries are swept all the same
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entries_are_evicted(make_fares):
+    fares = make_fares(400, 0)
+    size = int(fares.memory_usage(deep=True).sum())
+    cache = FareCache(max_bytes=int(size * 2.5))
+    regions = [(lat, -85, lat + 5, -59) for lat in (0, 10, 20)]
+    for region in regions[:2]:
+        cache.put(JUNE, JULY_END, region, 400, fares)
+    assert cache.get(JUNE, JULY_END, regions[0], 400) is not None  # now the most recently used
+    cache.put(JUNE, JULY_END, regions[2], 400, fares)
+    assert cache.stats["evictions"] == 1
+    assert cache.get(JUNE, JULY_END, regions[1], 400) is None
+    assert cache.get(JUNE, JULY_END, regions[0], 400) is not None
+    assert cache.get(JUNE, JULY_END, regions[2], 400) is not None
+
+
+def test_disk_tier_survives_a_restart(tmp_path, make_fares):
+    pytest.importorskip("pyarrow")
+    clock = FakeClock()
+    fetch = Fetcher(make_fares)
+    FareCache(path=str(tmp_path), clock=clock).get_or_fetch(JUNE, JULY_END, REGION, 400, fetch)
+
+    reopened = FareCache(path=str(tmp_path), clock=clock)
+    july = (datetime.date(2026, 7, 1), datetime.date(2026, 7, 31))
+    fares = reopened.get_or_fetch(*july, REGION, 380, fetch)
+    assert len(fetch.calls) == 1 and reopened.stats["disk_hits"] == 1
+    expected = expected_slice(make_fares(400, 1, JUNE, JULY_END, REGION, 400), *july, 380)
+    assert fares["price"].tolist() == pytest.approx(expected["price"].tolist())
+
+    clock.now += reopened.ttl
+    assert FareCache(path=str(tmp_path), clock=clock).get(JUNE, JULY_END, REGION, 400) is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_empty_results_are_cached(tmp_path):
+    pytest.importorskip("pyarrow")
+    calls = []
+
+    def fetch_nothing(*args):
+        calls.append(args)
+        return pd.DataFrame()
+
+    for path in (None, str(tmp_path)):
+        cache = FareCache(path=path)
+        assert cache.get_or_fetch(JUNE, JULY_END, REGION, 400, fetch_nothing).empty
+        assert cache.get_or_fetch(JUNE, datetime.date(2026, 6, 30), REGION, 400, fetch_nothing).empty
+    assert len(calls) == 2
+    assert FareCache(path=str(tmp_path)).get(JUNE, JULY_END, REGION, 400).empty
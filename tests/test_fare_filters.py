@@ -0,0 +1,58 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from fare_store import FareStore, fare_mask, scan_fares
+from flexi_date_flexi_destination_flight import FlightExplorer
+
+
+def test_string_airline_is_one_name(make_fares):
+    frame = make_fares(2000, 0)
+    assert np.array_equal(fare_mask(frame, airlines="FlyLow"), fare_mask(frame, airlines=["FlyLow"]))
+    assert fare_mask(frame, airlines="FlyLow").sum() == (frame["airline"] == "FlyLow").sum()
+    plain = frame.assign(airline=frame["airline"].astype(str))
+    assert np.array_equal(fare_mask(plain, airlines="FlyLow"), fare_mask(frame, airlines="FlyLow"))
+
+
+def test_unknown_stops_fail_the_stops_filter(make_fares):
+    frame = FareStore._normalize(make_fares(2000, 1))
+    unknown = frame["stops"].isna().to_numpy()
+    assert unknown.any()
+    assert not fare_mask(frame, max_stops=2)[unknown].any()
+    assert fare_mask(frame)[unknown].all()
+    assert fare_mask(frame, max_stops=0).sum() == (frame["stops"] == 0).sum()
+
+
+def test_store_keeps_unknown_stops_unknown(make_fares):
+    store = FareStore()
+    store.append(make_fares(500, 2))
+    assert store.frame["stops"].isna().sum() == len(range(0, 500, 7))
+    assert not store.query(max_stops=2)["stops"].isna().any()
+
+
+def test_filter_flights_fuses_every_filter(make_fares):
+    explorer = FlightExplorer(rng=0)
+    explorer.flight_data = make_fares(3000, 3)
+    frame = explorer.flight_data
+    result = explorer.filter_flights(max_budget=400, max_duration_hours=8, max_stops=1, preferred_airlines="BudgetAir")
+    duration = frame["arrival_date"] - frame["departure_date"]
+    expected = frame[(frame["price"] <= 400) & (duration.dt.total_seconds() <= 8 * 3600) & frame["stops"].le(1).fillna(False)
+                     & (frame["airline"] == "BudgetAir")]
+    assert result.index.tolist() == expected.index.tolist()
+
+
+def test_scan_fares_matches_resident_query(tmp_path, make_fares):
+    pytest.importorskip("pyarrow")
+    store = FareStore(path=str(tmp_path))
+    for batch in range(3):
+        store.append(make_fares(1000, 200 + batch))
+    filters = {"start_date": datetime.date(2026, 7, 1), "end_date": datetime.date(2026, 7, 31), "region_coords": (12, -80, 20, -70),
+               "max_budget": 500, "max_stops": 1, "airlines": "FlyLow"}
+    scanned = scan_fares(str(tmp_path), **filters)
+    expected = store.query(filters["start_date"], filters["end_date"], filters["region_coords"], filters["max_budget"],
+                           max_stops=1, airlines="FlyLow")
+    key = ["departure_date", "price"]
+    assert len(scanned) == len(expected) > 0
+    assert np.allclose(scanned.sort_values(key)["price"].to_numpy(), expected.sort_values(key)["price"].to_numpy())
+    assert not scanned["stops"].isna().any()
@@ -0,0 +1,25 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from flexi_date_flexi_destination_flight import iter_synthetic_fares, synthetic_fares
+
+START, END = datetime.date(2026, 6, 1), datetime.date(2026, 6, 30)
+REGION = (10, -85, 28, -59)
+
+
+@pytest.mark.parametrize("chunk_size", [None, 7])
+def test_no_rows_no_chunks(chunk_size):
+    assert list(iter_synthetic_fares(START, END, REGION, 500, 0, np.random.default_rng(0), chunk_size)) == []
+    assert synthetic_fares(START, END, REGION, 500, 0, np.random.default_rng(0)).empty
+
+
+def test_chunks_cover_num_rows_within_bounds():
+    chunks = list(iter_synthetic_fares(START, END, REGION, 500, 25, np.random.default_rng(1), chunk_size=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    for chunk in chunks:
+        assert chunk["price"].between(50, 500).all()
+        assert chunk["latitude"].between(10, 28).all() and chunk["longitude"].between(-85, -59).all()
+        assert (chunk["departure_date"].dt.date >= START).all() and (chunk["departure_date"].dt.date <= END).all()
+        assert (chunk["arrival_date"] > chunk["departure_date"]).all()
@@ -0,0 +1,96 @@
+import asyncio
+import datetime
+
+import pytest
+
+from benchmarks.stub_fare_server import start_stub_server
+from fare_providers import HttpFareProvider, SimulatedFareProvider, iter_provider_fares
+from fare_store import FareStore
+from flexi_date_flexi_destination_flight import FlightExplorer
+
+START, END = datetime.date(2026, 6, 1), datetime.date(2026, 6, 5)
+REGION = (10, -85, 28, -59)
+
+
+async def fetch_from_stub(provider_options, **stub_options):
+    """fetch_flight_data_async against a stub fare server; returns the explorer."""
+    pytest.importorskip("aiohttp")
+    server = await start_stub_server(**stub_options)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/fares"
+    explorer = FlightExplorer(fare_store=FareStore(), destinations={})
+    try:
+        providers = [HttpFareProvider(name, url, **provider_options) for name in ("alpha", "beta")]
+        await explorer.fetch_flight_data_async(START, END, REGION, 400, providers)
+    finally:
+        server.close()
+        await server.wait_closed()
+    return explorer
+
+
+def test_fares_from_the_stub_server():
+    explorer = asyncio.run(fetch_from_stub({"rng": 0}))
+    assert explorer.fetch_errors == []
+    fares = explorer.flight_data
+    assert len(explorer.fare_store) == len(fares) > 0
+    assert set(fares["departure_date"].dt.date) == {START + datetime.timedelta(days=offset) for offset in range(5)}
+    assert fares["price"].le(400).all()
+    assert fares["latitude"].between(10, 28).all() and fares["longitude"].between(-85, -59).all()
+
+
+def test_failures_are_retried():
+    explorer = asyncio.run(fetch_from_stub({"retries": 8, "backoff": 0.001, "rng": 0}, failure_rate=0.2, seed=1))
+    assert explorer.fetch_errors == []
+    assert len(set(explorer.flight_data["departure_date"].dt.date)) == 5
+
+
+def test_timeouts_are_reported_per_request():
+    explorer = asyncio.run(fetch_from_stub({"timeout": 0.02, "retries": 1, "backoff": 0.001, "rng": 0}, latency=0.5))
+    assert explorer.flight_data.empty
+    assert len(explorer.fetch_errors) == 10
+    assert all(isinstance(error, asyncio.TimeoutError) for _, _, error in explorer.fetch_errors)
+
+
+class TrackedProvider(SimulatedFareProvider):
+    """Counts requests in flight and records requests that have fully unwound."""
+
+    def __init__(self, *args, **options):
+        super().__init__(*args, **options)
+        self.in_flight = self.peak = 0
+        self.started = self.unwound = 0
+
+    async def fetch_day(self, session, day, region_coords, budget):
+        self.started += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            return await super().fetch_day(session, day, region_coords, budget)
+        finally:
+            self.in_flight -= 1
+            self.unwound += 1
+
+
+def test_concurrency_limit():
+    provider = TrackedProvider("tracked", latency=0.01, max_concurrency=3, rng=0)
+
+    async def run():
+        return [result async for result in iter_provider_fares([provider], START, START + datetime.timedelta(days=11), REGION, 400)]
+
+    results = asyncio.run(run())
+    assert len(results) == 12 and all(error is None for _, _, _, error in results)
+    assert provider.peak == 3
+
+
+def test_closing_early_waits_for_cancelled_requests():
+    provider = TrackedProvider("tracked", latency=0.05, max_concurrency=20, rng=0)
+    fast = SimulatedFareProvider("fast", rng=0)
+
+    async def run():
+        results = iter_provider_fares([provider, fast], START, END, REGION, 400)
+        name, _, fares, error = await anext(results)
+        assert name == "fast" and error is None
+        await results.aclose()
+        # Every request that had started has unwound by the time the generator is closed.
+        assert provider.started == provider.unwound > 0
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
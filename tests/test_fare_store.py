@@ -0,0 +1,82 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fare_store
+from fare_store import FareStore
+
+
+def brute_force(frame, start_date=None, end_date=None, region_coords=None, max_price=None, min_price=None, **fare_filters):
+    mask = np.ones(len(frame), dtype=bool)
+    departures = frame["departure_date"]
+    if start_date is not None:
+        mask &= (departures >= pd.Timestamp(start_date)).to_numpy()
+    if end_date is not None:
+        mask &= (departures < pd.Timestamp(end_date) + pd.Timedelta(days=1)).to_numpy()
+    if region_coords is not None:
+        min_lat, min_lon, max_lat, max_lon = region_coords
+        mask &= frame["latitude"].between(min_lat, max_lat).to_numpy() & frame["longitude"].between(min_lon, max_lon).to_numpy()
+    if max_price is not None:
+        mask &= (frame["price"] <= max_price).to_numpy()
+    if min_price is not None:
+        mask &= (frame["price"] >= min_price).to_numpy()
+    if fare_filters.get("max_duration_hours") is not None:
+        mask &= ((frame["arrival_date"] - frame["departure_date"]) <= pd.Timedelta(hours=fare_filters["max_duration_hours"])).to_numpy()
+    if fare_filters.get("max_stops") is not None:
+        mask &= frame["stops"].le(fare_filters["max_stops"]).fillna(False).to_numpy(dtype=bool)
+    airlines = fare_filters.get("airlines")
+    if airlines:
+        mask &= frame["airline"].astype(str).isin([airlines] if isinstance(airlines, str) else airlines).to_numpy()
+    return frame[mask]
+
+
+QUERIES = [
+    {},
+    {"start_date": datetime.date(2026, 7, 1), "end_date": datetime.date(2026, 7, 10)},
+    {"region_coords": (12, -80, 20, -70), "max_price": 300},
+    {"min_price": 200, "max_price": 250},
+    {"start_date": datetime.date(2026, 6, 15), "max_stops": 1, "airlines": ["BudgetAir"], "max_duration_hours": 6},
+]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_query_matches_brute_force_across_appends(monkeypatch, make_fares, query):
+    # Small merge thresholds, so the appends below go through the delta and several merges.
+    monkeypatch.setattr(fare_store, "MIN_MERGE_ROWS", 300)
+    monkeypatch.setattr(fare_store, "MERGE_FRACTION", 4)
+    store = FareStore(cell_degrees=2.0)
+    appended = []
+    for batch in range(25):
+        frame = make_fares(int(np.random.default_rng(batch).integers(1, 200)), 100 + batch)
+        store.append(frame)
+        appended.append(frame)
+        everything = FareStore._normalize(pd.concat(appended, ignore_index=True))
+        result = store.query(**query)
+        expected = brute_force(everything, **query)
+        assert len(result) == len(expected)
+        pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True), check_categorical=False)
+    assert len(store) == len(store.frame) == sum(map(len, appended))
+
+
+def test_empty_appends_and_empty_store(make_fares):
+    store = FareStore()
+    assert store.append(None) == 0
+    assert store.append(pd.DataFrame()) == 0
+    assert len(store) == 0
+    assert store.query(max_price=100).empty
+    store.append(make_fares(50, 1))
+    assert len(store.query()) == 50
+
+
+def test_reopened_store_has_the_same_rows(tmp_path, make_fares):
+    pytest.importorskip("pyarrow")
+    store = FareStore(path=str(tmp_path))
+    for batch in range(3):
+        store.append(make_fares(300, batch))
+    reopened = FareStore(path=str(tmp_path))
+    query = {"start_date": datetime.date(2026, 7, 1), "region_coords": (12, -80, 20, -70)}
+    key = ["departure_date", "price"]
+    pd.testing.assert_frame_equal(reopened.query(**query).sort_values(key).reset_index(drop=True),
+                                  store.query(**query).sort_values(key).reset_index(drop=True), check_categorical=False)
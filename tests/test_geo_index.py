@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fare_store import FareStore, GridIndex, scan_fares
+from flexi_date_flexi_destination_flight import FlightExplorer
+from geo_index import PointSet, RegionRegistry, haversine_km, load_airports
+
+PACIFIC = (-30, 170, 0, -170)  # crosses the antimeridian
+
+
+def random_points(count, seed):
+    rng = np.random.default_rng(seed)
+    return [f"P{i}" for i in range(count)], rng.uniform(-80, 80, count), rng.uniform(-180, 180, count)
+
+
+@pytest.mark.parametrize("cell_degrees", [1.0, 5.0])
+def test_nearest_matches_brute_force(cell_degrees):
+    names, latitudes, longitudes = random_points(2000, 0)
+    points = PointSet(cell_degrees)
+    points.add(names, latitudes, longitudes)
+    rng = np.random.default_rng(1)
+    queries = list(zip(rng.uniform(-80, 80, 150), rng.uniform(-180, 180, 150)))
+    queries += [(float(lat), float(lon)) for lat, lon in zip(rng.uniform(-60, 60, 50), rng.choice([-179.6, 179.7, 180.0, -180.0], 50))]
+    for latitude, longitude in queries:
+        distances = haversine_km(latitude, longitude, latitudes, longitudes)
+        expected = np.sort(distances)[:5]
+        assert np.allclose([distance for _, distance in points.nearest(latitude, longitude, 5)], expected)
+
+
+def test_nearest_with_fewer_points_than_k():
+    points = PointSet()
+    assert points.nearest(0, 0) == []
+    points.add(["a", "b"], [0, 10], [179.5, -179.5])
+    assert [name for name, _ in points.nearest(5, -179.9, k=5)] == ["b", "a"]
+
+
+def test_in_box_across_the_antimeridian():
+    names, latitudes, longitudes = random_points(3000, 2)
+    points = PointSet(2.0)
+    points.add(names, latitudes, longitudes)
+    min_lat, min_lon, max_lat, max_lon = PACIFIC
+    inside = (latitudes >= min_lat) & (latitudes <= max_lat) & ((longitudes >= min_lon) | (longitudes <= max_lon))
+    assert points.in_box(PACIFIC) == [names[i] for i in np.flatnonzero(inside)]
+    assert len(points.in_box(PACIFIC)) > 0
+
+
+def test_grid_bands_across_the_antimeridian():
+    grid = GridIndex(5.0)
+    latitudes, longitudes = np.array([-10.0, -10.0, -10.0, -10.0]), np.array([172.0, 179.9, -179.9, -150.0])
+    grid.insert(latitudes, longitudes, np.arange(4))
+    assert sorted(grid.range(PACIFIC).tolist()) == [0, 1, 2]
+    assert grid.count(PACIFIC) == 3
+
+
+def test_fare_store_and_scan_across_the_antimeridian(tmp_path, make_fares):
+    pytest.importorskip("pyarrow")
+    store = FareStore(path=str(tmp_path), cell_degrees=2.0)
+    frames = [make_fares(500, 300, region_coords=(-40, 150, 10, -150)), make_fares(500, 301)]
+    for frame in frames:
+        store.append(frame)
+    everything = pd.concat(frames, ignore_index=True)
+    min_lat, min_lon, max_lat, max_lon = PACIFIC
+    expected = everything[everything["latitude"].between(min_lat, max_lat)
+                          & ((everything["longitude"] >= min_lon) | (everything["longitude"] <= max_lon))]
+    assert expected["longitude"].lt(0).any() and expected["longitude"].gt(0).any()
+    result = store.query(region_coords=PACIFIC)
+    assert np.allclose(np.sort(result["price"].to_numpy()), np.sort(expected["price"].to_numpy()))
+    scanned = scan_fares(str(tmp_path), region_coords=PACIFIC, max_budget=400)
+    assert np.allclose(np.sort(scanned["price"].to_numpy()), np.sort(expected.loc[expected["price"] <= 400, "price"].to_numpy()))
+
+
+def test_synthetic_fares_stay_inside_a_wrapped_region(make_fares):
+    fares = make_fares(2000, 5, region_coords=PACIFIC)
+    longitudes = fares["longitude"]
+    assert ((longitudes >= 170) | (longitudes <= -170)).all()
+    assert (longitudes < 0).any() and (longitudes > 0).any()
+
+
+def test_registry_airports():
+    registry = RegionRegistry()
+    registry.add_airports(load_airports())
+    assert set(registry.airports_in("flights to the caribbean")) >= {"SJU", "NAS", "BGI"}
+    assert registry.airports_in("atlantis") == []
+    assert set(registry.airports_in(PACIFIC)) == {"NAN", "TBU", "APW"}
+    assert registry.nearest_airports(-18.0, -179.0, 2)[0][0] == "NAN"
+    assert [code for code, _ in registry.nearest_airports(40.7, -74.0, 1)] == ["JFK"]
+
+
+def test_explorer_registers_airports_and_destinations():
+    catalog = {"fiji": {"latitude": -17.8, "longitude": 178.0}, "nowhere": {"activities": []}}
+    explorer = FlightExplorer(rng=0, destinations=catalog)
+    assert explorer.regions.destinations_in(PACIFIC) == ["fiji"]
+    assert explorer.regions.nearest_destinations(-17.0, -179.0, 5)[0][0] == "fiji"
+    assert len(explorer.regions.airports) == len(load_airports())
+    # The default catalog's destinations with coordinates are registered too.
+    assert "bahrain" in FlightExplorer(rng=0).regions.destinations_in((20, 45, 30, 55))
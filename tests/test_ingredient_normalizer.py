@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from catalog_store import LazyCatalog
+from dynamic_recipe_generator import RecipeGenerator
+from ingredient_normalizer import BKTree, IngredientNormalizer, edit_distance, stem
+
+VOCABULARY = ["tomato", "onion", "spring onion", "eggplant", "chickpea", "mozzarella", "basil", "bay leaf", "curry leaf",
+              "coriander", "cilantro", "olive oil", "parmesan", "potato", "berry"]
+
+
+@pytest.fixture(scope="module")
+def normalizer():
+    return IngredientNormalizer(VOCABULARY)
+
+
+@pytest.mark.parametrize("word, singular", [("tomatoes", "tomato"), ("berries", "berry"), ("olives", "olive"), ("leaves", "leaf"),
+                                            ("molasses", "molasses"), ("hummus", "hummus"), ("peas", "pea"), ("dishes", "dish")])
+def test_stem(word, singular):
+    assert stem(word) == singular
+
+
+@pytest.mark.parametrize("token, canonical", [
+    ("2 Tomatoes", "tomato"), ("500g chickpeas", "chickpea"), ("a pinch of basil", "basil"), ("scallions", "spring onion"),
+    ("Aubergine", "eggplant"), ("garbanzo beans", "chickpea"), ("EVOO", "olive oil"), ("fresh basil leaves", "basil"),
+    ("chopped onions", "onion"), ("bay leaves", "bay leaf"), ("curry leaf", "curry leaf"), ("coriander", "coriander"),
+    ("ground coriander", "coriander"), ("coriander leaves", "cilantro"), ("dhania", "cilantro"), ("mozarella", "mozzarella"),
+    ("parmigiano reggiano", "parmesan"), ("", ""),
+])
+def test_normalize(normalizer, token, canonical):
+    assert normalizer.normalize(token) == canonical
+
+
+def test_short_words_are_not_typo_matched(normalizer):
+    # One edit away from "onion", but short words get no typo tolerance.
+    assert normalizer.normalize("onio") == "onio"
+
+
+def test_parse_splits_search_box_text(normalizer):
+    assert normalizer.parse("2 tomatoes, scallions and fresh basil; ") == ["tomato", "spring onion", "basil"]
+
+
+def test_bk_tree_search_matches_brute_force():
+    rng = np.random.default_rng(0)
+    terms = ["".join(rng.choice(list("abcdef"), int(rng.integers(3, 9)))) for _ in range(300)]
+    tree = BKTree(terms)
+    for query in terms[:40] + ["abcabc", "fedcba", "aaaa"]:
+        for max_distance in (0, 1, 2):
+            expected = sorted({(edit_distance(query, term, 20), term) for term in terms if edit_distance(query, term, 20) <= max_distance})
+            assert tree.search(query, max_distance) == expected
+
+
+def test_edit_distance_stops_past_the_limit():
+    assert edit_distance("kitten", "sitting", 5) == 3
+    assert edit_distance("kitten", "sitting", 2) == 3  # limit + 1
+    assert edit_distance("a", "abcdef", 2) == 3
+
+
+def test_vocabulary_comes_from_the_catalog_terms_without_decoding(tmp_path):
+    catalog = LazyCatalog("cuisines", db_path=str(tmp_path / "catalog.sqlite"))
+    generator = RecipeGenerator(catalog, rng=0)
+    vocabulary = generator.normalizer.vocabulary
+    assert not catalog._cache
+    assert "tomato" in vocabulary
+    decoded = RecipeGenerator({name: catalog[name] for name in catalog}, rng=0).normalizer.vocabulary
+    assert list(vocabulary) == list(decoded)
@@ -0,0 +1,41 @@
+import numpy as np
+
+from surprise_itinerary import TravelPlanner
+
+
+def test_bulk_itineraries_stay_in_the_affordable_sets(make_destination):
+    details = make_destination(np.random.default_rng(2), num_activities=30, num_accommodations=20, num_food=10)
+    planner = TravelPlanner({"testland": details}, rng=0)
+    budget, num_days = 600, 4
+    daily_budget = budget / num_days
+    itineraries = planner.generate_itineraries_bulk("testland", 200, budget, num_days)
+    assert list(itineraries) == [f"itinerary_{i+1}" for i in range(200)]
+    for itinerary in itineraries.values():
+        assert [day["day"] for day in itinerary["days"]] == list(range(1, num_days + 1))
+        for day in itinerary["days"]:
+            assert day["activities"][0]["cost"] <= daily_budget / 3
+            assert day["accommodation"]["price_per_night"] <= daily_budget / 2
+            assert day["food"][0]["avg_cost"] <= daily_budget / 4
+            assert len(day["food"]) in (1, 2)
+
+
+def test_bulk_falls_back_to_everything_when_nothing_is_affordable(make_destination):
+    details = make_destination(np.random.default_rng(3))
+    planner = TravelPlanner({"testland": details}, rng=0)
+    names = {activity["name"] for activity in details["activities"]}
+    for itinerary in planner.generate_itineraries_bulk("testland", 20, 1, 2).values():
+        assert all(day["activities"][0]["name"] in names for day in itinerary["days"])
+
+
+def test_bulk_without_budget_draws_from_the_whole_catalog(make_destination):
+    details = make_destination(np.random.default_rng(4), num_activities=5)
+    planner = TravelPlanner({"testland": details}, rng=0)
+    drawn = {day["activities"][0]["name"] for itinerary in planner.generate_itineraries_bulk("testland", 200, None, 3).values()
+             for day in itinerary["days"]}
+    assert drawn == {activity["name"] for activity in details["activities"]}
+
+
+def test_bulk_errors_for_every_id():
+    planner = TravelPlanner({"empty": {"activities": []}}, rng=0)
+    assert planner.generate_itineraries_bulk("nowhere", 2) == {"itinerary_1": "Destination not found.", "itinerary_2": "Destination not found."}
+    assert set(planner.generate_itineraries_bulk("empty", 2).values()) == {"Insufficient data for a surprise itinerary for this destination."}
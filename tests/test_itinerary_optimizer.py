@@ -0,0 +1,70 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from surprise_itinerary import TravelPlanner
+
+
+def trip_cost(itinerary):
+    return sum(sum(act["cost"] for act in day["activities"]) + day["accommodation"]["price_per_night"]
+               + sum(item["avg_cost"] for item in day["food"]) for day in itinerary["days"])
+
+
+def trip_rating(itinerary):
+    return sum(sum(act["rating"] for act in day["activities"]) + day["accommodation"]["rating"] for day in itinerary["days"])
+
+
+def best_rating(details, budget, num_days):
+    """Exhaustive search: distinct activities, any accommodation per night, the cheapest meal every day."""
+    meals = num_days * min(item["avg_cost"] for item in details["food"])
+    best = None
+    for activities in itertools.combinations(details["activities"], num_days):
+        for nights in itertools.product(details["accommodations"], repeat=num_days):
+            cost = sum(act["cost"] for act in activities) + sum(acc["price_per_night"] for acc in nights) + meals
+            if cost <= budget:
+                rating = sum(act["rating"] for act in activities) + sum(acc["rating"] for acc in nights)
+                best = rating if best is None else max(best, rating)
+    return best
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_optimizer_finds_the_best_trip_within_budget(make_destination, seed):
+    rng = np.random.default_rng(seed)
+    details = make_destination(rng)
+    num_days = 3
+    budget = int(rng.integers(150, 400))
+    planner = TravelPlanner({"testland": details}, rng=seed)
+    itinerary = planner.generate_optimized_itinerary("testland", budget, num_days)
+    expected = best_rating(details, budget, num_days)
+    if expected is None:
+        assert isinstance(itinerary, str)
+        return
+    assert trip_cost(itinerary) <= budget
+    assert trip_rating(itinerary) == pytest.approx(expected)
+    names = [day["activities"][0]["name"] for day in itinerary["days"]]
+    assert len(set(names)) == num_days
+
+
+def test_optimizer_upgrades_meals_only_with_leftover_budget(make_destination):
+    details = make_destination(np.random.default_rng(0))
+    planner = TravelPlanner({"testland": details}, rng=0)
+    for _ in range(20):
+        itinerary = planner.generate_optimized_itinerary("testland", 300, 3, diversity=0.5)
+        assert trip_cost(itinerary) <= 300
+
+
+def test_optimizer_errors():
+    details = {"activities": [{"name": "Cheap", "rating": 4.0, "cost": 5}, {"name": "Pricey", "rating": 4.5, "cost": 500},
+                              {"name": "Also pricey", "rating": 4.5, "cost": 500}],
+               "accommodations": [{"name": "Hostel", "rating": 3.0, "price_per_night": 10}],
+               "food": [{"name": "Rice", "avg_cost": 1}]}
+    planner = TravelPlanner({"testland": details, "empty": {"activities": []}}, rng=0)
+    assert planner.generate_optimized_itinerary("nowhere", 100, 3) == "Destination not found."
+    assert planner.generate_optimized_itinerary("empty", 100, 3) == "Insufficient data for a surprise itinerary for this destination."
+    assert planner.generate_optimized_itinerary("testland", 20, 3) == "Budget too low for this destination."
+    # Affordable with the cheap activity every day, but there is only one affordable activity.
+    assert planner.generate_optimized_itinerary("testland", 100, 3).startswith("Not enough affordable activities")
+    # With fewer activities than days they may repeat, so the same budget gives a trip.
+    itinerary = planner.generate_optimized_itinerary("testland", 100, 4)
+    assert [day["activities"][0]["name"] for day in itinerary["days"]] == ["Cheap"] * 4
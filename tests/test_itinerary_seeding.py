@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from surprise_itinerary import TravelPlanner, _generate_itinerary_chunk
+
+
+@pytest.mark.parametrize("strategy", ["random", "optimized"])
+def test_same_seed_same_itineraries(make_destination, strategy):
+    catalog = {"testland": make_destination(np.random.default_rng(1), num_activities=12)}
+    runs = [TravelPlanner(catalog, rng=7).generate_multiple_itineraries("testland", 5, 400, 3, strategy=strategy) for _ in range(2)]
+    assert runs[0] == runs[1]
+    assert TravelPlanner(catalog, rng=8).generate_multiple_itineraries("testland", 5, 400, 3, strategy=strategy) != runs[0]
+
+
+@pytest.mark.parametrize("strategy", ["random", "optimized"])
+def test_chunk_matches_one_planner_per_itinerary(make_destination, strategy):
+    catalog = {"testland": make_destination(np.random.default_rng(3), num_activities=12)}
+    jobs = [(f"itinerary_{i+1}", stream) for i, stream in enumerate(np.random.SeedSequence(5).spawn(6))]
+    expected = {}
+    for itinerary_id, stream in jobs:
+        planner = TravelPlanner(catalog, rng=stream)
+        if strategy == "optimized":
+            expected[itinerary_id] = planner.generate_optimized_itinerary("testland", 400, 3, itinerary_id, 0.5)
+        else:
+            expected[itinerary_id] = planner.generate_single_itinerary("testland", 400, 3, itinerary_id)
+    assert _generate_itinerary_chunk(catalog, "testland", 400, 3, strategy, 0.5, jobs) == expected
+
+
+def test_parallel_result_does_not_depend_on_the_worker_count(make_destination):
+    planner = TravelPlanner({"testland": make_destination(np.random.default_rng(4), num_activities=12)}, rng=0)
+    one = planner.generate_multiple_itineraries_parallel("testland", 6, 400, 3, strategy="optimized", seed=11, max_workers=1)
+    two = planner.generate_multiple_itineraries_parallel("testland", 6, 400, 3, strategy="optimized", seed=11, max_workers=2)
+    assert one == two
+    assert list(one) == [f"itinerary_{i+1}" for i in range(6)]
@@ -0,0 +1,140 @@
+import numpy as np
+
+from itinerary_store import ACCOMMODATION, ACTIVITY, FOOD
+from surprise_itinerary import TravelPlanner
+
+
+def test_get_after_the_destination_changes(make_destination):
+    catalog = {"testland": make_destination(np.random.default_rng(0), num_activities=10)}
+    store = TravelPlanner(catalog, rng=0).user_itineraries
+    itinerary_id = store.create("user", "testland", 500, 3)
+    assert store.get(itinerary_id)["destination"] == "testland"
+    assert store.get("no such id") is None
+
+    store.record(itinerary_id).days[:, ACTIVITY] = 5
+    catalog["testland"] = dict(catalog["testland"], activities=catalog["testland"]["activities"][:5])
+    assert store.get(itinerary_id) == "Itinerary doesn't match the destination's catalog."
+    del catalog["testland"]
+    assert store.get(itinerary_id) == "Destination not found."
+    assert store.find(user="user") == [itinerary_id]
+
+
+def fixed_destination():
+    """Costs chosen so that a budget of 60 a day only affords the first two picks of each category."""
+    return {
+        "activities": [{"name": f"Activity {i}", "cost": cost} for i, cost in enumerate([0, 20, 50, 80, 100, 120])],
+        "accommodations": [{"name": f"Hotel {i}", "price_per_night": price} for i, price in enumerate([20, 30, 60, 100])],
+        "food": [{"name": f"Dish {i}", "avg_cost": cost} for i, cost in enumerate([3, 15, 18, 25])],
+    }
+
+
+def names(itinerary):
+    return [(day["activities"][0]["name"], day["accommodation"]["name"], [meal["name"] for meal in day["food"]])
+            for day in itinerary["days"]]
+
+
+def test_swap_activity(make_destination):
+    planner = TravelPlanner({"testland": make_destination(np.random.default_rng(1))}, rng=0)
+    store = planner.user_itineraries
+    itinerary_id = store.create("user", "testland", None, 3)
+    before, version = names(store.get(itinerary_id)), store.record(itinerary_id).version
+
+    swapped = store.swap_activity(itinerary_id, 2, "Activity 4")
+    assert names(swapped)[1][0] == "Activity 4"
+    assert names(swapped)[::2] == before[::2] and names(swapped)[1][1:] == before[1][1:]
+    assert store.record(itinerary_id).version == version + 1
+
+    for _ in range(5):
+        current = names(store.get(itinerary_id))[0][0]
+        assert names(store.swap_activity(itinerary_id, 1))[0][0] != current
+    assert store.swap_activity("no such id", 1) == "Itinerary not found."
+    assert store.swap_activity(itinerary_id, 0) == store.swap_activity(itinerary_id, 4) == "Day not in itinerary."
+    assert store.swap_activity(itinerary_id, 1, "Activity 99") == "Activity not found."
+
+    planner.destinations_data["testland"] = dict(planner.destinations_data["testland"], activities=[{"name": "Only", "cost": 1}])
+    # Until every day is moved onto the new catalog, the others still point past its one activity.
+    assert store.swap_activity(itinerary_id, 1, "Only") == store.swap_activity(itinerary_id, 2, "Only") == \
+        "Itinerary doesn't match the destination's catalog."
+    assert [activity for activity, _, _ in names(store.swap_activity(itinerary_id, 3, "Only"))] == ["Only"] * 3
+    assert store.swap_activity(itinerary_id, 1) == "No other activity fits this budget."
+
+
+def test_replan_keeps_the_picks_that_still_fit():
+    store = TravelPlanner({"testland": fixed_destination()}, rng=0).user_itineraries
+    itinerary_id = store.create("user", "testland", None, 4)
+    days = store.record(itinerary_id).days.copy()
+
+    store.replan(itinerary_id, num_days=2)
+    np.testing.assert_array_equal(store.record(itinerary_id).days, days[:2])
+    extended = store.replan(itinerary_id, num_days=5)
+    assert len(extended["days"]) == 5 and [day["day"] for day in extended["days"]] == [1, 2, 3, 4, 5]
+    np.testing.assert_array_equal(store.record(itinerary_id).days[:2], days[:2])
+    assert store.replan(itinerary_id, num_days=0) == "An itinerary needs at least one day."
+    assert store.replan("no such id", budget=100) == "Itinerary not found."
+
+    # 300 over 5 days is 60 a day: activities up to 20, hotels up to 30 and dishes up to 15.
+    before = store.record(itinerary_id).days.copy()
+    store.set_budget(itinerary_id, 300)
+    after = store.record(itinerary_id).days
+    limits = {ACTIVITY: 1, ACCOMMODATION: 1, FOOD: 1}
+    for column, limit in limits.items():
+        assert (after[:, column] <= limit).all()
+        kept = before[:, column] <= limit
+        np.testing.assert_array_equal(after[kept, column], before[kept, column])
+    assert store.record(itinerary_id).budget == 300
+
+
+def test_negative_meal_is_no_meal():
+    store = TravelPlanner({"testland": fixed_destination()}, rng=0).user_itineraries
+    itinerary = {"destination": "testland", "days": [
+        {"activities": [{"name": "Activity 0"}], "accommodation": {"name": "Hotel 0"}, "food": []},
+        {"activities": [{"name": "Activity 1"}], "accommodation": {"name": "Hotel 1"}, "food": [{"name": "Dish 3"}]},
+    ]}
+    itinerary_id = store.save("user", itinerary)
+    assert names(store.get(itinerary_id)) == [("Activity 0", "Hotel 0", []), ("Activity 1", "Hotel 1", ["Dish 3"])]
+    # 120 over 2 days only affords Dish 0 and Dish 1: replanning redraws Dish 3 and leaves the day without food as it was.
+    first, second = [meals for _, _, meals in names(store.set_budget(itinerary_id, 120))]
+    assert first == [] and second in (["Dish 0"], ["Dish 1"])
+
+
+def test_caches_follow_the_catalog():
+    catalog = {"testland": fixed_destination()}
+    planner = TravelPlanner(catalog, rng=0)
+    store = planner.user_itineraries
+    itinerary_id = store.create("user", "testland", None, 2)
+    store.swap_activity(itinerary_id, 1, "Activity 5")
+
+    # A replaced entry is picked up without being told.
+    catalog["testland"] = dict(catalog["testland"], activities=catalog["testland"]["activities"][::-1])
+    assert names(store.swap_activity(itinerary_id, 1, "Activity 5"))[0][0] == "Activity 5"
+    assert store.record(itinerary_id).days[0, ACTIVITY] == 0
+    catalog["testland"] = dict(catalog["testland"], activities=[{"name": f"New {i}", "cost": 0} for i in range(3)])
+    assert names(store.swap_activity(itinerary_id, 2))[1][0].startswith("New")
+
+    # An entry edited in place needs invalidate_destination.
+    catalog["testland"]["activities"][:] = [{"name": "Edited 0", "cost": 0}, {"name": "Edited 1", "cost": 0}]
+    planner.invalidate_destination("TESTLAND")
+    assert names(store.swap_activity(itinerary_id, 1))[0][0].startswith("Edited")
+    assert names(store.swap_activity(itinerary_id, 2, "Edited 1"))[1][0] == "Edited 1"
+
+
+def test_reload_from_sqlite(tmp_path):
+    catalog = {"testland": fixed_destination()}
+    path = str(tmp_path / "itineraries.db")
+    store = TravelPlanner(catalog, rng=0, itinerary_path=path).user_itineraries
+    first = store.create("ana", "testland", None, 3)
+    second = store.create("bo", "Testland", 500, 2)
+    gone = store.create("ana", "testland", None, 1)
+    store.swap_activity(first, 2, "Activity 3")
+    store.set_num_days(second, 4)
+    store.delete(gone)
+    expected = {itinerary_id: (store.get(itinerary_id), store.record(itinerary_id)) for itinerary_id in (first, second)}
+    store.close()
+
+    reloaded = TravelPlanner(catalog, rng=1, itinerary_path=path).user_itineraries
+    assert reloaded.find() == [first, second] and reloaded.find(user="ana") == [first]
+    assert reloaded.find(destination="TESTLAND") == [first, second]
+    for itinerary_id, (itinerary, record) in expected.items():
+        assert reloaded.get(itinerary_id) == itinerary
+        assert (reloaded.record(itinerary_id).budget, reloaded.record(itinerary_id).version) == (record.budget, record.version)
+    reloaded.close()
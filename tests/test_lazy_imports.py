@@ -0,0 +1,56 @@
+import sys
+import threading
+
+import pytest
+
+import lazy_imports
+from lazy_imports import LazyModule, lazy_module, warm_in_background
+
+
+@pytest.fixture
+def unimported(monkeypatch):
+    """A stdlib module name, made to look never imported for the duration of the test."""
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    monkeypatch.setattr(lazy_imports, "_lazy_modules", {})
+    return "colorsys"
+
+
+def test_loaded_on_first_attribute(unimported):
+    module = lazy_module(unimported)
+    assert isinstance(module, LazyModule) and lazy_module(unimported) is module
+    assert repr(module) == "<lazy module 'colorsys' (not loaded)>" and unimported not in sys.modules
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert repr(module) == "<lazy module 'colorsys' (loaded)>"
+    assert "hsv_to_rgb" in dir(module)
+    # Once imported, later callers get the module itself.
+    assert lazy_module(unimported) is sys.modules[unimported]
+
+
+def test_already_imported_modules_are_returned_as_is():
+    assert lazy_module("threading") is threading
+
+
+def test_missing_attributes_and_modules_raise():
+    with pytest.raises(AttributeError):
+        lazy_module("threading").no_such_attribute
+    with pytest.raises(ModuleNotFoundError):
+        lazy_module("no_such_module_anywhere").anything
+
+
+def test_concurrent_first_uses_share_one_module(unimported):
+    module = lazy_module(unimported)
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(module.hsv_to_rgb)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(seen) == 8 and len({id(function) for function in seen}) == 1
+
+
+def test_warm_in_background(unimported):
+    thread = warm_in_background(unimported)
+    assert thread.daemon
+    thread.join(5)
+    assert unimported in sys.modules
+    assert lazy_module(unimported) is sys.modules[unimported]
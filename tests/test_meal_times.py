@@ -0,0 +1,105 @@
+import datetime
+import json
+import os
+import zoneinfo
+
+import numpy as np
+import pytest
+
+from catalog_store import DATA_DIR
+from meal_times import DEFAULT_MEAL_WINDOWS, FALLBACK_MEAL, MealWindows, get_zone, local_seconds, local_time
+
+ZONES = ["America/New_York", "Europe/London", "Australia/Lord_Howe", "Asia/Kathmandu", "America/St_Johns", "Asia/Kolkata",
+         "UTC", "+05:30", "-03:00", "UTC+14", "GMT-9"]
+
+
+def expected_local_seconds(epoch_second, zone_name):
+    local = datetime.datetime.fromtimestamp(epoch_second, get_zone(zone_name))
+    return epoch_second + int(local.utcoffset().total_seconds())
+
+
+def transition_seconds():
+    """Epoch seconds every 15 minutes and 7 seconds within 4 hours of each 2026 DST change of the zones above."""
+    changes = ["2026-03-08 07:00", "2026-11-01 06:00", "2026-03-29 01:00", "2026-10-25 01:00",  # New York, London
+               "2026-04-04 15:00", "2026-10-03 15:30", "2026-03-08 05:30", "2026-11-01 04:30"]  # Lord Howe, St. John's
+    seconds = []
+    for text in changes:
+        moment = int(datetime.datetime.fromisoformat(text).replace(tzinfo=datetime.timezone.utc).timestamp())
+        seconds.extend(range(moment - 4 * 3600, moment + 4 * 3600, 15 * 60 + 7))
+    return np.array(seconds, dtype=np.int64)
+
+
+def test_local_seconds_match_zoneinfo_across_dst_changes():
+    seconds = transition_seconds()
+    rng = np.random.default_rng(0)
+    seconds = np.concatenate([seconds, rng.integers(1_700_000_000, 1_900_000_000, 2000)])
+    zones = rng.choice(ZONES, len(seconds)).tolist()
+    result = local_seconds(seconds, zones)
+    assert result.tolist() == [expected_local_seconds(int(second), zone) for second, zone in zip(seconds, zones)]
+
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_one_zone_for_the_whole_batch(zone):
+    seconds = transition_seconds()
+    assert local_seconds(seconds, zone).tolist() == [expected_local_seconds(int(second), zone) for second in seconds]
+
+
+def test_timestamp_kinds_agree():
+    moment = datetime.datetime(2026, 3, 8, 6, 59, 59, tzinfo=datetime.timezone.utc)
+    epoch = int(moment.timestamp())
+    as_naive_utc = moment.replace(tzinfo=None)
+    as_paris = moment.astimezone(zoneinfo.ZoneInfo("Europe/Paris"))
+    kinds = [[epoch], [float(epoch) + 0.5], [as_naive_utc], [as_paris], np.array([as_naive_utc], dtype="datetime64[s]")]
+    results = {int(local_seconds(kind, "America/New_York")[0]) for kind in kinds}
+    assert results == {epoch - 5 * 3600}
+    assert local_time("America/New_York", as_naive_utc).hour == 1
+
+
+def test_get_zone():
+    assert get_zone("+05:30").utcoffset(None) == datetime.timedelta(hours=5, minutes=30)
+    assert get_zone("UTC-3").utcoffset(None) == datetime.timedelta(hours=-3)
+    assert get_zone("GMT+0545").utcoffset(None) == datetime.timedelta(hours=5, minutes=45)
+    assert get_zone(" Asia/Tokyo ") == zoneinfo.ZoneInfo("Asia/Tokyo")
+    utc = datetime.timezone.utc
+    assert get_zone(utc) is utc
+    for name in ["Mars/Olympus_Mons", "+15:00", "", "../etc/passwd", "5"]:
+        with pytest.raises(ValueError):
+            get_zone(name)
+
+
+def test_meal_boundaries():
+    windows = MealWindows()
+    for meal, start, end in DEFAULT_MEAL_WINDOWS:
+        assert windows.meal_at(datetime.time(start, 0)) == meal
+        assert windows.meal_at(datetime.time(end - 1, 59, 59)) == meal
+    assert windows.meal_at(datetime.time(23, 0)) == FALLBACK_MEAL
+    assert windows.meal_at(datetime.time(4, 59)) == FALLBACK_MEAL
+
+
+def test_wrapping_and_fractional_windows():
+    windows = MealWindows([("late dinner", 22, 2), ("brunch", 10.5, 13.25)])
+    assert [windows.meal_at(datetime.time(hour, minute)) for hour, minute in [(21, 59), (22, 0), (0, 30), (1, 59), (2, 0)]] == [
+        FALLBACK_MEAL, "late dinner", "late dinner", "late dinner", FALLBACK_MEAL]
+    assert [windows.meal_at(datetime.time(hour, minute)) for hour, minute in [(10, 29), (10, 30), (13, 14), (13, 15)]] == [
+        FALLBACK_MEAL, "brunch", "brunch", FALLBACK_MEAL]
+    with pytest.raises(ValueError):
+        MealWindows([("dinner", 18, 25)])
+
+
+def test_bucketing_across_zones():
+    # 12:00 UTC is 13:00 in London, 08:00 in New York, 17:45 in Kathmandu and midnight at +12:00.
+    noon = datetime.datetime(2026, 7, 1, 12, 0)
+    buckets = MealWindows().bucket(["ana", "bo", "cy", "di"], [noon] * 4, ["Europe/London", "America/New_York", "Asia/Kathmandu", "+12:00"])
+    assert buckets == {"lunch": ["ana"], "breakfast": ["bo"], "dinner": ["cy"], FALLBACK_MEAL: ["di"]}
+
+
+def test_catalog_windows_run_back_to_back():
+    with open(os.path.join(DATA_DIR, "cuisines.json"), encoding="utf-8") as f:
+        cuisines = json.load(f)
+    for windows in [DEFAULT_MEAL_WINDOWS] + [info["meal_windows"] for info in cuisines.values() if "meal_windows" in info]:
+        assert FALLBACK_MEAL not in [meal for meal, _, _ in windows]
+        assert all(end == next_start for (_, _, end), (_, next_start, _) in zip(windows, windows[1:]))
+        table = MealWindows(windows).table
+        # The fallback covers one run of slots: the night.
+        fallback = np.flatnonzero(np.roll(table, -round(windows[-1][2] * 4)) == 0)
+        assert np.array_equal(fallback, np.arange(len(fallback)))
@@ -0,0 +1,104 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import preload
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork") or not os.path.isdir("/proc"), reason="needs fork and /proc")
+
+
+class ScriptedTool:
+    """Stands in for a warmed tool: run() follows one command read from stdin."""
+
+    rng = None
+
+    def run(self):
+        action, _, argument = input().partition(" ")
+        if action == "print":
+            print(argument)
+        elif action == "exit":
+            sys.exit(None if argument == "none" else int(argument) if argument.lstrip("-").isdigit() else argument)
+        else:
+            raise RuntimeError(argument)
+
+
+def run_client(path, line, command="planner"):
+    """Runs command through the server from a separate client process; returns (status, stdout, stderr)."""
+    client = subprocess.run([sys.executable, "-c", f"import preload, sys; sys.exit(preload.run_client({command!r}, {path!r}))"],
+                            input=line + "\n", capture_output=True, text=True, cwd=ROOT, timeout=30)
+    return client.returncode, client.stdout, client.stderr
+
+
+def zombies(pid):
+    """PIDs of pid's children that have exited but not been reaped."""
+    found = []
+    for entry in os.listdir("/proc"):
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        state, parent = stat.rsplit(")", 1)[1].split()[:2]
+        if state == "Z" and int(parent) == pid:
+            found.append(int(entry))
+    return found
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(preload, "REAP_INTERVAL", 0.05)
+    path = str(tmp_path / "preload.sock")
+    tools = {"planner": ScriptedTool(), "flights": ScriptedTool()}
+    process = multiprocessing.get_context("fork").Process(target=preload.serve, args=(path, tools))
+    process.start()
+    deadline = time.monotonic() + 10
+    while not os.path.exists(path):
+        assert process.is_alive() and time.monotonic() < deadline
+        time.sleep(0.01)
+    yield process, path
+    process.terminate()
+    process.join(10)
+
+
+def test_tools_run_in_forked_children(server):
+    process, path = server
+    assert run_client(path, "print hello") == (0, "hello\n", "")
+    assert run_client(path, "print from flights", "flights")[:2] == (0, "from flights\n")
+
+
+@pytest.mark.parametrize("line, status, stderr", [
+    ("exit none", 0, ""), ("exit 0", 0, ""), ("exit 3", 3, ""), ("exit no catalog", 1, "no catalog\n")])
+def test_exit_statuses_match_the_interpreter(server, line, status, stderr):
+    _, path = server
+    assert run_client(path, line) == (status, "", stderr)
+
+
+def test_failures_are_reported(server):
+    _, path = server
+    status, _, stderr = run_client(path, "raise broken")
+    assert status == 1 and "RuntimeError: broken" in stderr
+    # The server carries on after a failed run.
+    assert run_client(path, "print still here")[:2] == (0, "still here\n")
+
+
+def test_finished_children_are_reaped_while_idle(server):
+    process, path = server
+    for _ in range(3):
+        assert run_client(path, "print hi")[0] == 0
+    deadline = time.monotonic() + 5
+    while zombies(process.pid):
+        assert time.monotonic() < deadline, "children left unreaped"
+        time.sleep(0.05)
+
+
+def test_stopping_removes_the_socket(server):
+    process, path = server
+    process.terminate()
+    process.join(10)
+    assert process.exitcode == 0 and not os.path.exists(path)
+    assert preload.run_client("planner", path) is None
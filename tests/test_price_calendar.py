@@ -0,0 +1,96 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from fare_store import FareStore
+from flexi_date_flexi_destination_flight import FlightExplorer
+from price_calendar import ONE_WAY_REUSED, RETURN_FARES, build_price_calendar, cheapest_by_departure
+
+START, END = datetime.date(2026, 6, 1), datetime.date(2026, 6, 20)
+REGION = (10, -85, 28, -59)
+
+
+def brute_force(outbound, inbound, start_date, end_date, lengths):
+    """{(departure date, length): cheapest outbound + return over every pair of fares}."""
+    back = {}
+    for day, city, price in zip(inbound["departure_date"].dt.date, inbound["destination_city"].astype(str), inbound["price"]):
+        back[(day, city)] = min(back.get((day, city), np.inf), price)
+    best = {}
+    for day, city, price in zip(outbound["departure_date"].dt.date, outbound["destination_city"].astype(str), outbound["price"]):
+        if not start_date <= day <= end_date:
+            continue
+        for length in lengths:
+            total = price + back.get((day + datetime.timedelta(days=length), city), np.inf)
+            best[(day, length)] = min(best.get((day, length), np.inf), total)
+    return best
+
+
+@pytest.fixture
+def legs(make_fares):
+    outbound = make_fares(300, 1, START, END, REGION)
+    inbound = make_fares(300, 2, START, END + datetime.timedelta(days=10), REGION)
+    return outbound, inbound
+
+
+@pytest.mark.parametrize("min_length, max_length", [(1, 1), (3, 5), (1, 10), (7, 7)])
+def test_calendar_matches_brute_force(legs, min_length, max_length):
+    outbound, inbound = legs
+    calendar = build_price_calendar(outbound, inbound, START, END, min_length, max_length)
+    lengths = range(min_length, max_length + 1)
+    best = brute_force(outbound, inbound, START, END, lengths)
+    assert calendar.trip_lengths == list(lengths)
+    for i, day in enumerate(calendar.departure_dates):
+        for j, length in enumerate(lengths):
+            expected = best.get((day, length), np.inf)
+            if np.isinf(expected):
+                assert np.isnan(calendar.prices[i, j]) and calendar.destinations[i, j] is None
+            else:
+                assert calendar.prices[i, j] == pytest.approx(expected)
+                city = calendar.destinations[i, j]
+                assert calendar.for_destination(city).iloc[i, j] == pytest.approx(expected)
+
+    # cheapest_by_departure is the minimum over the whole window of lengths, without the length axis.
+    trips = cheapest_by_departure(outbound, inbound, START, END, min_length, max_length)
+    for day, price in zip(trips.index, trips["price"]):
+        expected = min(best.get((day, length), np.inf) for length in lengths)
+        assert np.isnan(price) if np.isinf(expected) else price == pytest.approx(expected)
+
+
+def test_cheapest_within_lengths(legs):
+    outbound, inbound = legs
+    calendar = build_price_calendar(outbound, inbound, START, END, 1, 10)
+    best = brute_force(outbound, inbound, START, END, range(1, 11))
+    for min_length, max_length in [(None, None), (2, 4), (None, 3), (8, None), (5, 5)]:
+        low, high = min_length or 1, max_length or 10
+        expected = min(price for (_, length), price in best.items() if low <= length <= high)
+        day, length, price, city = calendar.cheapest(min_length, max_length)
+        assert price == pytest.approx(expected) and low <= length <= high
+        assert best[(day, length)] == pytest.approx(price) and city is not None
+    # An explicit bound of 0 is a bound, not "no bound".
+    assert calendar.cheapest(max_length=0) is None
+    assert calendar.cheapest(11, 20) is None
+
+
+def test_no_common_destinations(make_fares):
+    outbound = make_fares(50, 3, START, END, REGION)
+    calendar = build_price_calendar(outbound, outbound.iloc[:0], START, END, 2, 4)
+    assert np.isnan(calendar.prices).all() and calendar.cheapest() is None
+    assert cheapest_by_departure(outbound, outbound.iloc[:0], START, END, 2, 4)["price"].isna().all()
+
+
+def test_explorer_labels_where_return_legs_came_from(legs):
+    outbound, inbound = legs
+    explorer = FlightExplorer(fare_store=FareStore(), destinations={})
+    explorer.fare_store.append(outbound)
+
+    estimated = explorer.price_calendar(START, END, 2, 5, REGION)
+    assert estimated.return_legs == ONE_WAY_REUSED and estimated.to_dict()["return_legs"] == ONE_WAY_REUSED
+    stored = explorer.query_fares(START, END + datetime.timedelta(days=5), REGION)
+    reused = build_price_calendar(stored, stored, START, END, 2, 5)
+    np.testing.assert_allclose(estimated.prices, reused.prices)
+    assert explorer.cheapest_trips(START, END, 2, 5, REGION).attrs["return_legs"] == ONE_WAY_REUSED
+
+    real = explorer.price_calendar(START, END, 2, 5, REGION, return_fares=inbound)
+    assert real.return_legs == RETURN_FARES
+    assert explorer.cheapest_trips(START, END, 2, 5, REGION, return_fares=inbound).attrs["return_legs"] == RETURN_FARES
@@ -0,0 +1,70 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from catalog_store import DATA_DIR, cuisine_ingredients
+from dynamic_recipe_generator import RecipeGenerator
+
+
+@pytest.fixture(scope="module")
+def cuisines():
+    with open(os.path.join(DATA_DIR, "cuisines.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def generator(cuisines):
+    return RecipeGenerator(cuisines, rng=0)
+
+
+def typed_pantries(cuisine_info, count, seed=0):
+    """Pantries drawn from a cuisine's own terms, typed the way users type them, plus unknown words."""
+    rng = np.random.default_rng(seed)
+    terms = list(dict.fromkeys(cuisine_ingredients(cuisine_info)))
+    terms += ["Tomatoes", "fresh basil leaves", "2 cups rice", "scallions", "garbanzo beans", "dragonfruit", "  Onion "]
+    pantries = []
+    for _ in range(count):
+        pantry = []
+        for term in rng.choice(terms, int(rng.integers(0, 13)), replace=False):
+            term = str(term)
+            roll = rng.random()
+            if roll < 0.2:
+                term += "s"
+            elif roll < 0.3:
+                term = term.upper()
+            elif roll < 0.4 and len(term) > 6:
+                position = int(rng.integers(1, len(term) - 1))
+                term = term[:position] + term[position + 1:]
+            pantry.append(term)
+        pantries.append(pantry)
+    return pantries
+
+
+@pytest.mark.parametrize("cuisine", ["italian", "indian", "mexican", "american"])
+def test_batch_matches_per_call(generator, cuisines, cuisine):
+    pantries = typed_pantries(cuisines[cuisine], 200)
+    batch = generator.analyze_ingredients_batch(pantries, cuisine, include_hints=True)
+    assert len(batch) == len(pantries)
+    for pantry, result in zip(pantries, batch):
+        expected = generator.analyze_ingredients(pantry, cuisine)
+        expected["matching_hints"] = generator.find_matching_hints(pantry, cuisine)
+        assert result == expected
+
+
+def test_batch_without_hints(generator, cuisines):
+    pantries = typed_pantries(cuisines["italian"], 20, seed=1)
+    for pantry, result in zip(pantries, generator.analyze_ingredients_batch(pantries, "Italian")):
+        assert "matching_hints" not in result
+        assert result == generator.analyze_ingredients(pantry, "italian")
+
+
+def test_batch_unknown_cuisine(generator):
+    assert generator.analyze_ingredients_batch([["rice"], []], "martian") == [
+        {"key_ingredients_present": [], "common_pairings_present": []}] * 2
+
+
+def test_batch_of_empty_pantries(generator):
+    assert generator.analyze_ingredients_batch([], "italian") == []
+    assert generator.analyze_ingredients_batch([[]], "italian") == [generator.analyze_ingredients([], "italian")]
@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+
+from travel_server import TravelServer, TravelService
+
+
+@pytest.fixture(scope="module")
+def service():
+    return TravelService(seed=0)
+
+
+def call(service, name, params):
+    status, body = service.handle(name, params)
+    return status, json.loads(body)
+
+
+@pytest.mark.parametrize("params, message", [
+    ({"dates": 5, "region": "caribbean", "budget": 800}, "'dates' must be a string."),
+    ({"start_date": 20260601, "end_date": "2026-06-30", "region": "caribbean", "budget": 800}, "'start_date' must be a string."),
+    ({"start_date": "2026-06-01", "end_date": ["2026-06-30"], "region": "caribbean", "budget": 800}, "'end_date' must be a string."),
+    ({"start_date": "2026-06-01", "end_date": "June", "region": "caribbean", "budget": 800}, "Dates must be YYYY-MM-DD."),
+    ({"dates": "next month", "region": {"lat": 1}, "budget": 800}, "'region' must be a string."),
+    ({"dates": "next month", "region": "caribbean", "budget": 800, "limit": 0}, "'limit' must be at least 1."),
+    ({"dates": "next month", "region": "caribbean", "budget": 800, "limit": -3}, "'limit' must be at least 1."),
+    ({"dates": "next month", "region": "caribbean"}, "Missing 'budget'."),
+])
+def test_search_flights_rejects_bad_params(service, params, message):
+    assert call(service, "search_flights", params) == (400, {"error": message})
+
+
+def test_search_flights_limit(service):
+    status, body = call(service, "search_flights", {"dates": "next month", "region": "caribbean", "budget": 800, "limit": 2})
+    assert status == 200
+    assert 1 <= len(body["flights"]) <= 2
+    assert [flight["price"] for flight in body["flights"]] == sorted(flight["price"] for flight in body["flights"])
+
+
+@pytest.mark.parametrize("params, message", [
+    ({"ingredients": "rice", "cuisine": "italian", "dish_type": 3}, "'dish_type' must be a string."),
+    ({"ingredients": "rice", "cuisine": ["italian"]}, "'cuisine' must be a string."),
+    ({"ingredients": [1, 2], "cuisine": "italian"}, "'ingredients' must be a list of names."),
+    ({"cuisine": "italian"}, "Missing 'ingredients'."),
+])
+def test_recipe_rejects_bad_params(service, params, message):
+    assert call(service, "recipe", params) == (400, {"error": message})
+
+
+def test_recipe_hints_and_unknown_cuisine(service):
+    status, body = call(service, "recipe", {"ingredients": "tomato, basil", "cuisine": "Italian", "dish_type": "pasta"})
+    assert status == 200 and "recipe_hints" in body
+    assert call(service, "recipe", {"ingredients": "rice", "cuisine": "martian", "dish_type": "stew"})[0] == 404
+
+
+def test_itineraries_errors(service):
+    assert call(service, "itineraries", {"destination": "nowhere"}) == (404, {"error": "Destination not found."})
+    assert call(service, "itineraries", {"destination": "x", "num_days": 0})[0] == 400
+    assert call(service, "itineraries", {"destination": "x", "seed": -1})[0] == 400
+
+
+async def exchange(raw_requests):
+    """Sends raw HTTP requests on one connection to an inline server; returns the status lines it answered with."""
+    server = TravelServer(workers=0, seed=0)
+    listener = await server.start(port=0)
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", listener.sockets[0].getsockname()[1])
+        writer.write(b"".join(raw_requests))
+        await writer.drain()
+        statuses = []
+        while status_line := await reader.readline():
+            statuses.append(int(status_line.split()[1]))
+            headers = {}
+            while (line := await reader.readline()) != b"\r\n":
+                key, _, value = line.decode().partition(":")
+                headers[key.lower()] = value.strip()
+            json.loads(await reader.readexactly(int(headers["content-length"])))
+        writer.close()
+        return statuses
+    finally:
+        listener.close()
+        await listener.wait_closed()
+        server.close()
+
+
+def post(path, payload, connection="keep-alive", length=None):
+    body = json.dumps(payload).encode()
+    length = len(body) if length is None else length
+    return (f"POST {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {length}\r\nConnection: {connection}\r\n\r\n").encode() + body
+
+
+def test_keep_alive_and_routing():
+    requests = [b"GET /health HTTP/1.1\r\nHost: test\r\n\r\n",
+                b"GET /nowhere HTTP/1.1\r\nHost: test\r\n\r\n",
+                b"GET /itineraries HTTP/1.1\r\nHost: test\r\n\r\n",
+                post("/itineraries", {"destination": "nowhere"}),
+                post("/recipes", {"ingredients": "rice", "cuisine": "italian", "dish_type": 3}, connection="close")]
+    assert asyncio.run(exchange(requests)) == [200, 404, 405, 404, 400]
+
+
+def test_negative_content_length_is_rejected():
+    requests = [post("/recipes", {"ingredients": "rice", "cuisine": "italian"}, length=-5),
+                b"GET /health HTTP/1.1\r\nHost: test\r\n\r\n"]
+    assert asyncio.run(exchange(requests)) == [400]
+
+
+def test_malformed_bodies():
+    not_json = b"POST /recipes HTTP/1.1\r\nHost: test\r\nContent-Length: 3\r\n\r\n{{{"
+    not_object = post("/recipes", [1, 2], connection="close")
+    assert asyncio.run(exchange([not_json, not_object])) == [400, 400]
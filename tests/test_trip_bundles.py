@@ -0,0 +1,122 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fare_store import FareStore
+from flexi_date_flexi_destination_flight import FlightExplorer
+from surprise_itinerary import TravelPlanner
+from trip_bundles import TripBundlePlanner, itinerary_cost
+
+START = datetime.date(2026, 3, 1)
+NUM_DAYS = 20
+REGION = (30, -20, 60, 40)
+
+
+class FixedPlanner:
+    """
+    A planner whose itineraries depend only on the destination: day d takes the activity, hotel and
+    dish at positions shifted by the destination's number and d, so stays cost at least the
+    cheapest possible day and usually more. Counts the itineraries it is asked for.
+    """
+
+    def __init__(self, catalog):
+        self.destinations_data = catalog
+        self.calls = 0
+
+    def generate_single_itinerary(self, destination, budget, num_days):
+        self.calls += 1
+        details = self.destinations_data[destination]
+        shift = int(destination.split()[-1])
+        days = [{"day": day + 1,
+                 "activities": [details["activities"][(shift + day) % len(details["activities"])]],
+                 "accommodation": details["accommodations"][shift % len(details["accommodations"])],
+                 "food": [details["food"][(shift * day) % len(details["food"])]]} for day in range(num_days)]
+        itinerary = {"destination": destination, "days": days}
+        return itinerary if itinerary_cost(itinerary) <= budget else "Not enough budget."
+
+
+def make_world(make_destination, num_destinations=40, fares_per_day=2, seed=0):
+    rng = np.random.default_rng(seed)
+    catalog = {}
+    for i in range(num_destinations):
+        details = make_destination(rng)
+        details.update(latitude=float(rng.uniform(REGION[0], REGION[2])), longitude=float(rng.uniform(REGION[1], REGION[3])))
+        catalog[f"destination {i}"] = details
+    names = list(catalog)
+    size = num_destinations * NUM_DAYS * fares_per_day
+    city = rng.integers(0, num_destinations, size)
+    departures = np.datetime64(START, "D").astype("datetime64[h]") + rng.integers(0, NUM_DAYS * 24, size).astype("timedelta64[h]")
+    fares = pd.DataFrame({
+        "departure_date": departures.astype("datetime64[ns]"),
+        "arrival_date": (departures + rng.integers(2, 8, size).astype("timedelta64[h]")).astype("datetime64[ns]"),
+        "price": np.round(rng.uniform(40, 900, size), 2),
+        "latitude": np.array([catalog[name]["latitude"] for name in names])[city],
+        "longitude": np.array([catalog[name]["longitude"] for name in names])[city],
+        "destination_city": pd.Categorical.from_codes(city, names),
+        "airline": pd.Categorical.from_codes(rng.integers(0, 3, size), ["BudgetAir", "FlyLow", "CheapWings"]),
+        "stops": rng.integers(0, 3, size),
+    })
+    explorer = FlightExplorer(fare_store=FareStore(), destinations={})
+    explorer.fare_store.append(fares)
+    return catalog, explorer
+
+
+def exhaustive(bundles, budget, num_days, k, distinct):
+    """Plans every candidate and keeps the k cheapest trips within budget (ties in candidate order)."""
+    candidates = bundles.candidates(START, START + datetime.timedelta(days=NUM_DAYS - 1), REGION, budget, num_days, distinct)
+    trips = []
+    for sequence, (price, destination) in enumerate(zip(candidates["price"].tolist(), candidates["destination"].tolist())):
+        itinerary = bundles.planner.generate_single_itinerary(destination, budget - price, num_days)
+        if isinstance(itinerary, str):
+            continue
+        total = price + itinerary_cost(itinerary)
+        if total <= budget:
+            trips.append((total, sequence, destination))
+    return sorted(trips)[:k], len(candidates)
+
+
+@pytest.mark.parametrize("distinct", [True, False])
+@pytest.mark.parametrize("budget, num_days, k", [(700, 2, 5), (1200, 4, 10), (400, 3, 3), (3000, 5, 1)])
+def test_early_cutoff_matches_exhaustive_search(make_destination, distinct, budget, num_days, k):
+    catalog, explorer = make_world(make_destination)
+    bundles = TripBundlePlanner(explorer, FixedPlanner(catalog))
+    expected, num_candidates = exhaustive(bundles, budget, num_days, k, distinct)
+    bundles.planner.calls = 0
+    result = bundles.plan(START, START + datetime.timedelta(days=NUM_DAYS - 1), REGION, budget, num_days, k,
+                          distinct_destinations=distinct)
+    assert [(bundle.total_cost, bundle.destination) for bundle in result] == [(total, destination) for total, _, destination in expected]
+    assert bundles.planner.calls <= num_candidates
+    for bundle in result:
+        assert bundle.total_cost == pytest.approx(bundle.flight_cost + bundle.ground_cost)
+        assert bundle.leftover == pytest.approx(budget - bundle.total_cost)
+        assert bundle.flight["destination_city"] == bundle.destination
+
+
+def test_cutoff_skips_most_candidates(make_destination):
+    catalog, explorer = make_world(make_destination, num_destinations=60)
+    bundles = TripBundlePlanner(explorer, FixedPlanner(catalog))
+    end = START + datetime.timedelta(days=NUM_DAYS - 1)
+    num_candidates = len(bundles.candidates(START, end, REGION, 2000, 3, distinct_destinations=False))
+    bundles.plan(START, end, REGION, 2000, 3, 5, distinct_destinations=False)
+    assert bundles.planner.calls < num_candidates // 4
+
+
+def test_random_planner_bundles_are_within_budget(make_destination):
+    catalog, explorer = make_world(make_destination)
+    bundles = TripBundlePlanner(explorer, TravelPlanner(catalog, rng=0))
+    result = bundles.plan(START, START + datetime.timedelta(days=NUM_DAYS - 1), REGION, 900, 3, 5)
+    assert 0 < len(result) <= 5
+    assert [bundle.total_cost for bundle in result] == sorted(bundle.total_cost for bundle in result)
+    assert len({bundle.destination for bundle in result}) == len(result)
+    for bundle in result:
+        assert bundle.total_cost <= 900
+        assert bundle.ground_cost == itinerary_cost(bundle.itinerary)
+
+
+def test_no_candidates(make_destination):
+    catalog, explorer = make_world(make_destination)
+    bundles = TripBundlePlanner(explorer, FixedPlanner(catalog))
+    assert bundles.plan(START, START + datetime.timedelta(days=NUM_DAYS - 1), (-10, -10, -5, -5), 900) == []
+    assert bundles.plan(START, START + datetime.timedelta(days=NUM_DAYS - 1), REGION, 30) == []
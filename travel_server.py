@@ -0,0 +1,360 @@
+"""
+Long-lived JSON service for the planner, the flight explorer and the recipe generator.
+
+A small keep-alive HTTP/1.1 server on asyncio (standard library only). Each process builds one
+TravelService, so catalogs are opened once per process rather than per request; the CPU-heavy
+handlers run in a process pool whose workers build their own TravelService at startup.
+
+    python travel_server.py --port 8080 --workers 4
+
+    GET  /health
+    GET  /destinations
+    POST /itineraries      {"destination", "budget", "num_days", "num_itineraries", "strategy", "diversity", "seed"}
+    POST /booking-options  {"itinerary", "start_date"}
+    POST /flights/search   {"dates" or "start_date"/"end_date", "region", "budget", "max_duration_hours", "max_stops",
+                            "airlines", "limit"}
+    POST /recipes          {"ingredients", "cuisine", "meal_type" or "timezone"} or with "dish_type" for the matching recipe hints
+    POST /meal-types       {"requests": [[user, timestamp, timezone], ...], "cuisine"}
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from dynamic_recipe_generator import RecipeGenerator, RecipeRenderer
+from flexi_date_flexi_destination_flight import FlightExplorer
+from surprise_itinerary import TravelPlanner
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 422: "Unprocessable Entity",
+           500: "Internal Server Error"}
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class RequestError(Exception):
+    """Turned into a JSON error response with the given HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode(payload):
+    return json.dumps(payload, default=_json_default).encode()
+
+
+def _required(params, name):
+    if params.get(name) in (None, ""):
+        raise RequestError(400, f"Missing '{name}'.")
+    return params[name]
+
+
+def _text(params, name, required=True):
+    value = _required(params, name) if required else params.get(name)
+    if value not in (None, "") and not isinstance(value, str):
+        raise RequestError(400, f"'{name}' must be a string.")
+    return value
+
+
+def _number(params, name, default=None, kind=float):
+    value = params.get(name, default)
+    if value is None:
+        return None
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise RequestError(400, f"'{name}' must be a number.") from None
+
+
+def _names(params, name):
+    """A list of strings from a JSON list or a comma-separated string (None if absent)."""
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise RequestError(400, f"'{name}' must be a list of names.")
+    return value
+
+
+class TravelService:
+    """Request handlers: plain dicts in, JSON-serializable dicts out; domain errors raise RequestError."""
+
+    def __init__(self, seed=None):
+        self.planner = TravelPlanner(rng=seed)
+        # A long-lived server keeps no fare store: it would only grow (searches are cached in the explorer's FareCache).
+        self.explorer = FlightExplorer(rng=seed, store_fares=False, destinations=self.planner.destinations_data)
+        self.recipes = RecipeGenerator(rng=seed)
+
+    def destinations(self, params):
+        return {"destinations": list(self.planner.destinations_data)}
+
+    def itineraries(self, params):
+        destination = _required(params, "destination")
+        budget = _number(params, "budget")
+        num_days = _number(params, "num_days", 3, int)
+        num_itineraries = _number(params, "num_itineraries", 3, int)
+        if not 1 <= num_days <= 60 or not 1 <= num_itineraries <= 1000:
+            raise RequestError(400, "num_days must be 1-60 and num_itineraries 1-1000.")
+        strategy = params.get("strategy", "random")
+        seed = _number(params, "seed", kind=int)
+        if seed is not None and seed < 0:
+            raise RequestError(400, "'seed' must be a non-negative integer.")
+        # A seed makes the response reproducible; the planner shares this process's catalog.
+        planner = TravelPlanner(self.planner.destinations_data, rng=seed) if seed is not None else self.planner
+        if strategy == "bulk":
+            itineraries = planner.generate_itineraries_bulk(destination, num_itineraries, budget, num_days)
+        elif strategy in ("random", "optimized"):
+            itineraries = planner.generate_multiple_itineraries(destination, num_itineraries, budget, num_days, strategy,
+                                                                _number(params, "diversity", 0.5))
+        else:
+            raise RequestError(400, "strategy must be random, optimized or bulk.")
+        errors = {message for message in itineraries.values() if isinstance(message, str)}
+        if errors:
+            raise RequestError(404 if "Destination not found." in errors else 422, errors.pop())
+        return {"itineraries": itineraries}
+
+    def booking_options(self, params):
+        itinerary = _required(params, "itinerary")
+        if not isinstance(itinerary, dict) or not isinstance(itinerary.get("days"), list):
+            raise RequestError(400, "'itinerary' must be an itinerary object.")
+        try:
+            # Day 1 is the night of start_date (default: today).
+            start_date = datetime.date.fromisoformat(params.get("start_date") or itinerary.get("start_date") or datetime.date.today().isoformat())
+        except (TypeError, ValueError):
+            raise RequestError(400, "'start_date' must be YYYY-MM-DD.") from None
+        # Only catalog items reach the shared inventory, with the catalog's own capacities.
+        itinerary = self.planner.resolve_itinerary(itinerary)
+        if isinstance(itinerary, str):
+            raise RequestError(404 if itinerary == "Destination not found." else 422, itinerary)
+        return {"options": self.planner.get_booking_options(itinerary, start_date)}
+
+    def search_flights(self, params):
+        explorer = self.explorer
+        if "dates" in params:
+            start_date, end_date = explorer.get_flexible_dates(_text(params, "dates"))
+        else:
+            try:
+                start_date = datetime.date.fromisoformat(_text(params, "start_date"))
+                end_date = datetime.date.fromisoformat(_text(params, "end_date"))
+            except ValueError:
+                raise RequestError(400, "Dates must be YYYY-MM-DD.") from None
+        if start_date is None:
+            raise RequestError(422, "Invalid date range input.")
+        region_coords = explorer.get_region_coordinates(_text(params, "region"))
+        if region_coords is None:
+            raise RequestError(422, "Region not recognized.")
+        budget = _number(params, "budget")
+        if budget is None:
+            raise RequestError(400, "Missing 'budget'.")
+        limit = _number(params, "limit", 100, int)
+        if limit < 1:
+            raise RequestError(400, "'limit' must be at least 1.")
+        explorer.search_flights(start_date, end_date, region_coords, budget)
+        flights = explorer.filter_flights(max_duration_hours=_number(params, "max_duration_hours"),
+                                          max_stops=_number(params, "max_stops", kind=int), preferred_airlines=_names(params, "airlines"))
+        flights = flights.sort_values("price", kind="stable").head(limit)
+        records = flights.astype({"departure_date": str, "arrival_date": str, "destination_city": str, "airline": str}).to_dict("records")
+        return {"start_date": start_date, "end_date": end_date, "flights": records}
+
+    def recipe(self, params):
+        _required(params, "ingredients")
+        ingredients = _names(params, "ingredients")
+        cuisine = _text(params, "cuisine")
+        dish_type = _text(params, "dish_type", required=False)
+        if dish_type:
+            if cuisine.lower() not in self.recipes.cuisine_data:
+                raise RequestError(404, f"Sorry, I don't have recipe ideas for {cuisine.lower()} cuisine yet.")
+            matches = self.recipes.find_matching_hints(ingredients, cuisine.lower(), dish_type)
+            return {"recipe_hints": [{"recipe_type": recipe_type, "description": hint["description"], "ingredients": hint["ingredients"]}
+                                     for recipe_type, hint in matches]}
+        try:
+            result = self.recipes.build_recipe(ingredients, cuisine, params.get("meal_type"), params.get("timezone"))
+        except ValueError as error:
+            raise RequestError(400, str(error)) from None
+        if isinstance(result, str):
+            raise RequestError(404, result)
+        return RecipeRenderer.to_dict(result)
+
+    def meal_types(self, params):
+        requests = _required(params, "requests")
+        if not isinstance(requests, list) or not all(isinstance(entry, list) and len(entry) == 3 for entry in requests):
+            raise RequestError(400, "'requests' must be a list of [user, timestamp, timezone].")
+        try:
+            timestamps = [entry[1] if isinstance(entry[1], (int, float)) else datetime.datetime.fromisoformat(entry[1])
+                          for entry in requests]
+            buckets = self.recipes.suggest_meal_types([(user, timestamp, tz) for (user, _, tz), timestamp in zip(requests, timestamps)],
+                                                      params.get("cuisine"))
+        except (TypeError, ValueError) as error:
+            raise RequestError(400, str(error)) from None
+        return {"meal_types": buckets}
+
+    def handle(self, name, params):
+        """Runs handler `name`; returns (status, JSON body bytes)."""
+        try:
+            return 200, encode(getattr(self, name)(params))
+        except RequestError as error:
+            return error.status, encode({"error": str(error)})
+
+
+# One TravelService per worker process, built by the pool initializer.
+_worker_service = None
+
+
+def _init_worker(seed, started_workers):
+    global _worker_service
+    with started_workers.get_lock():
+        index = started_workers.value
+        started_workers.value += 1
+    # Worker i draws from seed's i-th spawned child, so no two workers produce the same "random" itineraries.
+    _worker_service = TravelService(np.random.SeedSequence(seed, spawn_key=(index,)) if seed is not None else None)
+
+
+def _handle_in_worker(name, params):
+    return _worker_service.handle(name, params)
+
+
+ROUTES = {
+    ("GET", "/health"): (None, False),
+    ("GET", "/destinations"): ("destinations", False),
+    ("POST", "/itineraries"): ("itineraries", True),
+    ("POST", "/booking-options"): ("booking_options", False),
+    ("POST", "/flights/search"): ("search_flights", True),
+    ("POST", "/recipes"): ("recipe", True),
+    ("POST", "/meal-types"): ("meal_types", False),
+}
+
+
+class TravelServer:
+    """Routes requests to a TravelService, running CPU-heavy handlers in a process pool (workers=0 runs them inline)."""
+
+    def __init__(self, workers=None, seed=None):
+        self.service = TravelService(seed)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.pool = None
+        if self.workers:
+            context = multiprocessing.get_context()
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                            initargs=(seed, context.Value("i", 0)))
+        self.stats = {"requests": 0, "errors": 0}
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        route = ROUTES.get((method, url.path))
+        if route is None:
+            allowed = any(path == url.path for _, path in ROUTES)
+            return (405, encode({"error": "Method not allowed."})) if allowed else (404, encode({"error": "Not found."}))
+        name, heavy = route
+        if name is None:
+            return 200, encode({"status": "ok", "workers": self.workers})
+        if method == "GET":
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        else:
+            try:
+                params = json.loads(body or b"{}")
+            except ValueError:
+                return 400, encode({"error": "Body must be JSON."})
+            if not isinstance(params, dict):
+                return 400, encode({"error": "Body must be a JSON object."})
+        if heavy and self.pool is not None:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, _handle_in_worker, name, params)
+        return self.service.handle(name, params)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    await self.respond(writer, 400, encode({"error": "Malformed request."}), keep_alive=False)
+                    break
+                if length < 0:
+                    await self.respond(writer, 400, encode({"error": "Malformed request."}), keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, 400, encode({"error": "Request body too large."}), keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close" and version != "HTTP/1.0"
+                try:
+                    status, payload = await self.dispatch(method, target, body)
+                except Exception as error:
+                    status, payload = 500, encode({"error": f"{type(error).__name__}: {error}"})
+                self.stats["requests"] += 1
+                self.stats["errors"] += status >= 500
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Idle keep-alive connections are cancelled at shutdown; nothing is in flight.
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def respond(writer, status, body, keep_alive=True):
+        writer.write(f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """Starts listening and returns the asyncio.Server; port 0 picks a free port."""
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+
+async def serve(host, port, workers, seed):
+    server = TravelServer(workers, seed)
+    listener = await server.start(host, port)
+    print(f"Serving on http://{host}:{listener.sockets[0].getsockname()[1]} with {server.workers} worker(s)", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve itineraries, booking options, flight search and recipes as JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (0 runs every handler in the event loop)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.seed))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
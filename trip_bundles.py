@@ -0,0 +1,170 @@
+"""
+Trip bundles: a flight from the fare store plus an itinerary paid for with what is left of the budget.
+
+Fares are joined to the planner's destinations_data through a DestinationIndex (destination name
+-> details and the cheapest possible day on the ground, optionally falling back to the nearest
+catalog destination to the fare's coordinates). Every (destination, departure day) candidate
+gets a lower bound, cheapest fare + cheapest possible stay, and candidates are planned in order
+of that bound. Planning stops as soon as the next bound can't beat the k-th best bundle found so
+far, so usually only a handful of itineraries are generated however many candidates there are.
+"""
+import heapq
+from dataclasses import dataclass
+
+import numpy as np
+
+from geo_index import PointSet
+from lazy_imports import lazy_module
+
+pd = lazy_module("pandas")
+
+
+def itinerary_cost(itinerary):
+    """What an itinerary costs on the ground: activities, nights and meals."""
+    return sum(sum(activity.get("cost", 0) for activity in day["activities"]) + day["accommodation"].get("price_per_night", 0)
+               + sum(food.get("avg_cost", 0) for food in day["food"]) for day in itinerary["days"])
+
+
+def _cheapest(entries, field):
+    costs = [entry.get(field, 0) for entry in entries]
+    return min(costs) if costs else None
+
+
+class DestinationIndex:
+    """Destination name -> (name, details, cheapest possible day) for a destinations catalog, plus a spatial index."""
+
+    def __init__(self, catalog, cell_degrees=1.0):
+        self.entries = {}
+        self.points = PointSet(cell_degrees)
+        located = []
+        for name, details in catalog.items():
+            daily = [_cheapest(details.get("activities", []), "cost"), _cheapest(details.get("accommodations", []), "price_per_night"),
+                     _cheapest(details.get("food", []), "avg_cost")]
+            if None in daily:
+                continue  # the planner can't build an itinerary here anyway
+            self.entries[name.lower()] = (name, details, float(sum(daily)))
+            if "latitude" in details and "longitude" in details:
+                located.append((name.lower(), details["latitude"], details["longitude"]))
+        if located:
+            names, latitudes, longitudes = zip(*located)
+            self.points.add(list(names), latitudes, longitudes)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, city):
+        return self.entries.get(str(city).lower())
+
+    def nearest(self, latitude, longitude, max_distance_km):
+        found = self.points.nearest(latitude, longitude, k=1)
+        if found and found[0][1] <= max_distance_km:
+            return self.entries[found[0][0]]
+        return None
+
+
+@dataclass(slots=True)
+class TripBundle:
+    destination: str
+    flight: dict
+    itinerary: dict
+    flight_cost: float
+    ground_cost: float
+    total_cost: float
+    leftover: float
+
+
+class TripBundlePlanner:
+    def __init__(self, explorer, planner, max_distance_km=None):
+        # max_distance_km: fares whose destination_city isn't a catalog destination are matched
+        # to the nearest catalog destination within this distance (None matches by name only).
+        self.explorer = explorer
+        self.planner = planner
+        self.max_distance_km = max_distance_km
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = DestinationIndex(self.planner.destinations_data)
+        return self._index
+
+    def candidates(self, start_date, end_date, region_coords, budget, num_days=3, distinct_destinations=True, **fare_filters):
+        """
+        Cheapest fare per (destination, departure day), or per destination, with the catalog entry it joins to,
+        as a frame sorted by lower_bound (fare + cheapest possible stay); candidates over budget are dropped.
+        """
+        fares = self.explorer.query_fares(start_date, end_date, region_coords, budget, **fare_filters)
+        if fares.empty:
+            return fares
+        city = fares["destination_city"]
+        if isinstance(city.dtype, pd.CategoricalDtype):
+            codes, cities = city.cat.codes.to_numpy().astype(np.int64), city.cat.categories.astype(str)
+        else:
+            codes, cities = pd.factorize(city.astype(str))
+        keys = codes
+        if not distinct_destinations:
+            days = fares["departure_date"].to_numpy().astype("datetime64[D]").astype(np.int64)
+            keys = codes * (days.max() - days.min() + 1) + (days - days.min())
+        # Cheapest fare per key with one sort: the first row of each key in price order.
+        order = np.argsort(fares["price"].to_numpy(), kind="stable")
+        _, first = np.unique(keys[order], return_index=True)
+        rows = order[np.sort(first)]
+
+        # Join through the index once per distinct city name; only unmatched cities fall back to coordinates.
+        by_name = [self.index.get(name) for name in cities] + [None]  # code -1 (no city) joins to nothing
+        entries = [by_name[code] for code in codes[rows].tolist()]
+        if self.max_distance_km is not None:
+            latitudes, longitudes = fares["latitude"].to_numpy()[rows], fares["longitude"].to_numpy()[rows]
+            entries = [entry if entry is not None else self.index.nearest(latitudes[i], longitudes[i], self.max_distance_km)
+                       for i, entry in enumerate(entries)]
+        matched = np.array([entry is not None for entry in entries], dtype=bool)
+        entries = [entry for entry in entries if entry is not None]
+        cheapest = fares.take(rows[matched])
+        ground_floor = np.array([entry[2] for entry in entries], dtype=float) * num_days
+        cheapest = cheapest.assign(destination=[entry[0] for entry in entries], lower_bound=cheapest["price"].to_numpy() + ground_floor)
+        return cheapest[cheapest["lower_bound"].to_numpy() <= budget].sort_values("lower_bound", kind="stable")
+
+    def plan(self, start_date, end_date, region_coords, budget, num_days=3, k=5, strategy="random", diversity=0.0,
+             distinct_destinations=True, **fare_filters):
+        """
+        The k cheapest complete trips as TripBundles, cheapest first. strategy "optimized" plans each
+        stay with generate_optimized_itinerary (best-rated within the leftover budget) instead.
+        fare_filters are query_fares' max_duration_hours, max_stops and preferred_airlines.
+        """
+        candidates = self.candidates(start_date, end_date, region_coords, budget, num_days, distinct_destinations, **fare_filters)
+        if candidates.empty:
+            return []
+        prices, bounds = candidates["price"].tolist(), candidates["lower_bound"].tolist()
+        destinations = candidates["destination"].tolist()
+        best = []  # max-heap on total cost via negation: (-total, -sequence, bundle)
+        for sequence, (price, bound, destination) in enumerate(zip(prices, bounds, destinations)):
+            if len(best) == k and bound >= -best[0][0]:
+                break  # sorted by lower bound: nothing further can make the top k
+            leftover = budget - price
+            if strategy == "optimized":
+                itinerary = self.planner.generate_optimized_itinerary(destination, leftover, num_days, diversity=diversity)
+            else:
+                itinerary = self.planner.generate_single_itinerary(destination, leftover, num_days)
+            if isinstance(itinerary, str):
+                continue
+            ground_cost = itinerary_cost(itinerary)
+            total = price + ground_cost
+            if total > budget:
+                continue
+            flight = candidates.iloc[sequence].drop(["destination", "lower_bound"]).to_dict()
+            bundle = TripBundle(destination, flight, itinerary, price, ground_cost, total, budget - total)
+            if len(best) < k:
+                heapq.heappush(best, (-total, -sequence, bundle))
+            elif -total > best[0][0]:
+                heapq.heapreplace(best, (-total, -sequence, bundle))
+        return [bundle for _, _, bundle in sorted(best, key=lambda entry: (-entry[0], -entry[1]))]
+
+    def plan_flexible(self, date_input, region_input, budget, num_days=3, k=5, **options):
+        """plan() for free-text dates and region, as typed into FlightExplorer.run; "Invalid ..." strings on bad input."""
+        start_date, end_date = self.explorer.get_flexible_dates(date_input)
+        if start_date is None:
+            return "Invalid date range input."
+        region_coords = self.explorer.get_region_coordinates(region_input)
+        if region_coords is None:
+            return "Region not recognized."
+        return self.plan(start_date, end_date, region_coords, budget, num_days, k, **options)